@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+D5FD Group-By Aggregation
+Totals records by group in a single pass: sum, count, min, max and
+distinct count over header and BTI fields, e.g. the sum of ND5FDTTF total
+fare by ND5FDFCC currency and ND5FDCIC city. Only the fields involved are
+decoded, straight from the record bytes. Amounts are summed as integers in
+minor units at the scale given by their decimal indicator field (see
+AMOUNT_DECIMAL_INDICATORS), so totals are exact.
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import math
+from collections import namedtuple
+from decimal import Decimal
+
+from d5fd_file_parser import (
+    AMOUNT_DECIMAL_INDICATORS, HEADER_PLAN, RECORD_LAYOUTS, TEXT_KINDS, decimal_places, get_ebcdic_table,
+    zoned_value,
+)
+
+TYPE_SLICE = slice(0x020, 0x023)  # ND5FDTYP
+
+AGGREGATE_FUNCTIONS = ("sum", "count", "min", "max", "distinct")
+
+# Field kinds that can be summed
+AMOUNT_KINDS = frozenset(("PIC", "BIN"))
+
+# Distinct values kept exactly per group before switching to a fixed-size HyperLogLog estimate
+DISTINCT_EXACT_LIMIT = 1000
+HLL_INDEX_BITS = 12  # 4096 one-byte registers, about 1.6% standard error
+
+# function is one of AGGREGATE_FUNCTIONS; field is None for a plain record count
+AggregateSpec = namedtuple("AggregateSpec", ["function", "field", "label"])
+
+
+def parse_aggregate(text):
+    """AggregateSpec for FUNCTION or FUNCTION:FIELD (e.g. sum:ND5FDTTF, count)"""
+    function, sep, field = text.partition(":")
+    function = function.strip().lower()
+    field = field.strip().upper() or None
+    if function not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Unknown aggregate '{text}' (expected one of {', '.join(AGGREGATE_FUNCTIONS)})")
+    if field is None and function != "count":
+        raise ValueError(f"Aggregate '{text}' needs a field ({function}:FIELD)")
+    return AggregateSpec(function, field, f"{function}({field})" if field else function)
+
+
+class DistinctCounter:
+    """Distinct value count: exact up to DISTINCT_EXACT_LIMIT values, then a HyperLogLog estimate"""
+    __slots__ = ("values", "registers")
+
+    def __init__(self):
+        self.values = set()
+        self.registers = None
+
+    def add(self, value):
+        if self.registers is None:
+            self.values.add(value)
+            if len(self.values) > DISTINCT_EXACT_LIMIT:
+                self.registers = bytearray(1 << HLL_INDEX_BITS)
+                for known in self.values:
+                    self.add_hashed(known)
+                self.values = None
+        else:
+            self.add_hashed(value)
+
+    def add_hashed(self, value):
+        hashed = int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+        rest_bits = 64 - HLL_INDEX_BITS
+        rest = hashed & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        index = hashed >> rest_bits
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        if self.registers is None:
+            return len(self.values)
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)  # small range correction
+        return round(estimate)
+
+
+def amount_reader(spec, indicator_spec):
+    """raw record -> (integer minor units, decimal places), or None if the field is not numeric"""
+    field_slice = spec.slice
+    indicator_slice = indicator_spec.slice if indicator_spec is not None else None
+    default_places = 2 if spec.kind == "PIC" else 0
+
+    if spec.kind == "PIC":
+        def read_units(data):
+            return zoned_value(data[field_slice])
+    else:
+        def read_units(data):
+            return int.from_bytes(data[field_slice], "big")
+
+    if indicator_slice is None:
+        def read(data):
+            units = read_units(data)
+            return None if units is None else (units, default_places)
+    else:
+        def read(data):
+            units = read_units(data)
+            return None if units is None else (units, decimal_places(data[indicator_slice], default_places))
+    return read
+
+
+def decimal_reader(read_amount):
+    """raw record -> exact Decimal amount, for min/max"""
+    def read(data):
+        amount = read_amount(data)
+        return None if amount is None else scaled(*amount)
+    return read
+
+
+def value_reader(spec, table):
+    """raw record -> comparable field value for min/max of non-amount fields (dates or text)"""
+    field_slice = spec.slice
+    decoder = spec.decoder
+    if spec.kind in TEXT_KINDS:
+        return lambda data: decoder(data[field_slice], table)
+    return lambda data: decoder(data[field_slice])
+
+
+def key_reader(spec, table):
+    """raw record -> group key text of a field (its report value)"""
+    field_slice = spec.slice
+    decoder, formatter = spec.decoder, spec.formatter
+    text_kind = spec.kind in TEXT_KINDS
+
+    def read(data):
+        raw = data[field_slice]
+        value = decoder(raw, table) if text_kind else decoder(raw)
+        return value if formatter is None else formatter(value, raw)
+    return read
+
+
+def raw_reader(spec):
+    """raw record -> field bytes, for distinct counts"""
+    field_slice = spec.slice
+    return lambda data: bytes(data[field_slice]).rstrip(b"\x40\x00")
+
+
+def scaled(units, places):
+    """Exact Decimal for integer minor units at places decimals"""
+    return Decimal(units).scaleb(-places)
+
+
+class GroupAggregator:
+    """Single-pass group-by over raw record buffers
+
+    group_by holds field names; aggregates holds AggregateSpecs (or
+    FUNCTION:FIELD strings). Each group keeps one small state per aggregate:
+    a count, an integer sum with its scale, a min/max value, or a
+    DistinctCounter. Records whose layout lacks one of the fields are
+    skipped (counted in skipped).
+    """
+
+    def __init__(self, group_by=(), aggregates=("count",), code_page="cp037"):
+        self.group_by = tuple(name.strip().upper() for name in group_by if name.strip())
+        self.aggregates = tuple(parse_aggregate(spec) if isinstance(spec, str) else spec for spec in aggregates)
+        if not self.aggregates:
+            self.aggregates = (parse_aggregate("count"),)
+        self.table = get_ebcdic_table(code_page)
+        self.code_page = code_page
+        self.groups = {}
+        self.records = 0
+        self.skipped = 0
+
+        header_specs = {spec.name: spec for spec in HEADER_PLAN.fields}
+        type_specs = {}
+        for record_type, layout in RECORD_LAYOUTS.items():
+            specs = type_specs[record_type] = dict(header_specs)
+            specs.update((spec.name, spec) for spec in layout.plan.fields)
+        all_specs = [header_specs] + list(type_specs.values())
+
+        names = set(self.group_by) | {spec.field for spec in self.aggregates if spec.field}
+        unknown = sorted(name for name in names if not any(name in specs for specs in all_specs))
+        if unknown:
+            raise ValueError(f"Unknown field: {unknown[0]}")
+        for aggregate in self.aggregates:
+            if aggregate.function == "sum" and not any(
+                    aggregate.field in specs and specs[aggregate.field].kind in AMOUNT_KINDS for specs in all_specs):
+                raise ValueError(f"Cannot sum {aggregate.field}: it is not a PIC or BIN field")
+
+        # Readers per raw type code; records of other types only have header fields
+        self.default_readers = self.compile_readers(header_specs)
+        self.readers = {codecs.encode(record_type, code_page): self.compile_readers(specs)
+                        for record_type, specs in type_specs.items()}
+
+    def compile_readers(self, specs):
+        """(minimum record length, key readers, aggregate readers) for one layout, or None if a field is missing"""
+        names = list(self.group_by) + [spec.field for spec in self.aggregates if spec.field]
+        if any(name not in specs for name in names):
+            return None
+        end = max((specs[name].end for name in names), default=0)
+        keys = tuple(key_reader(specs[name], self.table) for name in self.group_by)
+        readers = []
+        for aggregate in self.aggregates:
+            field_spec = specs.get(aggregate.field) if aggregate.field else None
+            if aggregate.function in ("sum", "min", "max") and field_spec.kind in AMOUNT_KINDS:
+                indicator_spec = specs.get(AMOUNT_DECIMAL_INDICATORS.get(aggregate.field))
+                if indicator_spec is not None:
+                    end = max(end, indicator_spec.end)
+                read_amount = amount_reader(field_spec, indicator_spec)
+                readers.append(read_amount if aggregate.function == "sum" else decimal_reader(read_amount))
+            elif aggregate.function == "sum":
+                return None  # not an amount in this layout
+            elif aggregate.function in ("min", "max"):
+                readers.append(value_reader(field_spec, self.table))
+            elif field_spec is not None:
+                readers.append(raw_reader(field_spec))  # distinct, or count of non-blank values
+            else:
+                readers.append(None)  # plain record count
+        return end, keys, tuple(readers)
+
+    def new_state(self):
+        return [DistinctCounter() if spec.function == "distinct" else [0, 0] if spec.function == "sum"
+                else 0 if spec.function == "count" else None
+                for spec in self.aggregates]
+
+    def add(self, data):
+        """Fold one record buffer into its group"""
+        readers = self.readers.get(bytes(data[TYPE_SLICE]), self.default_readers)
+        if readers is None or readers[0] > len(data):
+            self.skipped += 1
+            return
+        self.records += 1
+        end, keys, value_readers = readers
+        key = tuple(read(data) for read in keys)
+        state = self.groups.get(key)
+        if state is None:
+            state = self.groups[key] = self.new_state()
+
+        for index, (aggregate, read) in enumerate(zip(self.aggregates, value_readers)):
+            function = aggregate.function
+            if function == "count":
+                if read is None or read(data):
+                    state[index] += 1
+                continue
+            value = read(data)
+            if value is None:
+                continue
+            if function == "sum":
+                units, places = value
+                total = state[index]
+                if places > total[1]:
+                    # Rescale the running total to the finer scale; integers stay exact
+                    total[0] *= 10 ** (places - total[1])
+                    total[1] = places
+                total[0] += units * 10 ** (total[1] - places)
+            elif function == "distinct":
+                if value:
+                    state[index].add(value)
+            elif function == "min":
+                if state[index] is None or value < state[index]:
+                    state[index] = value
+            elif state[index] is None or value > state[index]:
+                state[index] = value
+
+    def add_records(self, records):
+        """Fold every record buffer in records; returns the aggregator"""
+        add = self.add
+        for data in records:
+            add(data)
+        return self
+
+    @property
+    def columns(self):
+        return list(self.group_by) + [spec.label for spec in self.aggregates]
+
+    def result_value(self, aggregate, state):
+        if aggregate.function == "sum":
+            return scaled(*state)
+        if aggregate.function == "distinct":
+            return state.count()
+        return state
+
+    def iter_rows(self):
+        """Result rows (group key values, then aggregate values), sorted by group key"""
+        for key in sorted(self.groups, key=lambda values: tuple(str(value) for value in values)):
+            state = self.groups[key]
+            yield list(key) + [self.result_value(aggregate, value)
+                               for aggregate, value in zip(self.aggregates, state)]
+
+    def write_text(self, output_file):
+        rows = [[format_result(value) for value in row] for row in self.iter_rows()]
+        columns = self.columns
+        widths = [max([len(column)] + [len(row[index]) for row in rows]) for index, column in enumerate(columns)]
+        key_count = len(self.group_by)
+
+        def format_row(values):
+            return "  ".join(value.ljust(width) if index < key_count else value.rjust(width)
+                             for index, (value, width) in enumerate(zip(values, widths))).rstrip() + "\n"
+
+        output_file.write("D5FD Aggregation Results\n")
+        output_file.write(f"Records aggregated: {self.records}\n")
+        if self.skipped:
+            output_file.write(f"Records skipped (fields not in their layout): {self.skipped}\n")
+        output_file.write(f"Groups: {len(rows)}\n\n")
+        output_file.write(format_row(columns))
+        output_file.write(format_row(["-" * width for width in widths]))
+        output_file.writelines(format_row(row) for row in rows)
+
+    def write_csv(self, output_file):
+        writer = csv.writer(output_file)
+        writer.writerow(self.columns)
+        writer.writerows([format_result(value) for value in row] for row in self.iter_rows())
+
+    def write_jsonl(self, output_file):
+        columns = self.columns
+        for row in self.iter_rows():
+            output_file.write(json.dumps(dict(zip(columns, (format_result(value) for value in row)))) + "\n")
+
+
+def format_result(value):
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        return f"{value:f}"
+    if hasattr(value, "strftime"):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+D5FD Parser Benchmark
+Builds synthetic records for every supported record type, in hex dump and
+raw binary form, and times each parsing stage separately: hex decode, binary
+scan, header decode, BTI decode, variable items and text rendering. Reports
+records/sec per stage and peak memory of a full parse, and fails when a
+stored baseline regresses past a threshold (lower rates or higher peak memory).
+It also fails when the header and BTI report rows of MAR records are less
+than 5x faster than a per-field walk of the field tables (the pre-plan path).
+
+Usage:
+    py d5fd_benchmark.py [--records 500] [--types TAR,REF] [--save-baseline bench.json]
+    py d5fd_benchmark.py --baseline bench.json [--threshold 0.25] [--min-speedup 5]
+"""
+
+import argparse
+import codecs
+import datetime
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from d5fd_file_parser import (BTI_OFFSET, DATE_FIELDS, HEADER_FIELDS, HEADER_PLAN, ITEM_END_MARKER,
+                              RECORD_LAYOUTS, REPS_FIELDS, SEGMENT_FIELDS, D5FDFileParser,
+                              credit_card_restrictions)
+
+# Record type codes benchmarked (MAR uses the MIR layout, PAR the MAR layout)
+BENCH_TYPES = ("TAR", "MAR", "PAR", "REF", "VOI", "COL", "BOW", "ATR", "AIR", "IFR")
+
+STAGES = ("hex_decode", "binary_scan", "header", "bti", "items", "render")
+
+# Report rows of this record type (the MIR layout, ~200 fields) must be this much faster than walk_report
+SPEEDUP_TYPE = "MAR"
+MIN_REPORT_SPEEDUP = 5.0
+
+# Day 1 of the binary dates is January 1, 1963
+DATE_EPOCH = datetime.date(1962, 12, 31)
+MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+
+
+def subfield_text(fields, values, fill=" "):
+    """Text of a fixed subfield layout: each value padded with fill to its width, fields past values all fill"""
+    return "".join(value.ljust(length, fill)[:length]
+                   for (name, length), value in itertools.zip_longest(fields, values, fillvalue=""))
+
+
+# Variable data items added to records whose layout has them: passenger name,
+# form of payment, REPS data (221 bytes) and three itinerary segments
+SYNTHETIC_ITEMS = (
+    (2, "SMITH/JOHN MR"),
+    (22, "CCVI4111111111111111 1225"),
+    (71, subfield_text(REPS_FIELDS, ("A", "1234", "BANKNET01", "00", "5", "05", "01", "Y", "07", "1", "1", "A1"),
+                       fill="X")),
+    (74, subfield_text(SEGMENT_FIELDS, ("DL", "1234", "Y", "01JAN", "0800", "ATL", "DFW", "OK"))
+     + subfield_text(SEGMENT_FIELDS, ("AA", "0100", "F", "02JAN", "1230", "DFW", "LAX", "HK"))
+     + subfield_text(SEGMENT_FIELDS, ("UA", "0999", "J", "05JAN", "2355", "LAX", "SFO", "OK"))),
+)
+
+
+def ebcdic(text, length):
+    return text.ljust(length)[:length].encode("cp037")
+
+
+def build_record(record_type, seed=0):
+    """Synthetic record buffer with every non-spare field of the record type's layout filled in"""
+    layout = RECORD_LAYOUTS[record_type]
+    rng = random.Random(seed)
+    size = max(spec.end for spec in layout.plan.fields)
+    items = b""
+    if layout.variable_offset:
+        items = b"".join(
+            bytes([type_id]) + (len(text) + 3).to_bytes(2, "big") + text.encode("cp037")
+            for type_id, text in SYNTHETIC_ITEMS
+        ) + bytes([ITEM_END_MARKER])
+        size = max(size, layout.variable_offset + len(items))
+
+    data = bytearray(size)
+    for spec in HEADER_PLAN.fields + layout.plan.fields:
+        if spec.kind == "SPARE" or (layout.variable_offset and spec.offset >= layout.variable_offset):
+            continue
+        if spec.kind == "CHAR":
+            value = ebcdic(f"{spec.name[-3:]}{rng.randrange(1000)}", spec.length)
+        elif spec.kind == "BIN":
+            value = rng.randrange(1 << min(8 * spec.length, 16)).to_bytes(spec.length, "big")
+        elif spec.kind == "DATE":
+            value = rng.randrange(1, 25000).to_bytes(spec.length, "big")
+        elif spec.kind == "PIC":
+            value = ebcdic(str(rng.randrange(10 ** min(spec.length, 12))).zfill(spec.length), spec.length)
+        else:
+            value = bytes(rng.randrange(256) for _ in range(spec.length))
+        data[spec.slice] = value
+
+    # Header fields the parser relies on
+    data[0x000:0x002] = b"\xD5\xFD"
+    data[0x008:0x010] = bytes(8)  # no chain
+    data[0x020:0x023] = ebcdic(record_type, 3)
+    data[0x02C:0x02E] = size.to_bytes(2, "big")
+    if items:
+        data[layout.variable_offset:layout.variable_offset + len(items)] = items
+    return bytes(data)
+
+
+def build_dump(data):
+    """Displacement-format hex dump of one record (16 bytes per line, with the '**' text gutter)"""
+    lines = []
+    for offset in range(0, len(data), 16):
+        chunk = data[offset:offset + 16]
+        words = " ".join(chunk[i:i + 4].hex().upper() for i in range(0, len(chunk), 4))
+        gutter = "".join(c if c.isprintable() else "." for c in chunk.decode("cp037"))
+        lines.append(f"{offset:03X} {words} ** {gutter}\n")
+    return "".join(lines)
+
+
+class NullSink:
+    """Output file that throws away whatever is written to it"""
+
+    def write(self, text):
+        pass
+
+
+def best_rate(count, run, repeat):
+    """Records/sec of the fastest of repeat runs of run()"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best if best else float("inf")
+
+
+def bench_type(parser, record_type, record_count, repeat):
+    """{stage: records/sec} plus peak_kb for one record type"""
+    records = [build_record(record_type, seed) for seed in range(record_count)]
+    dumps = [build_dump(data) for data in records]
+    raw = b"".join(records)
+    layout = RECORD_LAYOUTS[record_type]
+    table = parser.ebcdic_table
+    parsed = [parser.parse_record(data) for data in records]
+
+    def hex_decode():
+        for dump in dumps:
+            parser.hex_to_bytes(dump)
+
+    def binary_scan():
+        for _ in parser.iter_binary_records(raw):
+            pass
+
+    def header():
+        for data in records:
+            HEADER_PLAN.decode(data, table=table)
+
+    def bti():
+        for data in records:
+            layout.plan.decode(data, table=table)
+
+    def items():
+        if layout.variable_offset:
+            for data in records:
+                parser.decode_variable_data_items(data, layout.variable_offset)
+
+    def render():
+        output_buffer = io.StringIO()
+        for record_number, record in enumerate(parsed, 1):
+            parser.render_record(record, output_buffer, record_number)
+
+    stages = {"hex_decode": hex_decode, "binary_scan": binary_scan, "header": header,
+              "bti": bti, "items": items, "render": render}
+    # Warm-up run, so lazily built decoder tables (the date lookup tables) are not timed
+    for stage in STAGES:
+        stages[stage]()
+    result = {stage: best_rate(record_count, stages[stage], repeat) for stage in STAGES}
+    if not layout.variable_offset:
+        result["items"] = None  # layout has no variable data items
+
+    # Peak memory of the full hex dump -> text report pipeline, with the report
+    # thrown away as it is written so only the parser's own memory is measured
+    dump_text = "".join(dumps)
+    tracemalloc.start()
+    parser.write_reports(parser.iter_records(dump_text), NullSink())
+    result["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return result
+
+
+def walk_value(name, field_data, field_type):
+    """Report text of one field, dispatched on its name and table type"""
+    if field_type == "BIN" and len(field_data) == 2 and name in DATE_FIELDS:
+        day_number = int.from_bytes(field_data, "big")
+        if not day_number:
+            return "0"
+        date = DATE_EPOCH + datetime.timedelta(days=day_number - 1)
+        return f"{date.day:02d}{MONTHS[date.month - 1]}{date.year % 100:02d}"
+    if field_type == "CHAR":
+        return codecs.decode(field_data, "cp037", errors="replace").rstrip("\x00").rstrip(" ")
+    if field_type == "BIN":
+        return str(int.from_bytes(field_data, "big"))
+    if field_type == "PIC":
+        hex_str = field_data.hex().upper()
+        digits = "".join(hex_str[i + 1] for i in range(0, len(hex_str), 2) if hex_str[i] == "F")
+        if len(digits) >= 2 and digits.isdigit():
+            return f"{int(digits) / 100:.2f}"
+        return codecs.decode(field_data, "cp037", errors="replace").rstrip("\x00").rstrip(" ")
+    if field_type == "BIT" and ("CCP" in name or "CRD" in name or "ARF" in name):
+        return credit_card_restrictions(field_data)
+    if field_type == "SPARE":
+        return "(SPARE)"
+    return field_data.hex().upper()
+
+
+def walk_report(parser, data, record_type, output_file):
+    """Header and BTI report rows by walking the field tables one field at a time
+
+    The path the compiled layout plans replaced: a bounds check, slice,
+    blank scan and type dispatch per field. It is the reference of the
+    report speedup check, not a second report writer.
+    """
+    config = parser.get_header_config()
+    widths = (config.get("field_width", 8), config.get("length_width", 4), config["hex_width"], config["value_width"])
+    layout = RECORD_LAYOUTS[record_type]
+    for base, fields, skip_blank in ((0, HEADER_FIELDS, False), (BTI_OFFSET, layout.fields, True)):
+        for name, offset, length, field_type, description in fields:
+            start = base + offset
+            if start + length > len(data):
+                continue
+            field_data = data[start:start + length]
+            if skip_blank and (all(byte == 0x40 for byte in field_data) or all(byte == 0 for byte in field_data)):
+                continue
+            output_file.write(f"{name:<{widths[0]}} {start:04X}h {length:<{widths[1]}} "
+                              f"{field_data.hex().upper():<{widths[2]}} "
+                              f"{walk_value(name, field_data, field_type):<{widths[3]}} {description}\n")
+
+
+def report_speedup(parser=None, record_type=SPEEDUP_TYPE, record_count=200, repeat=5):
+    """Header and BTI report rate of the parser over walk_report's, timed in alternating runs"""
+    parser = parser or D5FDFileParser()
+    records = [build_record(record_type, seed) for seed in range(record_count)]
+
+    def plans():
+        output_buffer = io.StringIO()
+        for data in records:
+            parser.parse_header(data, output_buffer)
+            parser.parse_bti_structure(data, record_type, output_buffer)
+
+    def walk():
+        output_buffer = io.StringIO()
+        for data in records:
+            walk_report(parser, data, record_type, output_buffer)
+
+    plans()
+    walk()
+    # Alternating single runs, so a noisy stretch of the machine hits both sides alike
+    plan_rate = walk_rate = 0
+    for _ in range(repeat):
+        plan_rate = max(plan_rate, best_rate(record_count, plans, 1))
+        walk_rate = max(walk_rate, best_rate(record_count, walk, 1))
+    return plan_rate / walk_rate
+
+
+def run_benchmarks(record_types=BENCH_TYPES, record_count=500, repeat=3, parser=None):
+    """{record type: {stage: records/sec, "peak_kb": peak memory}}"""
+    parser = parser or D5FDFileParser()
+    return {record_type: bench_type(parser, record_type, record_count, repeat) for record_type in record_types}
+
+
+def find_regressions(results, baseline, threshold):
+    """(record type, stage, baseline, result) for stages slower than baseline by more than threshold
+
+    peak_kb is compared the other way round: it regresses when it grows by
+    more than threshold.
+    """
+    regressions = []
+    for record_type, stages in results.items():
+        for stage in STAGES:
+            old, new = baseline.get(record_type, {}).get(stage), stages.get(stage)
+            if old and new is not None and new < old * (1 - threshold):
+                regressions.append((record_type, stage, old, new))
+        old, new = baseline.get(record_type, {}).get("peak_kb"), stages.get("peak_kb")
+        if old and new is not None and new > old * (1 + threshold):
+            regressions.append((record_type, "peak_kb", old, new))
+    return regressions
+
+
+def write_results(results, output_file):
+    output_file.write(f"{'Type':<6}" + "".join(f"{stage:>13}" for stage in STAGES) + f"{'peak KB':>10}\n")
+    output_file.write("-" * (6 + 13 * len(STAGES) + 10) + "\n")
+    for record_type, stages in results.items():
+        rates = "".join(f"{'-' if stages[stage] is None else f'{stages[stage]:.0f}':>13}" for stage in STAGES)
+        output_file.write(f"{record_type:<6}{rates}{stages['peak_kb']:>10.0f}\n")
+    output_file.write("(records/sec per stage)\n")
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="D5FD parser benchmark")
+    arg_parser.add_argument("--records", type=int, default=500, help="synthetic records per type")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="timing runs per stage (best is kept)")
+    arg_parser.add_argument("--types", default=",".join(BENCH_TYPES), help="record types to benchmark")
+    arg_parser.add_argument("--baseline", help="fail if slower than the results stored in this JSON file")
+    arg_parser.add_argument("--threshold", type=float, default=0.25,
+                            help="allowed slowdown against the baseline (default 0.25 = 25%%)")
+    arg_parser.add_argument("--save-baseline", help="store the results as a JSON baseline")
+    arg_parser.add_argument("--min-speedup", type=float, default=MIN_REPORT_SPEEDUP,
+                            help=f"minimum {SPEEDUP_TYPE} report speedup over the per-field walk "
+                                 f"(default {MIN_REPORT_SPEEDUP:g}, 0 to skip the check)")
+    return arg_parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    record_types = [record_type.strip().upper() for record_type in args.types.split(",") if record_type.strip()]
+    unknown = [record_type for record_type in record_types if record_type not in RECORD_LAYOUTS]
+    if unknown:
+        print(f"Error: Unknown record type: {unknown[0]}")
+        return 2
+    if args.baseline and not os.path.exists(args.baseline):
+        print(f"Error: Baseline file '{args.baseline}' not found!")
+        return 2
+
+    results = run_benchmarks(record_types, args.records, args.repeat)
+    write_results(results, sys.stdout)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved: {args.save_baseline}")
+
+    failed = False
+    if args.min_speedup:
+        speedup = report_speedup(repeat=max(args.repeat, 5))
+        print(f"{SPEEDUP_TYPE} report speedup over the per-field walk: {speedup:.1f}x")
+        if speedup < args.min_speedup:
+            print(f"REGRESSION {SPEEDUP_TYPE} report speedup: {speedup:.1f}x (minimum {args.min_speedup:g}x)")
+            failed = True
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for record_type, stage, old, new in regressions:
+            if stage == "peak_kb":
+                print(f"REGRESSION {record_type} peak memory: {new:.0f} KB (baseline {old:.0f}, "
+                      f"{(new / old - 1) * 100:.0f}% more)")
+            else:
+                print(f"REGRESSION {record_type} {stage}: {new:.0f} records/sec (baseline {old:.0f}, "
+                      f"{(1 - new / old) * 100:.0f}% slower)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+D5FD Chain Reassembly
+Links chained blocks into logical records through the header chain fields
+(ND5FDFCH forward / ND5FDBCH back chain file addresses, ND5FDBNC block
+number, ND5FDNBC total blocks). The item area of every overflow block is
+appended to the prime block, so the variable data items of a long record
+decode as one buffer.
+"""
+
+import codecs
+import struct
+from collections import namedtuple
+
+from d5fd_file_parser import BTI_OFFSET
+
+# ND5FDFCH, ND5FDBCH
+CHAIN_STRUCT = struct.Struct(">II")
+CHAIN_OFFSET = 0x008
+BLOCK_NUMBER_SLICE = slice(0x024, 0x026)  # ND5FDBNC
+BLOCK_COUNT_SLICE = slice(0x026, 0x028)   # ND5FDNBC
+NAB_SLICE = slice(0x02C, 0x02E)           # ND5FDNAB
+
+# One block of a chain; address is its file address (negative when unknown)
+ChainBlock = namedtuple("ChainBlock", [
+    "address", "data", "forward", "back", "block_number", "block_count", "sequence",
+])
+
+# Reassembled record: concatenated data, the blocks it came from, and whether the chain was whole
+LogicalRecord = namedtuple("LogicalRecord", ["data", "blocks", "complete"])
+
+# kind is "orphan", "incomplete", "loop" or "block count"
+ChainProblem = namedtuple("ChainProblem", ["kind", "blocks", "message"])
+
+
+def block_digits(raw, code_page="cp037"):
+    """EBCDIC block number field as an int (None if not numeric)"""
+    text = codecs.decode(bytes(raw), code_page).strip()
+    return int(text) if text.isdigit() else None
+
+
+def make_block(data, address=None, sequence=0, code_page="cp037"):
+    """ChainBlock for one record buffer"""
+    forward = back = 0
+    if len(data) >= CHAIN_OFFSET + CHAIN_STRUCT.size:
+        forward, back = CHAIN_STRUCT.unpack_from(data, CHAIN_OFFSET)
+    if address is None:
+        address = -(sequence + 1)  # unique, never a real file address
+    return ChainBlock(address, data, forward, back, block_digits(data[BLOCK_NUMBER_SLICE], code_page),
+                      block_digits(data[BLOCK_COUNT_SLICE], code_page), sequence)
+
+
+def iter_chain_blocks(records, code_page="cp037"):
+    """ChainBlocks for record buffers or (file address, buffer) pairs, in input order
+
+    Hex dumps and raw extracts carry no file address per block. For those, a
+    block that has a back chain and directly follows a block with a forward
+    chain is taken as its successor: its address is the predecessor's
+    forward chain, and the predecessor's address is its back chain.
+    """
+    previous = None
+    for sequence, record in enumerate(records):
+        if isinstance(record, tuple):
+            block = make_block(record[1], record[0], sequence, code_page)
+        else:
+            block = make_block(record, None, sequence, code_page)
+            if previous is not None and previous.forward and block.back:
+                block = block._replace(address=previous.forward)
+                if previous.address < 0:
+                    previous = previous._replace(address=block.back)
+        if previous is not None:
+            yield previous
+        previous = block
+    if previous is not None:
+        yield previous
+
+
+def used_bytes(data, start):
+    """data[start:NAB], or to the end of the block when the NAB is not usable"""
+    nab = int.from_bytes(data[NAB_SLICE], "big")
+    end = nab if start < nab <= len(data) else len(data)
+    return data[start:end]
+
+
+def chain_data(chain):
+    """Prime block up to its next available byte, then each overflow block's data after the header"""
+    if len(chain) == 1:
+        return chain[0].data
+    return b"".join([used_bytes(chain[0].data, 0)] + [used_bytes(block.data, BTI_OFFSET) for block in chain[1:]])
+
+
+def describe_blocks(blocks):
+    return ", ".join(f"block {block.sequence + 1}" for block in blocks)
+
+
+def link_blocks(blocks, carried=frozenset(), final=False):
+    """Link a batch of blocks through their chain fields in O(n)
+
+    Returns (logical records in prime block order, blocks to retry with the
+    next batch, problems). A chain that runs off the batch, or an overflow
+    block whose prime block is not in the batch, is retried once (unless
+    final) before it is reported.
+    """
+    by_address = {block.address: block for block in blocks}
+    linked = set()
+    records = []
+    retry = []
+    problems = []
+
+    for head in blocks:
+        if head.back:
+            continue  # overflow block, reached from its prime block
+        chain = [head]
+        seen = {head.address}
+        current = head
+        problem = None
+        while current.forward:
+            successor = by_address.get(current.forward)
+            if successor is None or (successor.back and successor.back != current.address):
+                problem = "incomplete"
+                break
+            if successor.address in seen:
+                problem = "loop"
+                break
+            chain.append(successor)
+            seen.add(successor.address)
+            current = successor
+
+        if problem == "incomplete" and not final and head.sequence not in carried:
+            retry.extend(chain)
+            linked.update(block.sequence for block in chain)
+            continue
+        if problem is None and head.block_count is not None and head.block_count != len(chain):
+            problem = "block count"
+        if problem is not None:
+            problems.append(ChainProblem(problem, chain, (
+                f"{problem} chain at {describe_blocks(chain[:1])}: {len(chain)} block(s) linked"
+                + (f", {head.block_count} expected" if head.block_count is not None else "")
+            )))
+        records.append(LogicalRecord(chain_data(chain), chain, problem is None))
+        linked.update(block.sequence for block in chain)
+
+    for block in blocks:
+        if block.sequence in linked:
+            continue
+        if not final and block.sequence not in carried:
+            retry.append(block)
+        else:
+            problems.append(ChainProblem("orphan", [block], (
+                f"orphan overflow block {block.sequence + 1}: no prime block chains to it"
+            )))
+    return records, retry, problems
+
+
+def iter_logical_records(records, batch_size=1000, on_problem=None, code_page="cp037"):
+    """Yield LogicalRecords for record buffers or (file address, buffer) pairs
+
+    Blocks are linked batch_size at a time, so the stream never waits on a
+    missing block: broken chains are yielded as far as they link (complete
+    False), orphaned overflow blocks are dropped, and each is passed to
+    on_problem as a ChainProblem. Block numbers are read in code_page.
+    Records come out in the order of their first block: those after a chain
+    that is carried into the next batch are held until it is linked.
+    """
+    carried = []
+    held = []
+    batch = []
+    for block in iter_chain_blocks(records, code_page):
+        batch.append(block)
+        if len(batch) >= batch_size:
+            carried_sequences = {block.sequence for block in carried}
+            linked, carried, problems = link_blocks(carried + batch, carried_sequences)
+            ready, held = hold_back(held + linked, carried)
+            yield from report_problems(ready, problems, on_problem)
+            batch = []
+    linked, _, problems = link_blocks(carried + batch, final=True)
+    yield from report_problems(hold_back(held + linked, [])[0], problems, on_problem)
+
+
+def first_sequence(record):
+    return record.blocks[0].sequence
+
+
+def hold_back(records, carried):
+    """(records before the first carried block, records to hold), both in first block order"""
+    records.sort(key=first_sequence)
+    if not carried:
+        return records, []
+    first_carried = min(block.sequence for block in carried)
+    ready = 0
+    while ready < len(records) and first_sequence(records[ready]) < first_carried:
+        ready += 1
+    return records[:ready], records[ready:]
+
+
+def report_problems(linked, problems, on_problem):
+    if on_problem is not None:
+        for problem in problems:
+            on_problem(problem)
+    return linked
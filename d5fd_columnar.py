@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+D5FD Columnar Batch Decoder
+Decodes many records of the same type at once with NumPy: the record buffers
+are stacked into a 2-D uint8 array and every field is decoded in one
+vectorized step per column
+"""
+
+import codecs
+from decimal import Decimal
+
+import numpy as np
+
+from d5fd_file_parser import (
+    DATE_EPOCH, EBCDIC_TABLES, HEADER_PLAN, RECORD_LAYOUTS, SEGMENT_LENGTH, SEGMENT_SUBFIELDS, SegmentRow, get_ebcdic_table,
+    packed_value, zoned_value,
+)
+
+# EBCDIC byte -> Unicode code point per code page, for CHAR columns
+EBCDIC_CODEPOINTS = {
+    code_page: np.array([ord(c) for c in table], dtype=np.uint32)
+    for code_page, table in EBCDIC_TABLES.items()
+}
+CP037_CODEPOINTS = EBCDIC_CODEPOINTS["cp037"]
+
+# Day number zero; day n is n - 1 days after it
+DATE_EPOCH64 = np.datetime64(DATE_EPOCH, "D")
+
+# 10**0 .. 10**18 (largest power of ten that fits int64), for PIC columns
+POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+# Widest decimal that always fits int64 (19 nines do not); wider columns are decoded as Python ints
+MAX_INT64_DIGITS = 18
+
+
+def get_column_specs(record_type, names=None):
+    """Get the compiled field specs for a record type (header fields may be named too)"""
+    layout = RECORD_LAYOUTS.get(record_type)
+    if layout is None:
+        raise ValueError(f"Unknown record type: {record_type}")
+    if names is None:
+        return [spec for spec in layout.plan.fields if spec.kind != "SPARE"]
+
+    specs = {spec.name: spec for spec in HEADER_PLAN.fields}
+    specs.update((spec.name, spec) for spec in layout.plan.fields)
+    missing = [name for name in names if name not in specs]
+    if missing:
+        raise ValueError(f"Unknown fields for {record_type}: {', '.join(missing)}")
+    return [specs[name] for name in names]
+
+
+def stack_records(buffers, width):
+    """Stack record buffers into an (N, width) uint8 array, zero-padded or truncated to width"""
+    buffers = list(buffers)
+    if all(len(buffer) == width for buffer in buffers):
+        return np.frombuffer(b"".join(buffers), dtype=np.uint8).reshape(len(buffers), width)
+
+    array = np.zeros((len(buffers), width), dtype=np.uint8)
+    for row, buffer in zip(array, buffers):
+        count = min(len(buffer), width)
+        row[:count] = np.frombuffer(buffer, dtype=np.uint8, count=count)
+    return array
+
+
+def decode_bin_column(block):
+    """Big-endian unsigned integers as int64"""
+    length = block.shape[1]
+    if length in (1, 2, 4, 8):
+        return np.ascontiguousarray(block).view(f">u{length}")[:, 0].astype(np.int64)
+    values = np.zeros(len(block), dtype=np.int64)
+    for column in range(length):
+        values = (values << 8) | block[:, column]
+    return values
+
+
+def day_numbers_to_datetime64(day_numbers):
+    """Binary day numbers to a datetime64[D] array in one vectorized step (day zero is NaT)"""
+    day_numbers = np.asarray(day_numbers, dtype=np.int64)
+    dates = DATE_EPOCH64 + (day_numbers - 1).astype("timedelta64[D]")
+    dates[day_numbers <= 0] = np.datetime64("NaT")
+    return dates
+
+
+def decode_date_column(block):
+    """Binary day numbers as datetime64[D] (NaT for day zero, like the scalar decoder's None)"""
+    return day_numbers_to_datetime64(decode_bin_column(block))
+
+
+def decode_char_column(block, codepoints=CP037_CODEPOINTS):
+    """EBCDIC text through a lookup table, trailing spaces and NULs stripped"""
+    length = block.shape[1]
+    codepoints = np.ascontiguousarray(codepoints[block])
+    return np.char.rstrip(codepoints.view(f"U{length}")[:, 0], " \x00")
+
+
+def decode_pic_column(block):
+    """Zoned digits (F0-F9 bytes) as signed integers in units of the last decimal place
+
+    Like the scalar decoder, a C or D zone on the last byte gives the sign,
+    and rows with any other non-digit byte (or fewer than two digits) are
+    masked. Fields too wide for int64 are decoded exactly as Python ints
+    (object dtype). Scale with decode_places_column().
+    """
+    length = block.shape[1]
+    if length > MAX_INT64_DIGITS:
+        return exact_column(block, zoned_value)
+    digits = block & 0x0F
+    last_zone = block[:, -1] >> 4
+    signed = ((last_zone == 0xC) | (last_zone == 0xD)) & (digits[:, -1] <= 9)
+    is_digit = ((block >> 4) == 0xF) & (digits <= 9)
+    is_digit[:, -1] |= signed
+    values = (digits * is_digit * POWERS_OF_TEN[length - 1::-1]).sum(axis=1)
+    values[signed & (last_zone == 0xD)] *= -1
+    invalid = ~is_digit.all(axis=1) if length >= 2 else np.ones(len(block), dtype=bool)
+    return np.ma.masked_array(values, mask=invalid)
+
+
+def decode_packed_column(block):
+    """Packed decimal (COMP-3) bytes as signed integers; rows with a bad digit or sign nibble are masked
+
+    Fields too wide for int64 are decoded exactly as Python ints (object dtype).
+    """
+    if 2 * block.shape[1] - 1 > MAX_INT64_DIGITS:
+        return exact_column(block, packed_value)
+    nibbles = np.stack((block >> 4, block & 0x0F), axis=2).reshape(len(block), -1)
+    digits, sign = nibbles[:, :-1], nibbles[:, -1]
+    places = POWERS_OF_TEN[digits.shape[1] - 1::-1] if digits.shape[1] else POWERS_OF_TEN[:0]
+    values = (digits.astype(np.int64) * places).sum(axis=1)
+    values[(sign == 0xB) | (sign == 0xD)] *= -1
+    invalid = (digits > 9).any(axis=1) | (sign < 0xA)
+    return np.ma.masked_array(values, mask=invalid)
+
+
+def exact_column(block, decode):
+    """Masked object array of decode(row bytes) per row, masked where it is None"""
+    values = [decode(row.tobytes()) for row in block]
+    return np.ma.masked_array([0 if value is None else value for value in values],
+                              mask=[value is None for value in values], dtype=object)
+
+
+def decode_places_column(block, default=2):
+    """Decimal places from a one-digit decimal indicator column (default where it is not a digit)"""
+    indicator = block[:, 0].astype(np.int64)
+    return np.where((indicator >= 0xF0) & (indicator <= 0xF9), indicator - 0xF0, default)
+
+
+def column_decimals(units, places):
+    """Exact Decimal object array from integer units and per-row (or one) decimal places; masked rows are None"""
+    units = np.ma.asarray(units)
+    places = np.broadcast_to(places, units.shape)
+    mask = np.ma.getmaskarray(units)
+    return np.array([None if masked else Decimal(int(unit)).scaleb(-int(place))
+                     for unit, place, masked in zip(units.data, places, mask)], dtype=object)
+
+
+def decode_amount_column(array, spec):
+    """Exact Decimal amounts of a PIC field, scaled by its decimal indicator field when it has one"""
+    units = decode_pic_column(array[:, spec.slice])
+    places = 2 if spec.decimal_slice is None else decode_places_column(array[:, spec.decimal_slice])
+    return column_decimals(units, places)
+
+
+def decode_raw_column(block):
+    """BIT / SPARE bytes as an (N, length) uint8 array"""
+    return block.copy()
+
+
+COLUMN_DECODERS = {
+    "CHAR": decode_char_column,
+    "BIN": decode_bin_column,
+    "DATE": decode_date_column,
+    "PIC": decode_pic_column,
+    "BIT": decode_raw_column,
+    "CCR": decode_raw_column,
+    "HEX": decode_raw_column,
+    "SPARE": decode_raw_column,
+}
+
+
+def decode_columns(records, record_type, names=None, code_page="cp037"):
+    """Decode a batch of same-type records into {field name: array}
+
+    records is either a list of record buffers or an already stacked
+    (N, width) uint8 array. Fields past the end of a record decode as zero
+    bytes. CHAR columns are decoded with the given EBCDIC code page.
+    """
+    get_ebcdic_table(code_page)  # validates the code page
+    codepoints = EBCDIC_CODEPOINTS[code_page]
+    specs = get_column_specs(record_type, names)
+    width = max((spec.end for spec in specs), default=0)
+    if isinstance(records, np.ndarray):
+        array = records
+        if array.shape[1] < width:
+            array = np.pad(array, ((0, 0), (0, width - array.shape[1])))
+    else:
+        array = stack_records(records, width)
+
+    return {
+        spec.name: decode_char_column(array[:, spec.slice], codepoints) if spec.kind == "CHAR"
+        else COLUMN_DECODERS[spec.kind](array[:, spec.slice])
+        for spec in specs
+    }
+
+
+def iter_column_batches(buffers, record_type, names=None, batch_size=65536, code_page="cp037"):
+    """Yield decode_columns() results for the records of one type, batch_size records at a time
+
+    Records are picked by their ND5FDTYP bytes in the given code page.
+    """
+    get_ebcdic_table(code_page)  # validates the code page
+    type_code = codecs.encode(record_type, code_page)
+    batch = []
+    for data in buffers:
+        if data[0x020:0x023] != type_code:
+            continue
+        batch.append(data)
+        if len(batch) >= batch_size:
+            yield decode_columns(batch, record_type, names, code_page)
+            batch = []
+    if batch:
+        yield decode_columns(batch, record_type, names, code_page)
+
+
+def decode_segment_columns(payloads, code_page="cp037"):
+    """Decode every itinerary segment of many item 74 payloads at once
+
+    The whole segments of all payloads are viewed as one (N, 26) array.
+    Returns {"payload": index of each segment's payload, "segment": its
+    1-based number within the payload, and one text column per SegmentRow
+    field}.
+    """
+    get_ebcdic_table(code_page)  # validates the code page
+    codepoints = EBCDIC_CODEPOINTS[code_page]
+    counts = np.array([len(payload) // SEGMENT_LENGTH for payload in payloads], dtype=np.int64)
+    buffer = b"".join(bytes(payload[:count * SEGMENT_LENGTH]) for payload, count in zip(payloads, counts))
+    array = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, SEGMENT_LENGTH)
+
+    first_rows = np.repeat(np.cumsum(counts) - counts, counts)
+    columns = {
+        "payload": np.repeat(np.arange(len(counts)), counts),
+        "segment": np.arange(len(array)) - first_rows + 1,
+    }
+    for column, (name, offset, length, end) in zip(SegmentRow._fields, SEGMENT_SUBFIELDS):
+        columns[column] = decode_char_column(array[:, offset:end], codepoints)
+    return columns
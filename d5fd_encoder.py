@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+D5FD Record Encoder
+Builds valid D5FD records from field values keyed by the layout table names
+(ND5FDTKN, ND5FDPNL, ...) plus variable data items, the inverse of the
+parser's decoders: EBCDIC CHAR, big-endian BIN, zoned PIC and binary day
+number dates. Records are written as displacement-format hex dumps or raw
+binary, streamed to disk, so large load-test corpora can be generated.
+
+Usage:
+    py d5fd_encoder.py records.jsonl output.txt [--binary] [--count 1000000] [--sequence ND5FDTKN]
+
+Each input line is a JSON object:
+    {"record_type": "TAR", "fields": {"ND5FDTKN": "0012345678901", "ND5FDTBS": "123.45",
+     "ND5FDDTE": "2024-03-01"}, "items": [{"type": 2, "text": "SMITH/JOHN MR"},
+     {"type": 71, "reps": {"validation_code": "1234"}}, {"type": 74, "segments": [{"carrier_code": "DL"}]}]}
+"""
+
+import argparse
+import codecs
+import datetime
+import json
+import os
+from decimal import Decimal
+
+from d5fd_file_parser import (
+    CODE_PAGES, DATE_EPOCH, HEADER_PLAN, ITEM_END_MARKER, ITEM_HEADER_SIZE, RECORD_ID, RECORD_LAYOUTS,
+    REPS_LENGTH, REPS_SUBFIELDS, SEGMENT_LENGTH, SEGMENT_SUBFIELDS, decimal_places, get_ebcdic_table,
+    subfield_identifier,
+)
+
+NAB_SLICE = slice(0x02C, 0x02E)  # ND5FDNAB
+CIR_SLICE = slice(0x02E, 0x030)  # ND5FDCIR
+TYPE_SLICE = slice(0x020, 0x023)  # ND5FDTYP
+
+# Bytes per displacement dump line
+DUMP_LINE_BYTES = 16
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def date_to_day_number(value):
+    """Binary day number for a date (day 1 = January 1, 1963; None is day zero)"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return (value - DATE_EPOCH).days + 1
+    return int(value)
+
+
+def text_encoder(spec, code_page):
+    """CHAR fields: EBCDIC text, padded with spaces"""
+    length = spec.length
+
+    def encode(value):
+        raw = codecs.encode(str(value), code_page)
+        if len(raw) > length:
+            raise ValueError(f"{spec.name}: '{value}' is longer than {length} bytes")
+        return raw.ljust(length, b"\x40")
+    return encode
+
+
+def bin_encoder(spec, code_page):
+    """BIN fields: big-endian unsigned integers"""
+    length = spec.length
+
+    def encode(value):
+        try:
+            return int(value).to_bytes(length, "big")
+        except OverflowError:
+            raise ValueError(f"{spec.name}: {value} does not fit in {length} bytes") from None
+    return encode
+
+
+def date_encoder(spec, code_page):
+    """DATE fields: binary day numbers from dates, ISO date strings or day numbers"""
+    encode_bin = bin_encoder(spec, code_page)
+    return lambda value: encode_bin(date_to_day_number(value))
+
+
+def pic_encoder(spec, code_page):
+    """PIC fields: zoned digits with places implied decimals; non-numeric text is stored as CHAR
+
+    A negative amount gets a D zone on its last digit.
+    """
+    length = spec.length
+    encode_text = text_encoder(spec, code_page)
+
+    def encode(value, places=2):
+        if isinstance(value, str):
+            try:
+                value = Decimal(value)
+            except ArithmeticError:
+                return encode_text(value)
+        if isinstance(value, float):
+            value = repr(value)  # the float as written, not its binary expansion
+        scaled = Decimal(value).scaleb(places)
+        if not scaled.is_finite() or scaled != scaled.to_integral_value():
+            raise ValueError(f"{spec.name}: {value} does not fit in {places} decimal places")
+        units = int(scaled)
+        digits = str(abs(units)).zfill(length)
+        if len(digits) > length:
+            raise ValueError(f"{spec.name}: {value} does not fit in {length} digits")
+        data = codecs.encode(digits, code_page)
+        if units < 0:
+            data = data[:-1] + bytes((data[-1] & 0x0F | 0xD0,))
+        return data
+    return encode
+
+
+def raw_encoder(spec, code_page):
+    """BIT/HEX fields: bytes, hex strings or integers"""
+    length = spec.length
+
+    def encode(value):
+        if isinstance(value, str):
+            value = bytes.fromhex(value)
+        elif isinstance(value, int):
+            value = value.to_bytes(length, "big")
+        if len(value) != length:
+            raise ValueError(f"{spec.name}: expected {length} bytes, got {len(value)}")
+        return bytes(value)
+    return encode
+
+
+# Encoder factory per field kind (the inverse of FIELD_KINDS); SPARE fields are left zero
+FIELD_ENCODERS = {
+    "CHAR": text_encoder,
+    "BIN": bin_encoder,
+    "DATE": date_encoder,
+    "PIC": pic_encoder,
+    "BIT": raw_encoder,
+    "CCR": raw_encoder,
+    "HEX": raw_encoder,
+}
+
+
+class EncoderPlan:
+    """Record template and per-field encoders for one record type, compiled once
+
+    The template holds the header and BTI with CHAR and PIC fields blank
+    (EBCDIC spaces) and everything else zero, so an encoded record only
+    touches the fields it is given.
+    """
+
+    def __init__(self, record_type, code_page="cp037"):
+        self.record_type = record_type
+        self.layout = RECORD_LAYOUTS.get(record_type)
+        self.variable_offset = self.layout.variable_offset if self.layout else None
+        specs = list(HEADER_PLAN.fields)
+        if self.layout is not None:
+            specs += [spec for spec in self.layout.plan.fields
+                      if self.variable_offset is None or spec.offset < self.variable_offset]
+        size = max(spec.end for spec in specs)
+        if self.variable_offset is not None:
+            size = self.variable_offset
+
+        template = bytearray(size)
+        self.encoders = {}
+        self.kinds = {}
+        self.decimal_slices = {}  # PIC field name -> slice of its decimal indicator field
+        for spec in specs:
+            factory = FIELD_ENCODERS.get(spec.kind)
+            if factory is None:
+                continue
+            if spec.kind in ("CHAR", "PIC"):
+                template[spec.slice] = b"\x40" * spec.length
+            self.encoders[spec.name] = (spec.slice, factory(spec, code_page))
+            self.kinds[spec.name] = spec.kind
+            if spec.kind == "PIC" and spec.decimal_slice is not None:
+                self.decimal_slices[spec.name] = spec.decimal_slice
+        template[0:2] = RECORD_ID
+        template[TYPE_SLICE] = codecs.encode(record_type.ljust(3)[:3], code_page)
+        self.template = bytes(template)
+
+    def field_encoder(self, name):
+        """(slice, encode function) for a field of this record type"""
+        encoder = self.encoders.get(name)
+        if encoder is None:
+            raise ValueError(f"Unknown field for {self.record_type}: {name}")
+        return encoder
+
+    def sequence_encoder(self, name):
+        """(slice, encode function) writing a running number into a field
+
+        CHAR fields get zero-padded digits and PIC fields the number in units
+        of their last decimal place, whatever their decimal indicator says.
+        """
+        field_slice, encode = self.field_encoder(name)
+        kind = self.kinds[name]
+        if kind == "CHAR":
+            width = field_slice.stop - field_slice.start
+            return field_slice, lambda number: encode(str(number).zfill(width))
+        if kind == "PIC":
+            return field_slice, lambda number: encode(number, 0)
+        return field_slice, encode
+
+    def encode(self, values=None, items=None):
+        """Record bytes for {field name: value} and encoded variable data items
+
+        items is a list of (type id, payload bytes). ND5FDNAB is set to the
+        record length and ND5FDCIR to the item count unless given in values.
+        PIC amounts are scaled by their decimal indicator field (ND5FDTDI, ...).
+        """
+        data = bytearray(self.template)
+        scaled = []
+        for name, value in (values or {}).items():
+            field_slice, encode = self.field_encoder(name)
+            if name in self.decimal_slices:
+                scaled.append((field_slice, encode, value, self.decimal_slices[name]))
+            else:
+                data[field_slice] = encode(value)
+        # After the indicators are in place
+        for field_slice, encode, value, decimal_slice in scaled:
+            data[field_slice] = encode(value, decimal_places(data[decimal_slice]))
+        if self.variable_offset is not None:
+            data += encode_items(items or ())
+            if not values or "ND5FDCIR" not in values:
+                data[CIR_SLICE] = len(items or ()).to_bytes(2, "big")
+        elif items:
+            raise ValueError(f"{self.record_type} records have no variable data items")
+        if not values or "ND5FDNAB" not in values:
+            data[NAB_SLICE] = len(data).to_bytes(2, "big")
+        return bytes(data)
+
+
+def encode_item(type_id, payload):
+    """One variable data item: type id, 2-byte total length, payload"""
+    total_length = ITEM_HEADER_SIZE + len(payload)
+    if not 0 <= type_id <= 0xFF or type_id == ITEM_END_MARKER:
+        raise ValueError(f"Invalid data item type: {type_id}")
+    if total_length > 0xFFFF:
+        raise ValueError(f"Data item {type_id} is too long ({len(payload)} bytes)")
+    return bytes([type_id]) + total_length.to_bytes(2, "big") + payload
+
+
+def encode_items(items):
+    """Item area for (type id, payload) pairs, closed by the end marker"""
+    return b"".join(encode_item(type_id, payload) for type_id, payload in items) + bytes([ITEM_END_MARKER])
+
+
+def encode_subfields(values, subfields, length, code_page):
+    """Fixed subfield structure from {subfield name or identifier: text}, space padded"""
+    data = bytearray(b"\x40" * length)
+    by_key = {}
+    for name, offset, field_length, end in subfields:
+        by_key[name] = by_key[subfield_identifier(name)] = (offset, field_length)
+    for key, value in values.items():
+        if key not in by_key:
+            raise ValueError(f"Unknown subfield: {key}")
+        offset, field_length = by_key[key]
+        raw = codecs.encode(str(value), code_page)
+        if len(raw) > field_length:
+            raise ValueError(f"Subfield {key}: '{value}' is longer than {field_length} bytes")
+        data[offset:offset + len(raw)] = raw
+    return bytes(data)
+
+
+def encode_reps_data(values, code_page="cp037"):
+    """221-byte REPS payload (item 71) from RepsRow-style subfield values"""
+    return encode_subfields(values, REPS_SUBFIELDS, REPS_LENGTH, code_page)
+
+
+def encode_segment_data(segments, code_page="cp037"):
+    """Itinerary payload (item 74): one 26-byte segment per SegmentRow-style dict"""
+    return b"".join(encode_subfields(segment, SEGMENT_SUBFIELDS, SEGMENT_LENGTH, code_page) for segment in segments)
+
+
+def item_payload(item, code_page="cp037"):
+    """(type id, payload) for a JSON item: {"type": n} plus "text", "hex", "reps" or "segments" """
+    type_id = int(item["type"])
+    if "reps" in item:
+        return type_id, encode_reps_data(item["reps"], code_page)
+    if "segments" in item:
+        return type_id, encode_segment_data(item["segments"], code_page)
+    if "hex" in item:
+        return type_id, bytes.fromhex(item["hex"])
+    return type_id, codecs.encode(item.get("text", ""), code_page)
+
+
+class RecordEncoder:
+    """Encodes records of any type with cached EncoderPlans"""
+
+    def __init__(self, code_page="cp037"):
+        get_ebcdic_table(code_page)  # validates the code page
+        self.code_page = code_page
+        self.plans = {}
+
+    def get_plan(self, record_type):
+        plan = self.plans.get(record_type)
+        if plan is None:
+            plan = self.plans[record_type] = EncoderPlan(record_type, self.code_page)
+        return plan
+
+    def encode(self, record_type, values=None, items=None):
+        """Record bytes for a record type, {field name: value} and (type id, payload) items"""
+        return self.get_plan(record_type.upper()).encode(values, items)
+
+    def encode_spec(self, spec):
+        """Record bytes for a JSON record spec ({"record_type", "fields", "items"})"""
+        items = [item_payload(item, self.code_page) for item in spec.get("items", ())]
+        return self.encode(spec["record_type"], spec.get("fields"), items)
+
+
+def gutter_translation(code_page):
+    """bytes.translate table mapping EBCDIC bytes to the dump's printable ASCII text column"""
+    text = get_ebcdic_table(code_page)
+    return bytes(ord(char) if " " <= char <= "~" else ord(".") for char in text)
+
+
+class DumpWriter:
+    """Streams records to a displacement-format hex dump or a raw binary file"""
+
+    def __init__(self, path, binary=False, code_page="cp037"):
+        self.binary = binary
+        self.gutter = gutter_translation(code_page)
+        self.file = open(path, "wb", buffering=WRITE_BUFFER_SIZE)
+        self.labels = []
+        self.record_count = 0
+
+    def offset_labels(self, line_count):
+        labels = self.labels
+        while len(labels) < line_count:
+            labels.append(f"{len(labels) * DUMP_LINE_BYTES:03X} ")
+        return labels
+
+    def format_dump(self, data):
+        """Dump text of one record: 16 bytes per line in 4-byte words, then the '**' text gutter"""
+        words = data.hex(" ", -4).upper()
+        text = data.translate(self.gutter).decode("ascii")
+        line_count = (len(data) + DUMP_LINE_BYTES - 1) // DUMP_LINE_BYTES
+        labels = self.offset_labels(line_count)
+        # Each full line is 36 characters of words: four 8-digit words, each followed by a space
+        return "".join(
+            f"{labels[line]}{words[line * 36:line * 36 + 35].rstrip()} ** {text[line * 16:line * 16 + 16]}\n"
+            for line in range(line_count)
+        )
+
+    def write(self, data):
+        if self.binary:
+            self.file.write(data)
+        else:
+            self.file.write(self.format_dump(data).encode("ascii"))
+        self.record_count += 1
+
+    def write_records(self, records):
+        for data in records:
+            self.write(data)
+        return self.record_count
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_sequenced_records(templates, count, sequence_field=None, start=1):
+    """Cycle (EncoderPlan, record bytes) templates count times, numbering sequence_field from start
+
+    Only the sequence field's bytes change, so no record is re-encoded.
+    Templates whose layout has no such field are written unchanged; it is
+    an error only when no template has it.
+    """
+    encoders = [None] * len(templates)
+    if sequence_field:
+        encoders = [plan.sequence_encoder(sequence_field) if sequence_field in plan.encoders else None
+                    for plan, data in templates]
+        if not any(encoders):
+            raise ValueError(f"Unknown sequence field: {sequence_field}")
+    for number in range(start, start + count):
+        index = (number - start) % len(templates)
+        data = templates[index][1]
+        if encoders[index] is None:
+            yield data
+            continue
+        field_slice, encode = encoders[index]
+        record = bytearray(data)
+        record[field_slice] = encode(number)
+        yield bytes(record)
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="D5FD record encoder")
+    arg_parser.add_argument("input_file", help="JSON Lines record specs")
+    arg_parser.add_argument("output_file", help="hex dump (or raw binary) file to write")
+    arg_parser.add_argument("--binary", action="store_true", help="write raw EBCDIC binary instead of a hex dump")
+    arg_parser.add_argument("--count", type=int, help="write this many records, cycling the input records")
+    arg_parser.add_argument("--sequence", help="field given a running number per written record (e.g. ND5FDTKN); "
+                                               "records whose layout has no such field are written unchanged")
+    arg_parser.add_argument("--code-page", default="cp037", choices=CODE_PAGES, help="EBCDIC code page")
+    return arg_parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+
+    try:
+        if not os.path.exists(args.input_file):
+            print(f"Error: Input file '{args.input_file}' not found!")
+            return
+
+        encoder = RecordEncoder(args.code_page)
+        with open(args.input_file, encoding="utf-8") as f:
+            specs = [json.loads(line, parse_float=Decimal) for line in f if line.strip()]
+        templates = [(encoder.get_plan(spec["record_type"].upper()), encoder.encode_spec(spec)) for spec in specs]
+        if not templates:
+            print(f"Error: No records in '{args.input_file}'")
+            return
+
+        count = args.count if args.count is not None else len(templates)
+        records = iter_sequenced_records(templates, count, args.sequence)
+        with DumpWriter(args.output_file, args.binary, args.code_page) as writer:
+            record_count = writer.write_records(records)
+
+        print(f"Encoding completed!")
+        print(f"Records written: {record_count}")
+        print(f"Output file: {args.output_file}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+D5FD Columnar Export
+Writes parsed records as tables: one table per record layout (one row per
+record, columns from the layout tables) plus child tables of variable data
+items, REPS data and flight segments keyed by record number. Rows are
+written in row groups so memory stays bounded on large extracts.
+"""
+
+import csv
+import datetime
+import json
+import os
+import time
+from decimal import Decimal
+
+from d5fd_file_parser import HEADER_PLAN, RECORD_LAYOUTS, RepsRow, SegmentRow
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+RECORD_KEY_COLUMNS = ["record_number", "record_type"]
+
+ITEM_COLUMNS = [
+    "record_number", "item_number", "offset", "type_id", "name",
+    "total_length", "data_hex", "text",
+]
+
+# Table used for records without a known layout (header columns only)
+UNKNOWN_TABLE = "UNKNOWN"
+
+# Child table of variable data items
+ITEM_TABLE = "items"
+
+# Child tables of REPS (item 71) subfields and itinerary (item 74) segments
+REPS_TABLE = "reps"
+SEGMENT_TABLE = "segments"
+
+REPS_COLUMNS = ["record_number", "item_number"] + list(RepsRow._fields)
+SEGMENT_COLUMNS = ["record_number", "item_number", "segment_number"] + list(SegmentRow._fields)
+
+LAYOUTS_BY_NAME = {layout.name: layout for layout in RECORD_LAYOUTS.values()}
+
+
+def parquet_available():
+    return pq is not None
+
+
+def export_value(value):
+    """Convert a typed field value to a CSV/JSON friendly value"""
+    if isinstance(value, (datetime.date, Decimal)):
+        return str(value)
+    return value
+
+
+def layout_specs(layout):
+    """Non-spare field specs exported for a layout (header fields first)"""
+    specs = [spec for spec in HEADER_PLAN.fields if spec.kind != "SPARE"]
+    if layout is not None:
+        specs += [spec for spec in layout.plan.fields if spec.kind != "SPARE"]
+    return specs
+
+
+def record_columns(layout):
+    """Stable column list for a layout's record table"""
+    return RECORD_KEY_COLUMNS + [spec.name for spec in layout_specs(layout)]
+
+
+def record_row(record_number, record, specs):
+    """One table row for a ParsedRecord, aligned with record_columns()"""
+    values = {field.name: field.value for field in record.header}
+    values.update((field.name, field.value) for field in record.fields)
+    return [record_number, record.record_type] + [export_value(values.get(spec.name)) for spec in specs]
+
+
+def item_rows(record_number, record):
+    """Child table rows for a ParsedRecord's variable data items"""
+    return [
+        [record_number, item.number, item.offset, item.type_id, item.name,
+         item.total_length, item.data.hex().upper(), item.text]
+        for item in record.items or ()
+    ]
+
+
+def reps_rows(record_number, record):
+    """REPS table rows for a ParsedRecord (subfields missing from a short payload are None)"""
+    rows = []
+    for item in record.items or ():
+        if item.reps is not None:
+            texts = [sub.text for sub in item.reps]
+            rows.append([record_number, item.number] + texts + [None] * (len(RepsRow._fields) - len(texts)))
+    return rows
+
+
+def segment_rows(record_number, record):
+    """Flight segment table rows for a ParsedRecord"""
+    return [
+        [record_number, item.number, segment_number] + [sub.text for sub in segment]
+        for item in record.items or ()
+        if item.segments is not None
+        for segment_number, segment in enumerate(item.segments, 1)
+    ]
+
+
+# Exported field specs per record table, built once
+TABLE_SPECS = {name: layout_specs(layout) for name, layout in LAYOUTS_BY_NAME.items()}
+TABLE_SPECS[UNKNOWN_TABLE] = layout_specs(None)
+
+
+def record_table_rows(record_number, record):
+    """(table name, row) pairs for a ParsedRecord: its record row, then its item rows"""
+    table_name = record.layout.name if record.layout else UNKNOWN_TABLE
+    table_rows = [(table_name, record_row(record_number, record, TABLE_SPECS[table_name]))]
+    if record.items:
+        table_rows.extend((ITEM_TABLE, row) for row in item_rows(record_number, record))
+        table_rows.extend((REPS_TABLE, row) for row in reps_rows(record_number, record))
+        table_rows.extend((SEGMENT_TABLE, row) for row in segment_rows(record_number, record))
+    return table_rows
+
+
+class CsvTableWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlTableWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write_rows(self, rows):
+        self.file.write("".join(json.dumps(dict(zip(self.columns, row))) + "\n" for row in rows))
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetTableWriter:
+    def __init__(self, path, columns, types):
+        self.schema = pa.schema([pa.field(name, column_type) for name, column_type in zip(columns, types)])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_rows(self, rows):
+        arrays = [pa.array(column, type=field.type) for column, field in zip(zip(*rows), self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def parquet_types(specs):
+    """Arrow column types for record_columns(); PIC amounts stay exact as text"""
+    if pa is None:
+        return None
+    types = [pa.int64(), pa.string()]
+    for spec in specs:
+        types.append(pa.int64() if spec.kind == "BIN" else pa.string())
+    return types
+
+
+class RecordExporter:
+    """Exports ParsedRecords to per-layout tables plus a variable data item table
+
+    For output "out.csv" the tables are "out.TAR.csv", "out.MIR.csv", ...,
+    "out.items.csv", "out.reps.csv" and "out.segments.csv".
+    """
+
+    def __init__(self, output_path, export_format, row_group_size=10000):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        if export_format == "parquet" and not parquet_available():
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.export_format = export_format
+        self.row_group_size = row_group_size
+        stem, ext = os.path.splitext(output_path)
+        self.stem = stem
+        self.ext = ext or "." + export_format
+        self.tables = {}      # table name -> (writer, pending rows)
+        self.paths = []
+
+    def table_path(self, table_name):
+        return f"{self.stem}.{table_name}{self.ext}"
+
+    def open_table(self, table_name, columns, types):
+        path = self.table_path(table_name)
+        if self.export_format == "csv":
+            writer = CsvTableWriter(path, columns)
+        elif self.export_format == "jsonl":
+            writer = JsonlTableWriter(path, columns)
+        else:
+            writer = ParquetTableWriter(path, columns, types)
+        self.paths.append(path)
+        return writer
+
+    def get_table(self, table_name):
+        table = self.tables.get(table_name)
+        if table is None:
+            if table_name == ITEM_TABLE:
+                columns = ITEM_COLUMNS
+                types = None
+                if pa is not None:
+                    types = [pa.int64(), pa.int64(), pa.int64(), pa.int64(), pa.string(),
+                             pa.int64(), pa.string(), pa.string()]
+            elif table_name in (REPS_TABLE, SEGMENT_TABLE):
+                columns = REPS_COLUMNS if table_name == REPS_TABLE else SEGMENT_COLUMNS
+                key_count = 2 if table_name == REPS_TABLE else 3
+                types = None
+                if pa is not None:
+                    types = [pa.int64()] * key_count + [pa.string()] * (len(columns) - key_count)
+            else:
+                columns = record_columns(LAYOUTS_BY_NAME.get(table_name))
+                types = parquet_types(TABLE_SPECS[table_name])
+            table = self.tables[table_name] = (self.open_table(table_name, columns, types), [])
+        return table
+
+    def add(self, record_number, record):
+        """Queue one ParsedRecord's rows"""
+        for table_name, row in record_table_rows(record_number, record):
+            self.add_row(table_name, row)
+
+    def add_row(self, table_name, row):
+        """Queue one table row; full row groups are written out"""
+        writer, rows = self.get_table(table_name)
+        rows.append(row)
+        if len(rows) >= self.row_group_size:
+            self.flush(writer, rows)
+
+    def flush(self, writer, rows):
+        if rows:
+            writer.write_rows(rows)
+            rows.clear()
+
+    def close(self):
+        for writer, rows in self.tables.values():
+            self.flush(writer, rows)
+            writer.close()
+        self.tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_records(parser, records, output_path, export_format, row_group_size=10000):
+    """Parse and export every record buffer in records; returns (record count, table paths)"""
+    return export_numbered_records(parser, enumerate(records, 1), output_path, export_format, row_group_size)
+
+
+def export_numbered_records(parser, numbered_records, output_path, export_format, row_group_size=10000):
+    """Parse and export (record number, record buffer) pairs; returns (record count, table paths)"""
+    record_count = 0
+    stats = parser.stats
+    with RecordExporter(output_path, export_format, row_group_size) as exporter:
+        for record_number, data in numbered_records:
+            record_count += 1
+            record = parser.parse_record(data)
+            if stats is None:
+                exporter.add(record_number, record)
+            else:
+                start = time.perf_counter()
+                exporter.add(record_number, record)
+                stats.add_time("render", time.perf_counter() - start)
+        paths = list(exporter.paths)
+    return record_count, paths
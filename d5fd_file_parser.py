@@ -4,759 +4,1817 @@ D5FD File-based Parser Tool
 Reads hex data from input file and writes parsed output to output file
 """
 
+import argparse
 import re
 import codecs
+import collections
+import contextlib
+import datetime
+import itertools
+import io
+import mmap
+import struct
 import sys
 import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from types import MappingProxyType
 
-class D5FDFileParser:
-    def __init__(self, header_size="small"):
-        self.header_size = header_size
-        # Main header fields
-        self.header_fields = [
-            # Standard Header (ND5FDHDR)
-            ("ND5FDBID", 0x000, 2, "BIT", "RECORD ID = X'D5FD'"),
-            ("ND5FDCHK", 0x002, 1, "BIT", "RECORD CODE CHECK"),
-            ("ND5FDCTL", 0x003, 1, "BIT", "CONTROL BYTE"),
-            ("ND5FDPGM", 0x004, 4, "CHAR", "LAST PROGRAM TO FILE"),
-            ("ND5FDFCH", 0x008, 4, "FA4", "FORWARD CHAIN ADDRESS"),
-            ("ND5FDBCH", 0x00C, 4, "FA4", "BACKCHAIN ADDRESS"),
-            ("SPARE1", 0x010, 16, "SPARE", "SPARES"),
-            # BARTS Control Header (ND5FDCHD)
-            ("ND5FDTYP", 0x020, 3, "CHAR", "BARTS RECORD TYPE"),
-            ("ND5FDETK", 0x023, 1, "CHAR", "ELECTRONIC DOCUMENT"),
-            ("ND5FDBNC", 0x024, 2, "CHAR", "BLOCK NBR IN CHAIN"),
-            ("ND5FDNBC", 0x026, 2, "CHAR", "TOTAL NBR OF BLOCKS"),
-            ("ND5FDSN1", 0x028, 2, "BIN", "SEQUENCE NBR OF BLOCK"),
-            ("ND5FDSN2", 0x02A, 2, "BIN", "TOTAL NBR OF BLOCKS SENT"),
-            ("ND5FDNAB", 0x02C, 2, "BIN", "NEXT AVAILABLE BYTE"),
-            ("ND5FDCIR", 0x02E, 2, "BIN", "COUNT OF DATA ITEMS"),
-            # System Security Controls (ND5FDSSC)
-            ("ND5FDRTI", 0x030, 1, "BIT", "RETRANSMIT INDICATOR"),
-            ("ND5FDEXT", 0x031, 1, "CHAR", "XT TAXES ELIMINATED"),
-            ("ND5FDMUR", 0x032, 1, "CHAR", "BARTS USER INDICATOR"),
-            ("SPARE2", 0x033, 1, "SPARE", "SPARE"),
-            ("ND5FDH01", 0x034, 4, "BIN", "HASHTOTAL #1"),
-            ("ND5FDH02", 0x038, 4, "BIN", "HASHTOTAL #2"),
-            ("ND5FDH03", 0x03C, 2, "BIN", "HASHTOTAL #3"),
-            ("ND5FDH04", 0x03E, 2, "BIN", "HASHTOTAL #4"),
-            ("ND5FDH05", 0x040, 2, "BIN", "HASHTOTAL #5"),
-            ("ND5FDH06", 0x042, 2, "BIN", "HASHTOTAL #6"),
-            ("ND5FDH07", 0x044, 2, "BIN", "HASHTOTAL #7"),
-            ("ND5FDH08", 0x046, 2, "BIN", "HASHTOTAL #8"),
-            ("ND5FDH09", 0x048, 4, "BIN", "HASHTOTAL #9"),
-            ("ND5FDH10", 0x04C, 2, "BIN", "HASHTOTAL #10"),
-            ("ND5FDH11", 0x04E, 2, "BIN", "HASHTOTAL #11"),
-            ("ND5FDH12", 0x050, 4, "BIN", "HASHTOTAL #12"),
-            ("SPARE3", 0x054, 7, "SPARE", "SPARES"),
-            ("ND5FDTER", 0x05B, 3, "BIT", "CONNECTIVITY TRANSMISSION ERRORS"),
-            ("ND5FDTCI", 0x05E, 2, "BIN", "TOTAL COUNT OF ITINERARY SEGMENTS"),
-        ]
-        
-        # TAR structure fields (ND5FDTAR) - offset from 0x060
-        self.tar_fields = [
-            ("ND5FDTKN", 0x000, 14, "CHAR", "TICKET NUMBER"),
-            ("ND5FDCTN", 0x00E, 3, "CHAR", "CONJUNCTION TICKET NBR RANGE"),
-            ("ND5FDPNL", 0x011, 6, "CHAR", "PNR LOCATOR"),
-            ("ND5FDCCP", 0x017, 1, "BIT", "CREDIT CARD RESTRICTIONS"),
-            ("ND5FDBDI", 0x018, 1, "CHAR", "BASE FARE DECIMAL INDICATOR"),
-            ("ND5FDBEI", 0x019, 1, "CHAR", "INVOL/REISSUE BACKGROUND"),
-            ("ND5FDTBS", 0x01A, 8, "PIC", "BASE FARE AMOUNT"),
-            ("ND5FDTCC", 0x022, 3, "CHAR", "BASE FARE CURRENCY CODE"),
-            ("ND5FDFCC", 0x025, 3, "CHAR", "TOTAL FARE CURRENCY CODE"),
-            ("ND5FDTDI", 0x028, 1, "CHAR", "TOTAL FARE DECIMAL INDICATOR"),
-            ("SPARE_TAR1", 0x029, 1, "SPARE", "SPARE BYTE"),
-            ("ND5FDTTF", 0x02A, 8, "PIC", "TOTAL FARE"),
-            ("ND5FDFTA", 0x032, 8, "PIC", "FARE TAX TOTAL AMOUNT"),
-            ("ND5FDPTA", 0x03A, 8, "PIC", "FORM OF PAYMENT TAX TOTAL AMOUNT"),
-            ("SPARE_TAR2", 0x042, 24, "SPARE", "SPARE BYTES"),
-            ("ND5FDFPI", 0x05A, 1, "BIT", "FARE PRICING INDICATOR"),
-            ("ND5FDFTI", 0x05B, 2, "CHAR", "FARE TYPE INDICATOR"),
-            ("SPARE_TAR3", 0x05D, 3, "SPARE", "SPARE BYTES"),
-            ("ND5FDTME", 0x060, 4, "CHAR", "TIME OF ACTIVITY (HHMM)"),
-            ("ND5FDDTE", 0x064, 2, "BIN", "DATE OF ACTIVITY"),
-            ("ND5FDCIC", 0x066, 3, "CHAR", "CITY CODE"),
-            ("SPARE_TAR4", 0x069, 2, "SPARE", "SPARES - CITY CODE EXPANSION"),
-            ("ND5FDOTN", 0x06B, 4, "CHAR", "OFFICE TYPE / NAME CODE"),
-            ("SPARE_TAR5", 0x06F, 1, "SPARE", "SPARE BYTE"),
-            ("ND5FDANS", 0x070, 5, "CHAR", "AGENT NUMERIC SINE"),
-            ("ND5FDAGI", 0x075, 2, "CHAR", "AGENT ID"),
-            ("SPARE_TAR6", 0x077, 1, "SPARE", "SPARE BYTE"),
-            ("ND5FDASA", 0x078, 3, "BIT", "SET ADDR OF TICKET CREATION"),
-            ("SPARE_TAR7", 0x07B, 1, "SPARE", "SPARE BYTE"),
-            ("ND5FDIAC", 0x07C, 2, "CHAR", "ISSUING AIRLINE CODE"),
-            ("SPARE_TAR8", 0x07E, 1, "SPARE", "SPARE - AIRLINE CODE EXPANSION"),
-            ("ND5FDFPP", 0x07F, 1, "CHAR", "PURPOSE OF FOP"),
-            ("ND5FDPTP", 0x080, 1, "CHAR", "PASSENGER TYPE CODE (PTC)"),
-            ("SPARE_TAR9", 0x081, 7, "SPARE", "SPARE BYTES"),
-            ("ND5FDTDF", 0x088, 1, "CHAR", "TICKET DATA ITEM AREA"),
-        ]
-        
-        # ATR structure fields (ND5FDATR) - offset from 0x060
-        self.atr_fields = [
-            ("ND5FDWOU", 0x000, 2, "BIN", "COUNT OF TRANSACTION ENTRIES"),
-            ("SPARE_ATR1", 0x002, 2, "SPARE", "SPARES"),
-        ]
-        
-        # AIR structure fields (ND5FDAIR) - offset from 0x060
-        self.air_fields = [
-            ("ND5FDRTD", 0x000, 7, "CHAR", "AGENT ID"),
-            ("SPARE_AIR1", 0x007, 1, "SPARE", "SPARE"),
-            ("ND5FDRTC", 0x008, 2, "BIN", "COUNT OF TRANSACTION CODE ITEMS"),
-        ]
-        
-        # IFR structure fields (ND5FDIFR) - offset from 0x060
-        self.ifr_fields = [
-            ("ND5FDCNT", 0x000, 2, "BIN", "COUNT OF IN-FLIGHT SALES DATA ENTRIES"),
-            ("SPARE_IFR1", 0x002, 2, "SPARE", "SPARES"),
-        ]
-        
-        # BOW structure fields (ND5FDBOW) - offset from 0x060
-        self.bow_fields = [
-            ("ND5FDDBD", 0x000, 7, "CHAR", "CREATION DATE"),
-            ("ND5FDSSS", 0x007, 3, "CHAR", "STATION CODE"),
-            ("ND5FDSLC", 0x00A, 4, "CHAR", "LOCATION CODE"),
-            ("ND5FDPAD", 0x00E, 3, "BIT", "PRINTER ADDRESS"),
-            ("ND5FDAII", 0x011, 8, "CHAR", "VOID AGENT ID"),
-            ("SPARE_BOW1", 0x019, 1, "SPARE", "SPARE"),
-            ("ND5FDSID", 0x01A, 10, "CHAR", "SECURITY ID"),
-            ("ND5FDBTA", 0x024, 4, "BIT", "BTI FILE ADDRESS"),
-        ]
-        
-        # COL structure fields (ND5FDCOL) - offset from 0x060
-        self.col_fields = [
-            ("ND5FDXFC", 0x000, 4, "CHAR", "OFFICE CODE"),
-            ("ND5FDXTY", 0x004, 3, "CHAR", "CITY CODE"),
-            ("SPARE_COL1", 0x007, 2, "SPARE", "SPARES"),
-            ("ND5FDXLN", 0x009, 1, "BIT", "COLLECTION REPORT NUMBER"),
-            ("ND5FDXLD", 0x00A, 2, "BIN", "COLLECTION REPORT DATE"),
-            ("ND5FDXFD", 0x00C, 2, "BIN", "COLLECTION REPORT FROM DATE"),
-            ("ND5FDXAI", 0x00E, 7, "CHAR", "SUMMARY AGENT ID"),
-            ("ND5FDXID", 0x015, 7, "CHAR", "CLOSEOUT AGENT ID"),
-            ("ND5FDXOD", 0x01C, 2, "BIN", "CLOSEOUT DATE"),
-            ("ND5FDXON", 0x01E, 1, "BIT", "CLOSEOUT NUMBER"),
-            ("ND5FDXI1", 0x01F, 1, "BIT", "AGENT TRANSACTION INDICATOR"),
-            ("ND5FDRDF", 0x020, 1, "CHAR", "COLLECTION REPORT DATA"),
-            ("SPARE_COL2", 0x021, 3, "SPARE", "SPARES"),
-        ]
+# Binary day-number fields shown as DDMMMYY dates
+DATE_FIELDS = frozenset({
+    "ND5FDDTE", "ND5FDXLD", "ND5FDXFD", "ND5FDXOD", "ND5FDVVD",
+    "ND5FDVEP", "ND5FDBNT", "ND5FDMDT", "ND5FDMFD", "ND5FDVCD",
+    "ND5FDDTI", "ND5FDDCI", "ND5FDFDT",
+})
 
+# Decimal indicator field of each amount field; the indicator is one EBCDIC
+# digit giving the amount's decimal places (PIC amounts without one are read
+# with two implied decimals)
+AMOUNT_DECIMAL_INDICATORS = {
+    "ND5FDTBS": "ND5FDBDI",
+    "ND5FDTTF": "ND5FDTDI", "ND5FDFTA": "ND5FDTDI", "ND5FDPTA": "ND5FDTDI",
+    "ND5FDVVM1": "ND5FDVCI", "ND5FDVVM2": "ND5FDVCI", "ND5FDVVM3": "ND5FDVCI",
+    "ND5FDVAT": "ND5FDVCI", "ND5FDVBS": "ND5FDVCI", "ND5FDATA": "ND5FDVCI",
+    "ND5FDQCT": "ND5FDQUS", "ND5FDQAM1": "ND5FDQUS", "ND5FDQAM2": "ND5FDQUS", "ND5FDQAM3": "ND5FDQUS",
+    "ND5FDMBA": "ND5FDMBI",
+}
 
-        # MIR structure fields (ND5FDMIR) - for MAR record type - offset from 0x060
-        self.mir_fields = [
-            # Sales Location Group (ND5FDVLO)
-            ("ND5FDVFC", 0x000, 4, "CHAR", "OFFICE LOCATION"),
-            ("ND5FDVTY", 0x004, 3, "CHAR", "CITY CODE"),
-            ("SPARE_MIR1", 0x007, 2, "SPARE", "SPARES - CITY CODE EXPANSION"),
-            
-            # Basic Transaction Info
-            ("ND5FDVID", 0x009, 7, "CHAR", "CREATING AGENT ID"),
-            ("ND5FDVVD", 0x010, 2, "BIN", "ACTIVITY DATE"),
-            ("ND5FDVYM", 0x012, 2, "BIN", "ACTIVITY TIME"),
-            ("ND5FDVOC", 0x014, 14, "CHAR", "DOCUMENT NUMBER"),
-            ("ND5FDVOJ", 0x022, 2, "CHAR", "CONJUNCTION TICKET NUMBER"),
-            ("ND5FDVCR", 0x024, 3, "CHAR", "DOCUMENT CURRENCY CODE"),
-            ("ND5FDVCA", 0x027, 6, "CHAR", "CREDIT CARD APPROVAL CODE"),
-            ("ND5FDVOP", 0x02D, 37, "CHAR", "FORM OF PAYMENT TEXT"),
-            ("ND5FDVOU", 0x052, 2, "BIN", "COUNT OF TRANSACTION CODE ITEMS"),
-            ("ND5FDVTC", 0x054, 2, "BIN", "COUNT OF TAX TYPE ITEMS"),
-            ("ND5FDVCI", 0x056, 1, "CHAR", "DOCUMENT DECIMAL INDICATOR"),
-            ("ND5FDCRD", 0x057, 1, "BIT", "CREDIT CARD RESTRICTIONS"),
-            
-            # Transaction Code Items (3 x 12 bytes)
-            ("ND5FDVVM1", 0x058, 4, "BIN", "TRANSACTION AMOUNT 1"),
-            ("ND5FDVYP1", 0x05C, 3, "CHAR", "TRANSACTION CODE 1"),
-            ("ND5FDVPF1", 0x05F, 1, "CHAR", "PASSENGER FACILITY CHARGE INDICATOR 1"),
-            ("SPARE_CTI1", 0x060, 4, "SPARE", "SPARE BYTES 1"),
-
-            ("ND5FDVVM2", 0x064, 4, "BIN", "TRANSACTION AMOUNT 2"),
-            ("ND5FDVYP2", 0x068, 3, "CHAR", "TRANSACTION CODE 2"),
-            ("ND5FDVPF2", 0x06B, 1, "CHAR", "PASSENGER FACILITY CHARGE INDICATOR 2"),
-            ("SPARE_CTI2", 0x06C, 4, "SPARE", "SPARE BYTES 2"),
-
-            ("ND5FDVVM3", 0x070, 4, "BIN", "TRANSACTION AMOUNT 3"),
-            ("ND5FDVYP3", 0x074, 3, "CHAR", "TRANSACTION CODE 3"),
-            ("ND5FDVPF3", 0x077, 1, "CHAR", "PASSENGER FACILITY CHARGE INDICATOR 3"),
-            ("SPARE_CTI3", 0x078, 4, "SPARE", "SPARE BYTES 3"),
-            
-            # Tax Type Items (3 x 8 bytes)
-            ("ND5FDTTI", 0x07C, 24, "CHAR", "TAX TYPE ITEMS (3x8)"),
-            
-            # Transaction Amounts
-            ("ND5FDVAT", 0x094, 4, "BIN", "TRANSACTION TOTAL AMOUNT"),
-            ("ND5FDVBS", 0x098, 4, "BIN", "ADDITIONAL COLLECTION BASE AMOUNT"),
-            ("SPARE_MIR2", 0x09C, 2, "SPARE", "SPARE BYTES"),
-            ("ND5FDVNT", 0x09E, 2, "BIN", "COUNT OF ADDITIONAL COLLECTION TAX ITEMS"),
-            
-            # Additional Collection Tax Items (3 x 8 bytes)
-            ("ND5FDATE", 0x0A0, 24, "CHAR", "ADDITIONAL COLLECTION TAX ITEMS (3x8)"),
-            
-            ("ND5FDATA", 0x0B8, 4, "BIN", "ADDITIONAL COLLECTION TOTAL AMOUNT"),
-            ("ND5FDVEP", 0x0BC, 2, "BIN", "DEPARTURE DATE"),
-            ("ND5FDVRG", 0x0BE, 3, "CHAR", "ORIGIN STATION"),
-            ("SPARE_MIR3", 0x0C1, 2, "SPARE", "SPARES - STATION CODE EXPANSION"),
-            ("ND5FDACI", 0x0C3, 1, "CHAR", "REPS ACCOUNTING SYSTEM CODE"),
-            
-            # Routing Data (4 x 8 bytes)
-            ("ND5FDVTG", 0x0C4, 32, "CHAR", "ROUTING DATA (4x8)"),            
-            ("ND5FDVDN", 0x0E4, 14, "CHAR", "EXCHANGED DOCUMENT NUMBER"),
-            ("ND5FDVDC", 0x0F2, 1, "BIT", "EXCHANGED DOCUMENT INDICATOR"),
-            ("ND5FDXCG", 0x0F3, 4, "CHAR", "EXCHANGED DOCUMENT INDICATOR DATA"),
-            ("ND5FDVKT", 0x0F7, 14, "CHAR", "TICKET-BY-MAIL TICKET NUMBER"),
-            ("ND5FDVNR", 0x105, 2, "CHAR", "TICKET-BY-MAIL NUMBER RANGE"),
-            ("ND5FDVAM", 0x107, 29, "CHAR", "TICKET-BY-MAIL NAME PURCHASER"),
-            ("ND5FDQCT", 0x124, 4, "BIN", "AMOUNT TENDERED"),
-            ("ND5FDQUR", 0x128, 3, "CHAR", "CURRENCY CODE OF AMOUNT TENDERED"),
-            ("ND5FDQUS", 0x12B, 1, "CHAR", "TENDERED CURRENCY DECIMAL INDICATOR"),
-            # Transaction Code Items (3 x 8 bytes each)
-            ("ND5FDQAM1", 0x12C, 4, "BIN", "TRANSACTION AMOUNT 1"),
-            ("ND5FDQYP1", 0x130, 3, "CHAR", "TRANSACTION CODE 1"),
-            ("SPARE_QT1", 0x133, 1, "SPARE", "SPARE BYTE 1"),
-            ("ND5FDQAM2", 0x134, 4, "BIN", "TRANSACTION AMOUNT 2"),
-            ("ND5FDQYP2", 0x138, 3, "CHAR", "TRANSACTION CODE 2"),
-            ("SPARE_QT2", 0x13B, 1, "SPARE", "SPARE BYTE 2"),
-            ("ND5FDQAM3", 0x13C, 4, "BIN", "TRANSACTION AMOUNT 3"),
-            ("ND5FDQYP3", 0x140, 3, "CHAR", "TRANSACTION CODE 3"),
-            ("SPARE_QT3", 0x143, 1, "SPARE", "SPARE BYTE 3"),
-            # Tax Code Items (3 x 8 bytes each)
-            ("ND5FDQAX1", 0x144, 4, "BIN", "TAX AMOUNT 1"),
-            ("ND5FDQCD1", 0x148, 2, "CHAR", "TAX CODE 1"),
-            ("SPARE_QE1", 0x14A, 2, "SPARE", "SPARE BYTES 1"),
-            ("ND5FDQAX2", 0x14C, 4, "BIN", "TAX AMOUNT 2"),
-            ("ND5FDQCD2", 0x150, 2, "CHAR", "TAX CODE 2"),
-            ("SPARE_QE2", 0x152, 2, "SPARE", "SPARE BYTES 2"),
-            ("ND5FDQAX3", 0x154, 4, "BIN", "TAX AMOUNT 3"),
-            ("ND5FDQCD3", 0x158, 2, "CHAR", "TAX CODE 3"),
-            ("SPARE_QE3", 0x15A, 2, "SPARE", "SPARE BYTES 3"),
-            ("ND5FDQDC", 0x15C, 10, "CHAR", "DOCUMENT CURRENCY EXCHANGE RATE"),
-            ("ND5FDVPC", 0x166, 2, "BIN", "TOTAL PASSENGER COUNT FOR PFC'S"),
-            ("ND5FDCRT", 0x168, 3, "PIC", "COMMISSION RATE FOR GSA TRANSACTIONS"),
-            ("ND5FDREP", 0x16B, 14, "CHAR", "REPRINT DOCUMENT NUMBER"),
-            ("ND5FDCOM", 0x179, 11, "CHAR", "COMMISSION AMOUNT"),
-            ("ND5FDCLT", 0x184, 2, "CHAR", "REPS CARD LEVEL RESULTS"),
-            ("ND5FDFRE", 0x186, 10, "CHAR", "FREQUENT FLYER NUMBER"),
-            ("ND5FDRAS", 0x190, 3, "BIT", "AGENT SET ADDRESS"),
-            ("ND5FDMPS", 0x193, 1, "CHAR", "REPS AUTHORIZATION CHARACTERISTICS INDICATOR"),
-            ("ND5FDMVC", 0x194, 4, "CHAR", "REPS VALIDATION CODE"),
-            ("ND5FDMTR", 0x198, 9, "CHAR", "REPS TRANSACTION ID/BANKNET REFERENCE NUMBER"),
-            ("ND5FDMST", 0x1A1, 2, "CHAR", "REPS AUTHORIZATION RESPONSE/DOWNGRADE INDICATOR"),
-            ("ND5FDRAC", 0x1A3, 1, "CHAR", "REPS AUTHORIZATION SOURCE CODE"),
-            ("ND5FDPOS", 0x1A4, 2, "CHAR", "REPS POS ENTRY MODE"),
-            ("ND5FDBNT", 0x1A6, 2, "BIN", "REPS BANKNET REFERENCE DATE"),
-            ("ND5FDECI", 0x1A8, 2, "CHAR", "REPS ELECTRONIC COMMERCE INDICATOR (ECI)"),
-            ("ND5FDCAV", 0x1AA, 1, "CHAR", "REPS CARDHOLDER AUTHENTICATION VERIFICATION VALUE (CAVV)"),
-            ("ND5FDTIC", 0x1AB, 1, "CHAR", "REPS CARDHOLDER ACTIVATION TERMINAL ID (CAT)"),
-            
-            # Flight Data (4 x 12 bytes)
-            ("ND5FDQFD", 0x1AC, 48, "CHAR", "ROUTING DATA (4x12)"),
-            
-            ("ND5FDVOL", 0x1DC, 1, "CHAR", "VOL/INVOL INDICATOR"),
-            ("ND5FDRSN", 0x1DD, 3, "CHAR", "REASON CODE"),
-            ("ND5FDARD", 0x1E0, 15, "CHAR", "REPS ACQUIRER REFERENCE DATA (ARD)"),
-            ("ND5FDPSD", 0x1EF, 12, "CHAR", "REPS POINT OF SERVICE DATA (PSD)"),
-            ("ND5FDAVS", 0x1FB, 1, "CHAR", "ADDRESS VERIFICATION INDICATOR"),
-            ("ND5FDRL4", 0x1FC, 4, "CHAR", "REPS LAST FOUR DIGITS OF CREDIT CARD NUMBER"),
-            ("ND5FDRSD", 0x200, 1, "CHAR", "REPS ACCOUNT STATUS DATA"),
-            ("SPARE_MIR4", 0x201, 9, "SPARE", "SPARES"),
-            ("ND5FDRTR", 0x20A, 11, "CHAR", "REPS TOKEN REQUESTOR ID DATA"),
-            ("ND5FDRTL", 0x215, 2, "CHAR", "REPS TOKEN ASSURE LEVEL DATA"),
-            ("ND5FDRSI", 0x217, 1, "CHAR", "REPS SPEND QUALIFIED INDICATOR"),
-            ("ND5FDSP1", 0x218, 1, "CHAR", "REPS SECURITY PROTOCOL"),
-            ("ND5FDTRC", 0x219, 2, "CHAR", "REPS TRANSACTION INTEGRITY CLASS (TIC)"),
-            ("ND5FDPAN", 0x21B, 35, "CHAR", "REPS PAYMENT ACCOUNT REFERENCE NUMBER"),
-            ("ND5FDADI", 0x23E, 1, "CHAR", "REPS MARKET SPECIFIC AUTHORIZATION DATA INDICATOR"),
-            ("ND5FDSTA", 0x23F, 6, "CHAR", "REPS SYSTEM TRACE AUDIT NUMBER (STAN)"),
-            ("ND5FDTDC", 0x245, 2, "CHAR", "REPS TRANSACTION DATA CONDITION CODE"),
-            ("ND5FDPS2", 0x247, 13, "CHAR", "REPS POS DATA"),
-            ("ND5FDPRC", 0x254, 6, "CHAR", "REPS PROCESSING CODE"),
-            ("ND5FDCAN", 0x25A, 1, "CHAR", "REPS CARDHOLDER AUTHENTICATION"),
-            ("ND5FDSCI", 0x25B, 1, "CHAR", "REPS STORED CREDENTIAL INDICATOR"),
-            ("ND5FDAAV", 0x25C, 32, "CHAR", "REPS ACCOUNTHOLDER AUTHENTICATION VALUE"),
-            ("ND5FDSTI", 0x27C, 36, "CHAR", "REPS DIRECTORY SERVER TRANSACTION ID"),
-            ("ND5FDPPC", 0x2A0, 1, "CHAR", "REPS PROGRAM PROTOCOL"),
-            
-            # Contactless REPS Data - Individual Fields within ND5FDCRP Group
-            ("ND5FDAAM", 0x2A1, 13, "CHAR", "TAG=9F02 AUTHORIZED AMOUNT"),
-            ("ND5FDAIP", 0x2AE, 4, "CHAR", "TAG=82 APPLICATION INTERCHANGE PROFILE"),
-            ("ND5FDARC", 0x2B2, 16, "CHAR", "TAG=9F26 APPLICATION REQUEST CRYPTOGRAM"),
-            ("ND5FDATC", 0x2C2, 4, "CHAR", "TAG=9F36 APPLICATION TRANSACTION COUNTER"),
-            ("ND5FDAUC", 0x2C6, 4, "CHAR", "TAG=5F2A AUTHORIZATION CURRENCY CODE"),
-            ("ND5FDADT", 0x2CA, 6, "CHAR", "TAG=9A AUTHORIZATION DATE"),
-            ("ND5FDCDT", 0x2D0, 2, "CHAR", "TAG=9F27 CRYPTOGRAM INFORMATION DATA"),
-            ("ND5FDCTT", 0x2D2, 2, "CHAR", "TAG=9C CRYPTOGRAM TRANSACTION TYPE"),
-            ("ND5FDCSN", 0x2D4, 3, "CHAR", "TAG=5F34 CARD SEQUENCE NUMBER"),
-            ("ND5FDCVM", 0x2D7, 6, "CHAR", "TAG=9F34 CARDHOLDER VERIFICATION METHOD"),
-            ("ND5FDCCC", 0x2DD, 1, "CHAR", "CHIP CONDITION CODE"),
-            ("ND5FDDFN", 0x2DE, 32, "CHAR", "TAG=84 DEDICATED FILE NAME"),
-            ("ND5FDDTC", 0x2FE, 2, "CHAR", "DEVICE TYPE"),
-            ("ND5FDFFT", 0x300, 8, "CHAR", "TAG=9F6E FORM FACTOR"),
-            ("ND5FDIFD", 0x308, 16, "CHAR", "TAG=9F1E INTERFACE DEVICE (IFD) SERIAL NO"),
-            ("ND5FDIAD", 0x318, 64, "CHAR", "TAG=9F10 ISSUER APPLICATION DATA (IAD)"),
-            ("ND5FDIRO", 0x358, 24, "CHAR", "TAG=71 ISSUER SCRIPT RESULTS PART I"),
-            ("ND5FDIRT", 0x370, 18, "CHAR", "TAG=72 ISSUER SCRIPT RESULTS PART II"),
-            ("ND5FDTKD", 0x382, 2, "CHAR", "TAG=9F53 TRANSACTION CATEGORY CODE"),
-            ("ND5FDTSC", 0x384, 8, "CHAR", "TAG=9F41 TRANSACTION SEQUENCE COUNTER"),
-            ("ND5FDTAV", 0x38C, 4, "CHAR", "TAG=9F09 TERMINAL APPLICATION VERSION NO"),
-            ("ND5FDTCP", 0x390, 6, "CHAR", "TAG=9F33 TERMINAL CAPABILITIES PROFILE"),
-            ("ND5FDTCO", 0x396, 4, "CHAR", "TAG=9F1A TERMINAL COUNTRY CODE"),
-            ("ND5FDTTD", 0x39A, 6, "CHAR", "TAG=9A TERMINAL TRANSMISSION DATE"),
-            ("ND5FDTTY", 0x3A0, 2, "CHAR", "TAG=9F35 TERMINAL TYPE"),
-            ("ND5FDTVR", 0x3A2, 10, "CHAR", "TAG=95 TERMINAL VERIFICATION RESULTS"),
-            ("ND5FDUNN", 0x3AC, 8, "CHAR", "TAG=9F37 UNPREDICTABLE NUMBER"),
-            ("ND5FDMPE", 0x3B4, 32, "CHAR", "PAYMENT REFERENCE ID"),
-
-            # Fill remaining space to complete 3998 bytes  
-            ("MIR_REMAINING", 0x3D4, 3998-0x3D4, "SPARE", "REMAINING MIR STRUCTURE DATA"),
-        ]
-        
-        # MAR structure fields (ND5FDMAR) - offset from 0x060
-        self.mar_fields = [
-            # Fixed length fields (880 bytes)
-            ("SPARE_MAR1", 0x000, 2, "SPARE", "SPARES"),
-            
-            # Ticketing City Information
-            ("ND5FDMCI", 0x002, 3, "CHAR", "TICKETING CITY"),
-            ("SPARE_MAR2", 0x005, 3, "SPARE", "SPARES"),
-            ("ND5FDMTG", 0x008, 2, "CHAR", "TICKETING TELETYPE ADDRESS"),
-            ("ND5FDMAL", 0x00A, 2, "CHAR", "TICKETING AIRLINE"),
-            ("SPARE_MAR3", 0x00C, 2, "SPARE", "SPARES"),
-            
-            # Passenger Names (2 x 29 bytes)
-            ("ND5FDMNS1", 0x00E, 29, "CHAR", "PASSENGER NAME 1"),
-            ("ND5FDMNS2", 0x02B, 29, "CHAR", "PASSENGER NAME 2"),
-            ("SPARE_MAR4", 0x048, 2, "SPARE", "SPARES"),
-            
-            # MCO Number Information
-            ("ND5FDMMN", 0x04A, 14, "CHAR", "MCO NUMBER"),
-            ("ND5FDMDN", 0x058, 1, "CHAR", "DUPE MCO NBR INDICATOR"),
-            ("SPARE_MAR5", 0x059, 1, "SPARE", "SPARE"),
-            ("ND5FDMON", 0x05A, 14, "CHAR", "OLD MCO NUMBER"),
-            ("SPARE_MAR6", 0x068, 2, "SPARE", "SPARES"),
-            ("ND5FDMID", 0x06A, 7, "CHAR", "ISSUE DATE"),
-            ("SPARE_MAR7", 0x071, 1, "SPARE", "SPARE"),
-            
-            # Activity Information
-            ("ND5FDMCT", 0x072, 3, "CHAR", "CITY"),
-            ("SPARE_MAR8", 0x075, 3, "SPARE", "SPARES"),
-            ("ND5FDMSI", 0x078, 2, "CHAR", "SELLING TELETYPE ADDRESS"),
-            ("ND5FDMAA", 0x07A, 2, "CHAR", "AIRLINE"),
-            ("SPARE_MAR9", 0x07C, 2, "SPARE", "SPARES"),
-            ("ND5FDMOC", 0x07E, 4, "CHAR", "OFFICE CODE"),
-            ("ND5FDMAG", 0x082, 5, "CHAR", "AGENT NUMERIC SINE"),
-            ("ND5FDMAN", 0x087, 2, "CHAR", "AGENT ID"),
-            ("SPARE_MAR10", 0x089, 1, "SPARE", "SPARE"),
-            ("ND5FDMCY", 0x08A, 3, "CHAR", "CITY CODE"),
-            ("SPARE_MAR11", 0x08D, 2, "SPARE", "SPARES"),
-            ("ND5FDMOF", 0x08F, 4, "CHAR", "OFFICE TYPE/NAME CODE"),
-            ("SPARE_MAR12", 0x093, 1, "SPARE", "SPARE"),
-            ("ND5FDMDT", 0x094, 2, "BIN", "DATE (Local Binary Day NBR)"),
-            ("ND5FDMTM", 0x096, 4, "CHAR", "TIME (Local)"),
-            ("ND5FDMAD", 0x09A, 6, "CHAR", "AGENT SET ADDRESS"),
-            ("SPARE_MAR13", 0x0A0, 6, "SPARE", "SPARES"),
-            
-            # Base Fare Amount
-            ("ND5FDMBC", 0x0A6, 3, "CHAR", "BASE FARE CURRENCY CODE"),
-            ("SPARE_MAR14", 0x0A9, 1, "SPARE", "SPARE"),
-            ("ND5FDMBI", 0x0AA, 1, "CHAR", "BASE FARE DECIMAL INDICATOR"),
-            ("SPARE_MAR15", 0x0AB, 1, "SPARE", "SPARE"),
-            ("ND5FDMBA", 0x0AC, 8, "PIC", "BASE FARE AMOUNT"),
-            
-            # Equivalent Fare Paid
-            ("ND5FDMEC", 0x0B4, 3, "CHAR", "EQUIVALENT FARE CURRENCY CODE"),
-            ("SPARE_MAR16", 0x0B7, 1, "SPARE", "SPARE"),
-            ("ND5FDMEA", 0x0B8, 8, "PIC", "EQUIVALENT FARE AMOUNT"),
-            ("SPARE_MAR17", 0x0C0, 2, "SPARE", "SPARES"),
-            
-            # Tax Amounts
-            ("ND5FDMFC", 0x0C2, 2, "CHAR", "FIRST TAX CODE"),
-            ("SPARE_MAR18", 0x0C4, 2, "SPARE", "SPARES"),
-            ("ND5FDMFX", 0x0C6, 6, "PIC", "FIRST TAX AMOUNT"),
-            ("SPARE_MAR19", 0x0CC, 2, "SPARE", "SPARES"),
-            ("ND5FDMSC", 0x0CE, 2, "CHAR", "SECOND TAX CODE"),
-            ("SPARE_MAR20", 0x0D0, 2, "SPARE", "SPARES"),
-            ("ND5FDMSX", 0x0D2, 6, "PIC", "SECOND TAX AMOUNT"),
-            ("SPARE_MAR21", 0x0D8, 2, "SPARE", "SPARES"),
-            ("SPARE_MAR22", 0x0DA, 2, "SPARE", "SPARES"),
-            ("ND5FDMTE", 0x0DC, 2, "CHAR", "THIRD TAX CODE"),
-            ("SPARE_MAR23", 0x0DE, 2, "SPARE", "SPARES"),
-            ("ND5FDMTX", 0x0E0, 6, "PIC", "THIRD TAX AMOUNT"),
-            ("SPARE_MAR24", 0x0E6, 14, "SPARE", "SPARES"),
-            
-            # Totals
-            ("ND5FDMCC", 0x0F4, 3, "CHAR", "TICKET TOTAL CURRENCY CODE"),
-            ("SPARE_MAR25", 0x0F7, 1, "SPARE", "SPARE"),
-            ("ND5FDMTO", 0x0F8, 8, "PIC", "TICKET TOTAL"),
-            ("SPARE_MAR26", 0x100, 2, "SPARE", "SPARES"),
-            ("ND5FDMMC", 0x102, 3, "CHAR", "MISCELLANEOUS TOTAL CURRENCY CODE"),
-            ("SPARE_MAR27", 0x105, 1, "SPARE", "SPARE"),
-            ("ND5FDMMA", 0x106, 8, "PIC", "MISCELLANEOUS TOTAL"),
-            ("SPARE_MAR28", 0x10E, 2, "SPARE", "SPARES"),
-            ("ND5FDMPC", 0x110, 3, "CHAR", "PTA TOTAL CURRENCY CODE"),
-            ("SPARE_MAR29", 0x113, 1, "SPARE", "SPARE"),
-            ("ND5FDMPI", 0x114, 1, "CHAR", "PTA Total Decimal Indicator"),
-            ("SPARE_MAR30", 0x115, 1, "SPARE", "SPARE"),
-            ("ND5FDMPA", 0x116, 8, "PIC", "PTA TOTAL"),
-            
-            # Service Charge
-            ("ND5FDMSO", 0x11E, 3, "CHAR", "Service Charge CURRENCY CODE"),
-            ("SPARE_MAR31", 0x121, 1, "SPARE", "SPARE"),
-            ("ND5FDMSA", 0x122, 6, "PIC", "Service Charge Amount"),
-            ("SPARE_MAR32", 0x128, 2, "SPARE", "SPARES"),
-            
-            # Purchaser Information
-            ("ND5FDMPN", 0x12A, 29, "CHAR", "PURCHASER NAME"),
-            ("SPARE_MAR33", 0x147, 1, "SPARE", "SPARE"),
-            ("ND5FDMPR", 0x148, 175, "CHAR", "PURCHASER ADDRESS"),
-            ("SPARE_MAR34", 0x1F7, 1, "SPARE", "SPARE"),
-            ("ND5FDMPP", 0x1F8, 80, "CHAR", "PURCHASER PHONE"),
-            ("ND5FDMCP", 0x248, 29, "CHAR", "CARD PRESENTED BY NAME"),
-            ("SPARE_MAR35", 0x265, 1, "SPARE", "SPARE"),
-            ("ND5FDMIA", 0x266, 8, "CHAR", "IATA NUMBER"),
-            ("SPARE_MAR36", 0x26E, 2, "SPARE", "SPARES"),
-            
-            # Commission
-            ("ND5FDMIN", 0x270, 1, "CHAR", "COMMISSION TYPE INDICATOR"),
-            ("SPARE_MAR37", 0x271, 1, "SPARE", "SPARE"),
-            ("ND5FDMCN", 0x272, 11, "PIC", "COMMISSION RATE OR AMOUNT"),
-            ("SPARE_MAR38", 0x27D, 1, "SPARE", "SPARE"),
-            
-            # Form of Payment
-            ("ND5FDMFO", 0x27E, 58, "CHAR", "FORM OF PAYMENT"),
-            ("ND5FDMCA", 0x2B8, 6, "CHAR", "CREDIT CARD APPROVAL CODE"),
-            ("SPARE_MAR39", 0x2BE, 4, "SPARE", "SPARES"),
-            
-            # Residual Value
-            ("ND5FDMRC", 0x2C2, 3, "CHAR", "TOTAL RESIDUAL VALUE CURRENCY CODE"),
-            ("SPARE_MAR40", 0x2C5, 1, "SPARE", "SPARE"),
-            ("ND5FDMRA", 0x2C6, 8, "PIC", "TOTAL RESIDUAL VALUE AMOUNT"),
-            ("SPARE_MAR41", 0x2CE, 2, "SPARE", "SPARES"),
-            
-            # Remarks and Routing
-            ("ND5FDMRI", 0x2D0, 57, "CHAR", "REMARKS INFORMATION"),
-            ("ND5FDMRT", 0x309, 57, "CHAR", "ROUTING INFORMATION"),
-            
-            # Flight Information
-            ("ND5FDMFD", 0x342, 2, "BIN", "FLIGHT DATE"),
-            ("ND5FDMCD", 0x344, 2, "CHAR", "AIRLINE CODE"),
-            ("SPARE_MAR42", 0x346, 2, "SPARE", "SPARES"),
-            ("ND5FDMBO", 0x348, 3, "CHAR", "BOARDING CITY"),
-            ("SPARE_MAR43", 0x34B, 3, "SPARE", "SPARES"),
-            ("ND5FDMFN", 0x34E, 2, "BIT", "FLIGHT NUMBER"),
-            
-            # Bankers Rate
-            ("ND5FDMBR", 0x350, 15, "PIC", "BANKERS BUYING RATE"),
-            ("SPARE_MAR44", 0x35F, 1, "SPARE", "SPARE"),
-            
-            # Activity Indicators
-            ("ND5FDMCR", 0x360, 1, "CHAR", "NEWLY CREATED PTA"),
-            ("SPARE_MAR45", 0x361, 1, "SPARE", "SPARE"),
-            ("ND5FDMCM", 0x362, 1, "CHAR", "UPDATE TO CHANGE MCO NBR"),
-            ("SPARE_MAR46", 0x363, 1, "SPARE", "SPARE"),
-            ("ND5FDMUS", 0x364, 1, "CHAR", "UPDATE AND PNR SPLIT"),
-            ("SPARE_MAR47", 0x365, 1, "SPARE", "SPARE"),
-            ("ND5FDMUP", 0x366, 1, "CHAR", "UPDATE AND PNR NOT SPLIT"),
-            ("SPARE_MAR48", 0x367, 1, "SPARE", "SPARE"),
-            ("ND5FDMSP", 0x368, 1, "CHAR", "PTA NOT UPDATED BUT PNR SPLIT"),
-            ("SPARE_MAR49", 0x369, 1, "SPARE", "SPARE"),
-            ("ND5FDMDR", 0x36A, 1, "CHAR", "DELTA SOLD PTA CREDIT CARD REFUND"),
-            ("SPARE_MAR50", 0x36B, 1, "SPARE", "SPARE"),
-            ("ND5FDMRD", 0x36C, 1, "CHAR", "OTHER REFUND"),
-            ("SPARE_MAR51", 0x36D, 1, "SPARE", "SPARE"),
-            ("ND5FDMMS", 0x36E, 1, "CHAR", "MISCELLANEOUS FUNDS USED"),
-            ("SPARE_MAR52", 0x36F, 1, "SPARE", "SPARE"),
-            
-            # Start of variable data items
-            ("ND5FDMDI", 0x370, 1, "CHAR", "START OF PREPAID DATA ITEMS"),
-        ]
-        
-        # VOI structure fields (ND5FDVOI) - offset from 0x060
-        self.voi_fields = [
-            ("ND5FDVNB", 0x000, 14, "CHAR", "DOCUMENT NUMBER"),
-            ("ND5FDVCJ", 0x00E, 2, "CHAR", "CONJUNCTION NUMBER"),
-            ("ND5FDVCD", 0x010, 2, "BIN", "CREATION DATE (PARS BINARY DAY NBR)"),
-            ("ND5FDVAG", 0x012, 7, "CHAR", "CREATING AGENT ID"),
-            ("ND5FDVVA", 0x019, 7, "CHAR", "VOID AGENT ID"),
-            ("ND5FDVSL", 0x020, 7, "CHAR", "SALES LOCATION"),
-            ("ND5FDVOT", 0x027, 1, "CHAR", "VOID TYPE"),
-            ("ND5FDORT", 0x028, 1, "CHAR", "ORIGINAL REFUND TYPE"),
-            ("SPARE_VOI", 0x029, 9, "SPARE", "SPARES"),
-        ]
+# BIT fields holding the Credit Card Restrictions byte
+CREDIT_CARD_RESTRICTION_TAGS = ("CCP", "CRD", "ARF")
+
+MONTHS = "JANFEBMARAPRMAYJUNJULAUGSEPOCTNOVDEC"
+
+# December 31, 1962 is day number zero (day 1 = January 1, 1963)
+DATE_EPOCH = datetime.date(1962, 12, 31)
+
+# Date text formats (binary_to_bcd_date and the date tables)
+DATE_FORMATTERS = {
+    "MMDDYY": lambda date: f"{date.month:02d}{date.day:02d}{date.year % 100:02d}",
+    "DDMMM": lambda date: f"{date.day:02d}{MONTHS[date.month * 3 - 3:date.month * 3]}",
+    "DDMMMYY": lambda date: f"{date.day:02d}{MONTHS[date.month * 3 - 3:date.month * 3]}{date.year % 100:02d}",
+    "DDMMMYYYY": lambda date: f"{date.day:02d}{MONTHS[date.month * 3 - 3:date.month * 3]}{date.year}",
+    "ISO": datetime.date.isoformat,
+}
+DATE_FORMATS = tuple(DATE_FORMATTERS)
+
+# binary_to_bcd_date format_size -> date format (other sizes give DDMMM)
+BCD_DATE_FORMATS = {6: "MMDDYY", 5: "DDMMM", 7: "DDMMMYY", 9: "DDMMMYYYY"}
+
+# Every 2-byte day number has an entry in the date tables
+DATE_TABLE_SIZE = 1 << 16
+
+# Date format (None for date objects) -> date table, filled by get_date_table()
+DATE_TABLES = {}
+
+# Big-endian struct codes for BIN fields unpacked together in one call
+BIN_STRUCT_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+# PIC amounts: zoned digit bytes (F0-F9) as ASCII digits, any other byte as "?" (not a digit)
+ZONED_DIGITS = bytes(0x30 + byte - 0xF0 if 0xF0 <= byte <= 0xF9 else 0x3F for byte in range(256))
+
+# Packed decimal sign nibble (as hex text) -> sign; C, F, A and E are positive, D and B negative
+PACKED_SIGNS = {"a": 1, "b": -1, "c": 1, "d": -1, "e": 1, "f": 1}
+
+
+def credit_card_restrictions(field_data):
+    """Parse Credit Card Restrictions bit field"""
+    if len(field_data) != 1:
+        return "Invalid length"
         
-        # REF structure fields (ND5FDREF) - offset from 0x060
-        self.ref_fields = [
-            ("ND5FDREC", 0x000, 14, "CHAR", "REFUND RECEIPT NUMBER"),
-            ("ND5FDCCA", 0x00E, 21, "CHAR", "TYPE OF PAYMENT"),
-            ("ND5FDPCN", 0x023, 29, "CHAR", "PASSENGER NAME"),
-            ("ND5FDRCR", 0x040, 3, "CHAR", "CURRENCY CODE"),
-            ("ND5FDINV", 0x043, 1, "CHAR", "INVOLUNTARY INDICATOR"),
-            ("ND5FDORG", 0x044, 3, "CHAR", "ORIGIN CITY CODE"),
-            ("ND5FDDES", 0x047, 3, "CHAR", "DESTINATION CITY CODE"),
-            ("ND5FDTRA", 0x04A, 8, "CHAR", "TRAVEL AGY IDENTIFIER-IATA"),
-            ("ND5FDAGY", 0x052, 5, "CHAR", "AGENCY COMMISSION"),
-            ("ND5FDISS", 0x057, 3, "CHAR", "ISSUING CARRIER"),
-            ("ND5FDFAA", 0x05A, 8, "CHAR", "FARE AMOUNT"),
-            ("ND5FDTC1", 0x062, 3, "CHAR", "1ST MISC TRANSACTION CODE"),
-            ("ND5FDTC2", 0x065, 3, "CHAR", "2ND MISC TRANSACTION CODE"),
-            ("ND5FDTC3", 0x068, 3, "CHAR", "3RD MISC TRANSACTION CODE"),
-            ("ND5FDTA1", 0x06B, 8, "CHAR", "1ST MISC TRANSACTION AMOUNT"),
-            ("ND5FDTA2", 0x073, 8, "CHAR", "2ND MISC TRANSACTION AMOUNT"),
-            ("ND5FDTA3", 0x07B, 8, "CHAR", "3RD MISC TRANSACTION AMOUNT"),
-            ("ND5FDKN1", 0x0B0, 14, "CHAR", "1ST REFUNDED TICKET NUMBER"),
-            ("ND5FDKN2", 0x0BE, 14, "CHAR", "2ND REFUNDED TICKET NUMBER"),
-            ("ND5FDKN3", 0x0CC, 14, "CHAR", "3RD REFUNDED TICKET NUMBER"),
-            ("ND5FDKN4", 0x0DA, 14, "CHAR", "4TH REFUNDED TICKET NUMBER"),
-            ("ND5FDKN5", 0x0E8, 14, "CHAR", "5TH REFUNDED TICKET NUMBER"),
-            ("ND5FDCN1", 0x0F6, 4, "CHAR", "1ST REFUNDED TICKET COUPON"),
-            ("ND5FDCN2", 0x0FA, 4, "CHAR", "2ND REFUNDED TICKET COUPON"),
-            ("ND5FDCN3", 0x0FE, 4, "CHAR", "3RD REFUNDED TICKET COUPON"),
-            ("ND5FDCN4", 0x102, 4, "CHAR", "4TH REFUNDED TICKET COUPON"),
-            ("ND5FDCN5", 0x106, 4, "CHAR", "5TH REFUNDED TICKET COUPON"),
-            ("ND5FDPNG", 0x10A, 3, "CHAR", "PENALTY CHARGE CODE - PEN"),
-            ("ND5FDNT2", 0x10D, 7, "CHAR", "PENALTY CHARGE AMOUNT"),
-            ("ND5FDTRT", 0x114, 8, "CHAR", "TOTAL REFUNDED AMOUNT"),
-            ("ND5FDSTM", 0x11C, 7, "CHAR", "SYSTEM DATE"),
-            ("ND5FDELC", 0x123, 7, "CHAR", "SALES LOCATION"),
-            ("ND5FDATD", 0x12A, 7, "CHAR", "AGENT ID"),
-            ("ND5FDCOD", 0x131, 3, "CHAR", "ADMIN SERVICE CHG CODE - ASC"),
-            ("ND5FDCOS", 0x134, 7, "CHAR", "ADMIN SERVICE CHG AMT"),
-            ("ND5FDOTC", 0x1E0, 3, "CHAR", "OTHER MISC CHARGES CODE"),
-            ("ND5FDOTA", 0x1E3, 7, "CHAR", "OTHER MISC CHARGES AMOUNT"),
-            ("ND5FDPRI", 0x1EA, 1, "CHAR", "PROCESSING INDICATOR"),
-            ("ND5FDPNM", 0x290, 38, "CHAR", "PAYEE NAME"),
-            ("ND5FDAD1", 0x2B6, 30, "CHAR", "PAYEE ADDRESS 1"),
-            ("ND5FDAD2", 0x2D4, 30, "CHAR", "PAYEE ADDRESS 2"),
-            ("ND5FDCTY", 0x2F2, 15, "CHAR", "CITY"),
-            ("ND5FDSUB", 0x301, 2, "CHAR", "SUBCOUNTRY"),
-            ("ND5FDCTR", 0x303, 3, "CHAR", "COUNTRY"),
-            ("ND5FDZIP", 0x306, 9, "CHAR", "ZIP CODE"),
-            ("ND5FDREA", 0x30F, 1, "CHAR", "REASON FOR REFUND"),
-            ("ND5FDDTI", 0x310, 2, "BIN", "ORIGINAL DATE TKT ISSUED"),
-            ("ND5FDCKN", 0x312, 15, "CHAR", "REFUND CHECK NUMBER"),
-            ("ND5FDDCI", 0x321, 2, "BIN", "DATE REFUND CHECK ISSUED"),
-            ("ND5FDFFN", 0x323, 10, "CHAR", "FREQUENT FLYER NUMBER"),
-            ("ND5FDFTN", 0x32D, 4, "CHAR", "FLIGHT NUMBER"),
-            ("ND5FDFDT", 0x331, 2, "BIN", "FLIGHT DATE"),
-            ("ND5FDDNR", 0x333, 14, "CHAR", "REPRINT DOCUMENT NUMBER"),
-            ("ND5FDREI", 0x341, 1, "CHAR", "REFUND/EXCHANGE INDICATOR"),
-            ("ND5FDPEI", 0x342, 1, "CHAR", "PAPER/ELECTRONIC INDICATOR"),
-            ("ND5FDNTN", 0x343, 13, "CHAR", "NEW TICKET NUMBER"),
-            ("ND5FDAMT", 0x350, 11, "CHAR", "REFUND AMOUNT COMPUTED"),
-            ("ND5FDRMK", 0x35B, 55, "CHAR", "REMARKS FROM TEMPLATE"),
-            ("ND5FDRM2", 0x392, 30, "CHAR", "SECOND LINE OF REMARKS"),
-            ("ND5FDRRD", 0x3B0, 7, "CHAR", "REFUND REQUEST DATE"),
-            ("ND5FDARF", 0x3B7, 1, "BIT", "CREDIT CARD RESTRICTIONS"),
-            ("SPARE_REF1", 0x3B8, 8, "SPARE", "SPARES"),
-            
-            # Refund Taxes (99 x 16 bytes each) - break down first few entries
-            ("ND5FD99C1", 0x3C0, 2, "CHAR", "TAX CODE 1"),
-            ("SPARE_TX1", 0x3C2, 3, "SPARE", "SPARES 1"),
-            ("ND5FD99T1", 0x3C5, 11, "CHAR", "TAX AMOUNT 1"),
-            
-            ("ND5FD99C2", 0x3D0, 2, "CHAR", "TAX CODE 2"),
-            ("SPARE_TX2", 0x3D2, 3, "SPARE", "SPARES 2"),
-            ("ND5FD99T2", 0x3D5, 11, "CHAR", "TAX AMOUNT 2"),
-            
-            ("ND5FD99C3", 0x3E0, 2, "CHAR", "TAX CODE 3"),
-            ("SPARE_TX3", 0x3E2, 3, "SPARE", "SPARES 3"),
-            ("ND5FD99T3", 0x3E5, 11, "CHAR", "TAX AMOUNT 3"),
-
-            ("ND5FD99C4", 0x3F0, 2, "CHAR", "TAX CODE 4"),
-            ("SPARE_TX4", 0x3F2, 3, "SPARE", "SPARES 4"),
-            ("ND5FD99T4", 0x3F5, 11, "CHAR", "TAX AMOUNT 4"),
-
-            ("ND5FD99C5", 0x400, 2, "CHAR", "TAX CODE 5"),
-            ("SPARE_TX5", 0x402, 3, "SPARE", "SPARES 5"),
-            ("ND5FD99T5", 0x405, 11, "CHAR", "TAX AMOUNT 5"),
-            
-            # Remaining 94 tax entries (94 x 16 = 1504 bytes)
-            ("ND5FDTXS_REMAINING", 0x410, 1504, "CHAR", "REMAINING REFUND TAXES (94x16)"),
-            
-            # Tax Surcharge Data (99 x 5 bytes each) - break down first few
-            ("ND5FDOBT1", 0x9F0, 2, "CHAR", "FEE CODE 1"),
-            ("ND5FDOBS1", 0x9F2, 3, "CHAR", "FEE SUBCODE 1"),
-            
-            ("ND5FDOBT2", 0x9F5, 2, "CHAR", "FEE CODE 2"),
-            ("ND5FDOBS2", 0x9F7, 3, "CHAR", "FEE SUBCODE 2"),
-            
-            ("ND5FDOBT3", 0x9FA, 2, "CHAR", "FEE CODE 3"),
-            ("ND5FDOBS3", 0x9FC, 3, "CHAR", "FEE SUBCODE 3"),
-            
-            # Remaining 96 surcharge entries (96 x 5 = 480 bytes)
-            ("ND5FDOBA_REMAINING", 0x9FF, 480, "CHAR", "REMAINING TAX SURCHARGE DATA (96x5)"),
-            
-            ("ND5FDRPE", 0xBDF, 32, "CHAR", "PAYMENT REFERENCE ID"),
-        ]
+    byte_value = field_data[0]
+    restrictions = []
+    
+    # Bit mappings for Credit Card Restrictions
+    bit_mappings = {
+        0x80: "World Pay Restricted Country",  # Bit 0
+        0x40: "Elavon",                        # Bit 1  
+        0x20: "American Express",              # Bit 2
+        0x10: "Visa",                          # Bit 3
+        0x08: "Chase (Bank)",                  # Bit 4
+        0x04: "Converge",                      # Bit 5
+        0x02: "SITA",                          # Bit 6
+        0x01: "World Pay Currency"             # Bit 7
+    }
+    
+    for bit_mask, description in bit_mappings.items():
+        if byte_value & bit_mask:
+            restrictions.append(description)
+    
+    if restrictions:
+        return f"0x{byte_value:02X} ({', '.join(restrictions)})"
+    else:
+        return f"0x{byte_value:02X} (No restrictions)"
 
-        # Variable length data items structure (ND5FDITM)
-        # Used by both TAR records (at ND5FDTDF offset) and PAR records (at ND5FDMDI offset)
-        self.variable_data_item_fields = [
-            ("ND5FDTID", 0x000, 1, "BIT", "Data Item Type - ID"),
-            ("ND5FDTCT", 0x001, 2, "BIN", "Byte count of this data item"),
-            ("ND5FDVTD", 0x003, 1, "CHAR", "Start of Variable Length Text (1-1400 bytes)"),
-        ]
 
-    def get_variable_data_offset(self, record_type):
-        """Get the offset where variable length data items start"""
-        if record_type in ["TAR", "NBT"]:
-            return 0x060 + 0x088  # TAR structure + ND5FDTDF offset
-        elif record_type == "PAR":
-            return 0x060 + 0x370  # MAR structure + ND5FDMDI offset
+def get_date_table(date_format=None):
+    """Tuple indexed by 2-byte day number: dates (date_format None) or date text in a DATE_FORMATS format
+
+    Each table is built once, on first use. Day zero maps to None (or "").
+    """
+    table = DATE_TABLES.get(date_format)
+    if table is None:
+        if date_format is None:
+            first = DATE_EPOCH.toordinal()  # day number 1
+            table = (None,) + tuple(map(datetime.date.fromordinal, range(first, first + DATE_TABLE_SIZE - 1)))
         else:
-            return None  # No variable data for other record types
+            formatter = DATE_FORMATTERS.get(date_format)
+            if formatter is None:
+                raise ValueError(f"Unknown date format: {date_format} (expected one of {', '.join(DATE_FORMATS)})")
+            table = ("",) + tuple(map(formatter, get_date_table()[1:]))
+        DATE_TABLES[date_format] = table
+    return table
 
 
-    def parse_displaced_input(self, input_data):
-        """Parse input data with displacement offsets"""
-        data_dict = {}
-        lines = input_data.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
+def day_number_to_date(day_number):
+    """Convert a binary day number to a date (None for day zero)"""
+    if day_number <= 0:
+        return None
+    if day_number < DATE_TABLE_SIZE:
+        return get_date_table()[day_number]
+    return DATE_EPOCH + datetime.timedelta(days=day_number - 1)
+
+
+# EBCDIC code pages a parser can decode text with (feeds come from cp037 and cp500 systems)
+CODE_PAGES = ("cp037", "cp500", "cp1140")
+
+# 256-entry decoding table per code page, used directly with charmap_decode to
+# skip the codec registry lookup; a whole record is translated in one call
+EBCDIC_TABLES = {code_page: codecs.decode(bytes(range(256)), code_page) for code_page in CODE_PAGES}
+CP037_TABLE = EBCDIC_TABLES["cp037"]
+
+
+def get_ebcdic_table(code_page):
+    """Get the decoding table for an EBCDIC code page"""
+    table = EBCDIC_TABLES.get(code_page)
+    if table is None:
+        raise ValueError(f"Unknown code page: {code_page} (expected one of {', '.join(CODE_PAGES)})")
+    return table
+
+
+def ebcdic_text(data, table=CP037_TABLE):
+    """Translate EBCDIC bytes to text in one pass (no stripping)"""
+    return codecs.charmap_decode(data, 'replace', table)[0]
+
+
+# Per-type decoders: raw field bytes -> typed value
+def decode_char(raw, table=CP037_TABLE):
+    return codecs.charmap_decode(raw, 'replace', table)[0].rstrip('\x00').rstrip(' ')
+
+
+def decode_bin(raw):
+    return int.from_bytes(raw, 'big')
+
+
+def decode_date(raw):
+    day_number = int.from_bytes(raw, 'big')
+    if day_number < DATE_TABLE_SIZE:
+        return get_date_table()[day_number]
+    return day_number_to_date(day_number)
+
+
+def decimal_places(raw, default=2):
+    """Decimal places from a one-digit EBCDIC decimal indicator (default when it is not a digit)"""
+    byte = raw[0] if len(raw) else 0
+    return byte - 0xF0 if 0xF0 <= byte <= 0xF9 else default
+
+
+def zoned_value(raw):
+    """Signed integer of zoned decimal bytes (None if not numeric)
+
+    Every byte must be an F0-F9 digit, except that the last one may carry
+    the sign in its zone (C positive, D negative). Any other byte, such as
+    an embedded space or letter, makes the field non-numeric. At least two
+    digits are needed.
+    """
+    raw = bytes(raw)
+    negative = False
+    if raw and raw[-1] >> 4 in (0xC, 0xD) and raw[-1] & 0x0F <= 9:
+        negative = raw[-1] >> 4 == 0xD
+        raw = raw[:-1] + bytes((raw[-1] | 0xF0,))
+    digits = raw.translate(ZONED_DIGITS)
+    if len(digits) < 2 or not digits.isdigit():
+        return None
+    return -int(digits) if negative else int(digits)
+
+
+def packed_value(raw):
+    """Signed integer of packed decimal (COMP-3) bytes: digit nibbles, then a sign nibble (None if not valid)"""
+    nibbles = bytes(raw).hex()
+    sign = PACKED_SIGNS.get(nibbles[-1:])
+    digits = nibbles[:-1]
+    if sign is None or not digits.isdigit():
+        return None
+    return sign * int(digits)
+
+
+def pic_value(raw, places=2):
+    """Zoned PIC amount as an exact Decimal with places decimals (None if the field is not numeric)"""
+    units = zoned_value(raw)
+    return None if units is None else Decimal(units).scaleb(-places)
+
+
+def decode_pic(raw, table=CP037_TABLE, places=2):
+    value = pic_value(raw, places)
+    return decode_char(raw, table) if value is None else value
+
+
+def decode_hex(raw):
+    return raw.hex().upper()
+
+
+def decode_spare(raw):
+    return None
+
+
+# Per-type formatters: (typed value, raw field bytes) -> report text
+def format_date(value, raw):
+    if value is None:
+        return "0"
+    day_number = int.from_bytes(raw, 'big')
+    if day_number < DATE_TABLE_SIZE:
+        return get_date_table("DDMMMYY")[day_number]
+    return DATE_FORMATTERS["DDMMMYY"](value)
+
+
+def format_pic(value, raw):
+    if isinstance(value, Decimal):
+        return f"{value:f}"  # at the field's scale
+    return value
+
+
+def format_str(value, raw):
+    return str(value)
+
+
+def format_credit_card(value, raw):
+    return credit_card_restrictions(raw)
+
+
+def format_spare(value, raw):
+    return "(SPARE)"
+
+
+# Decoder and formatter per field kind; a None formatter means the value is already text
+FIELD_KINDS = {
+    "CHAR": (decode_char, None),
+    "BIN": (decode_bin, format_str),
+    "DATE": (decode_date, format_date),
+    "PIC": (decode_pic, format_pic),
+    "BIT": (decode_hex, None),
+    "CCR": (decode_hex, format_credit_card),
+    "SPARE": (decode_spare, format_spare),
+    "HEX": (decode_hex, None),
+}
+
+# Kinds whose decoders take the code page table (and may decode to text)
+TEXT_KINDS = frozenset(("CHAR", "PIC"))
+
+
+def field_kind(field_name, field_type, length):
+    """Pick the decoder kind for a layout field"""
+    if field_type == "BIN" and length == 2 and field_name in DATE_FIELDS:
+        return "DATE"
+    if field_type == "BIT" and field_name and any(tag in field_name for tag in CREDIT_CARD_RESTRICTION_TAGS):
+        return "CCR"
+    if field_type in FIELD_KINDS:
+        return field_type
+    return "HEX"
+
+
+FieldSpec = namedtuple("FieldSpec", [
+    "index", "name", "offset", "length", "type", "description",
+    "kind", "slice", "hex_slice", "end", "blank", "zero", "decoder", "formatter", "decimal_slice",
+])
+
+
+class ParsedField(namedtuple("ParsedField", ["spec", "raw", "value"])):
+    """One decoded layout field: its compiled spec, raw bytes and typed value"""
+    __slots__ = ()
+
+    name = property(lambda self: self.spec.name)
+    offset = property(lambda self: self.spec.offset)
+    length = property(lambda self: self.spec.length)
+    type = property(lambda self: self.spec.type)
+    description = property(lambda self: self.spec.description)
+
+    @property
+    def hex(self):
+        return self.raw.hex().upper()
+
+    @property
+    def text(self):
+        """Value as shown in the text report"""
+        if self.spec.formatter is None:
+            return self.value
+        return self.spec.formatter(self.value, self.raw)
+
+    @property
+    def is_blank(self):
+        """Check if field contains all EBCDIC spaces (0x40) or all zeros"""
+        return self.raw == self.spec.blank or self.raw == self.spec.zero
+
+
+# Fixed-layout subfield of a REPS (item 71) or itinerary segment (item 74) payload
+SubField = namedtuple("SubField", ["name", "offset", "length", "raw", "text"])
+
+# One variable length data item (ND5FDITM); reps/segments are set for items 71/74
+DataItem = namedtuple("DataItem", [
+    "number", "offset", "type_id", "name", "description",
+    "total_length", "data", "text", "reps", "segments",
+])
+
+
+# Variable data item types from D5FD.h (decimal type id -> name, description)
+DATA_ITEM_TYPES = {
+    1: ("Transmission Control Number", "Control number for transmission"),
+    2: ("Passenger Name", "Name of the passenger"),
+    4: ("Group or Convention Name", "Group or convention identifier"),
+    6: ("Name Remarks", "Additional name information"),
+    8: ("Telephone Number", "Contact telephone number"),
+    10: ("TBM Mailing Address", "Ticket-by-mail mailing address"),
+    12: ("TBM Billing Address", "Ticket-by-mail billing address"),
+    14: ("Date Ticket Mailed", "Date ticket was mailed"),
+    16: ("Frequent Flyer Number", "Loyalty program number"),
+    20: ("Reprinted Ticket Numbers", "Numbers of reprinted tickets"),
+    22: ("Form of Payment", "Payment method details"),
+    24: ("Count of Psgrs Associated With FOP", "Number of passengers for this payment"),
+    25: ("Equivalent Fare Paid Decimal Indicator", "Decimal position indicator"),
+    26: ("Equivalent Fare Paid", "Equivalent fare amount"),
+    28: ("Equivalent Fare Paid Currency Code", "Currency for equivalent fare"),
+    29: ("Tkt/Doc Effective Date", "Document effective date"),
+    30: ("Tkt/Doc Expiration Date", "Document expiration date"),
+    31: ("Booking Class Limitation", "Class restrictions"),
+    32: ("Approval Code", "Payment approval code"),
+    36: ("Tour Code", "Tour package identifier"),
+    38: ("Number of Tickets Exchanged", "Count of exchanged tickets"),
+    39: ("Exchanged Ticket Value Decimal Indicator", "Decimal position for exchange value"),
+    40: ("Issued in Exchange for Ticket Number", "Original ticket number"),
+    42: ("Issued in Exchange for Coupon Numbers", "Original coupon numbers"),
+    44: ("Value of Exchanged Ticket", "Monetary value of exchange"),
+    46: ("Original Issue Ticket Number", "First issue ticket number"),
+    48: ("Date of Original Issue", "Original issue date"),
+    50: ("Place of Original Issue", "Original issue location"),
+    52: ("Form of Payment of Exchanged Ticket(s)", "Payment method for exchanged tickets"),
+    54: ("Exchanged Ticket Currency Code", "Currency for exchanged tickets"),
+    56: ("ATC/IATA Number", "Agent/airline identifier"),
+    58: ("Commission Rate", "Agent commission percentage"),
+    60: ("Total Amount Adjusted", "Total adjustment amount"),
+    61: ("PTA Amounts Decimal Indicator", "PTA decimal position"),
+    62: ("Count of MCO Numbers", "Number of MCO documents"),
+    64: ("MCO Number", "Miscellaneous charges order number"),
+    66: ("Original Fare Currency Code", "Original fare currency"),
+    68: ("Original PTA Total", "Original PTA amount"),
+    70: ("FOP of Each PTA", "Form of payment for each PTA"),
+    71: ("REPS DATA", "Credit card processing data"),
+    72: ("Fare Calculation", "Fare calculation details"),
+    74: ("Itinerary Segment Data", "Flight segment information"),
+    76: ("Fare Basis", "Fare basis code"),
+    78: ("Connecting/Stopover Code", "Connection/stopover indicator"),
+    80: ("Validity Dates", "Ticket validity dates"),
+    82: ("Seat Assignment", "Assigned seat information"),
+    84: ("Baggage Allowance", "Baggage allowance details"),
+    86: ("Endorsement Box/Penalty", "Endorsement and penalty information"),
+    88: ("Commission Amount", "Commission amount"),
+    89: ("Booking Class/Date", "Booking class and date"),
+    90: ("Reissue Tax Breakdown", "Tax breakdown for reissue"),
+    93: ("Reissue PFC Breakdown", "PFC breakdown for reissue"),
+    94: ("Tax Surcharge Data", "Fee information for Global Collect"),
+    95: ("Document Taxes", "Document tax information"),
+    96: ("GTO Commission Rate", "GTO commission rate"),
+    97: ("GTO Commission Amount", "GTO commission amount"),
+    200: ("Servicing Carrier Accounting Code", "ARC servicing carrier code"),
+    202: ("Servicing Carrier Guarantee Code", "ARC guarantee code"),
+    204: ("Agency Number (ATC/IATA)", "ARC agency number"),
+    206: ("Agency Number Check Digit", "ARC agency check digit"),
+    208: ("Credit Card Contractor Number", "ARC credit card contractor"),
+    210: ("Commission Rate", "ARC commission rate"),
+    212: ("Commission Amount", "ARC commission amount"),
+    214: ("Tax Code (Future)", "ARC future tax code"),
+    216: ("Ticketing Carrier Accounting Code", "ARC ticketing carrier code"),
+    218: ("Domestic/International Code", "ARC domestic/international indicator"),
+    220: ("Self-Sale Code", "ARC self-sale code"),
+}
+
+UNKNOWN_DATA_ITEM = ("Unknown Type", "Unknown data item")
+
+ITEM_END_MARKER = 0x4E
+ITEM_HEADER_SIZE = 3   # type id (1 byte) + total length (2 bytes)
+REPS_ITEM = 0x47       # item 71
+ITINERARY_ITEM = 0x4A  # item 74
+
+
+def iter_item_entries(data, start_offset):
+    """Scan ND5FDITM items from start_offset, yielding (type id, offset, total length)
+
+    The X'4E' end marker is yielded as (ITEM_END_MARKER, offset, 0) and ends
+    the scan. A malformed item length ends it with (None, offset, 0).
+    Zero padding between items is skipped.
+    """
+    size = len(data)
+    offset = start_offset
+    while offset < size - 2:
+        type_id = data[offset]
+        if type_id == ITEM_END_MARKER:
+            yield ITEM_END_MARKER, offset, 0
+            return
+        if type_id == 0:
+            offset += 1
+            continue
+        # Total length (2 bytes, big-endian) includes the type id and length bytes
+        total_length = (data[offset + 1] << 8) | data[offset + 2]
+        if total_length < ITEM_HEADER_SIZE or offset + total_length > size:
+            yield None, offset, 0
+            return
+        yield type_id, offset, total_length
+        offset += total_length
+
+
+def iter_data_items(data, start_offset):
+    """Yield (type id, offset, memoryview of the item data) for each variable data item"""
+    view = memoryview(data)
+    for type_id, offset, total_length in iter_item_entries(data, start_offset):
+        if type_id is None or type_id == ITEM_END_MARKER:
+            return
+        yield type_id, offset, view[offset + ITEM_HEADER_SIZE:offset + total_length]
+
+
+class ItemTable:
+    """Offset table of a record's variable data items, built in one pass
+
+    Items can be fetched by type id without decoding the others, e.g.
+    table.get(REPS_ITEM).
+    """
+
+    def __init__(self, data, start_offset):
+        self.data = memoryview(data)
+        self.entries = []      # (type id, offset, total length) in record order
+        self.by_type = {}      # type id -> indexes into entries
+        self.end_marker_offset = None
+        self.malformed_offset = None  # where the scan stopped on a bad item length
+        for type_id, offset, total_length in iter_item_entries(data, start_offset):
+            if type_id == ITEM_END_MARKER:
+                self.end_marker_offset = offset
+            elif type_id is None:
+                self.malformed_offset = offset
+            else:
+                self.by_type.setdefault(type_id, []).append(len(self.entries))
+                self.entries.append((type_id, offset, total_length))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        """(type id, offset, memoryview of the item data) in record order"""
+        view = self.data
+        for type_id, offset, total_length in self.entries:
+            yield type_id, offset, view[offset + ITEM_HEADER_SIZE:offset + total_length]
+
+    def __contains__(self, type_id):
+        return type_id in self.by_type
+
+    def get(self, type_id, default=None):
+        """Data of the first item of a type (memoryview)"""
+        indexes = self.by_type.get(type_id)
+        if not indexes:
+            return default
+        type_id, offset, total_length = self.entries[indexes[0]]
+        return self.data[offset + ITEM_HEADER_SIZE:offset + total_length]
+
+    def get_all(self, type_id):
+        """Data of every item of a type, in record order"""
+        return [self.data[offset + ITEM_HEADER_SIZE:offset + total_length]
+                for type_id, offset, total_length in (self.entries[i] for i in self.by_type.get(type_id, ()))]
+
+
+# REPS data (item 71): (name, length) of each subfield of the 221-byte structure
+REPS_FIELDS = (
+    ("Auth Characteristics Indicator", 1),
+    ("Validation Code", 4),
+    ("Trans ID/Banknet Reference", 9),
+    ("Auth Response/Downgrade Indicator", 2),
+    ("Auth Source Code", 1),
+    ("POS Entry Mode", 2),
+    ("Banknet Reference Date", 2),
+    ("AVS Response Code", 1),
+    ("Electronic Commerce Indicator", 2),
+    ("Cardholder Auth Verification Value", 1),
+    ("Cardholder Activation Terminal ID", 1),
+    ("Card Level Results", 2),
+    ("Acquirer Reference Data", 15),
+    ("Point of Service Data", 12),
+    ("Accounting System Code/Cardholder ID", 1),
+    ("Last Four Digits of Credit Card", 4),
+    ("Account Status Data", 1),
+    ("Spare Bytes", 9),
+    ("Token Requestor ID Data", 11),
+    ("Token Assurance Level Data", 2),
+    ("Spend Qualified Indicator", 1),
+    ("Security Protocol", 1),
+    ("Transaction Integrity Class", 2),
+    ("Payment Account Reference Number", 35),
+    ("Market Specific Auth Data Indicator", 1),
+    ("System Trace Audit Number", 6),
+    ("Transaction Data Condition Code", 2),
+    ("POS Data", 13),
+    ("Processing Code", 6),
+    ("Cardholder Authentication", 1),
+    ("Stored Credential Indicator", 1),
+    ("Account Holder Auth Value", 32),
+    ("Directory Server Transaction ID", 36),
+    ("Program Protocol", 1),
+)
+
+# Itinerary segment data (item 74): (name, length) of each subfield of a 26-byte segment
+SEGMENT_FIELDS = (
+    ("Carrier Code", 3),
+    ("Flight Number", 4),
+    ("Class of Service", 2),
+    ("Departure Date", 5),
+    ("Departure Time", 4),
+    ("Origin City Code", 3),
+    ("Destination City Code", 3),
+    ("Reservation Status", 2),
+)
+
+
+def compile_subfields(fields):
+    """(name, offset, length, end) per subfield of a fixed layout"""
+    compiled = []
+    offset = 0
+    for name, length in fields:
+        compiled.append((name, offset, length, offset + length))
+        offset += length
+    return tuple(compiled)
+
+
+def subfield_identifier(name):
+    """Column name for a subfield ("Trans ID/Banknet Reference" -> trans_id_banknet_reference)"""
+    return re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").lower()
+
+
+REPS_SUBFIELDS = compile_subfields(REPS_FIELDS)
+REPS_LENGTH = REPS_SUBFIELDS[-1][3]
+SEGMENT_SUBFIELDS = compile_subfields(SEGMENT_FIELDS)
+SEGMENT_LENGTH = SEGMENT_SUBFIELDS[-1][3]
+
+# Structured rows of subfield text
+RepsRow = namedtuple("RepsRow", [subfield_identifier(name) for name, length in REPS_FIELDS])
+SegmentRow = namedtuple("SegmentRow", [subfield_identifier(name) for name, length in SEGMENT_FIELDS])
+
+
+def decode_reps_row(data, table=CP037_TABLE):
+    """RepsRow for a REPS payload; subfields past the end of a short payload are None"""
+    text = ebcdic_text(data, table)
+    size = len(data)
+    return RepsRow._make([
+        text[offset:end].rstrip('\x00').rstrip(' ') if end <= size else None
+        for name, offset, length, end in REPS_SUBFIELDS
+    ])
+
+
+def decode_segment_rows(data, table=CP037_TABLE):
+    """SegmentRow per whole 26-byte segment of an itinerary payload, from one translation of the payload"""
+    text = ebcdic_text(data, table)
+    make_row = SegmentRow._make
+    slices = [slice(offset, end) for name, offset, length, end in SEGMENT_SUBFIELDS]
+    rows = []
+    for base in range(0, len(data) // SEGMENT_LENGTH * SEGMENT_LENGTH, SEGMENT_LENGTH):
+        segment = text[base:base + SEGMENT_LENGTH]
+        rows.append(make_row([segment[field_slice].rstrip('\x00').rstrip(' ') for field_slice in slices]))
+    return rows
+
+
+class LayoutPlan:
+    """Field layout table compiled once into slices, decoders and struct runs"""
+
+    def __init__(self, fields, base_offset=0):
+        slices = {name: slice(base_offset + offset, base_offset + offset + length)
+                  for name, offset, length, field_type, description in fields}
+        specs = []
+        for index, (name, offset, length, field_type, description) in enumerate(fields):
+            abs_offset = base_offset + offset
+            kind = field_kind(name, field_type, length)
+            decoder, formatter = FIELD_KINDS[kind]
+            # PIC amounts take their scale from the decimal indicator field of the same layout
+            decimal_slice = slices.get(AMOUNT_DECIMAL_INDICATORS.get(name)) if kind == "PIC" else None
+            specs.append(FieldSpec(
+                index, name, abs_offset, length, field_type, description, kind,
+                slice(abs_offset, abs_offset + length), slice(abs_offset * 2, (abs_offset + length) * 2),
+                abs_offset + length, b"\x40" * length, bytes(length), decoder, formatter, decimal_slice,
+            ))
+        self.fields = tuple(specs)
+        self.has_text = any(spec.kind in TEXT_KINDS for spec in specs)
+        # Text fields only need the record translated up to the last of them
+        self.text_end = max((spec.end for spec in specs if spec.kind in TEXT_KINDS), default=0)
+        # Flat per-field steps for the decode loop (tuple unpacking beats namedtuple attribute access).
+        # Text kinds slice the translated record: CHAR always, PIC when it is not numeric.
+        self.steps = tuple(
+            (spec, spec.slice, spec.end, spec.blank, spec.zero,
+             None if spec.kind == "CHAR" else pic_value if spec.kind == "PIC" else spec.decoder,
+             spec.kind == "PIC", spec.decimal_slice)
+            for spec in specs
+        )
+        self.end = max((spec.end for spec in specs), default=0)
+        self.bin_runs = self.compile_bin_runs(self.fields)
+        self.row_templates = {}
+        self.report_steps = {}
+        # Field specs by name (the first field of that name, for repeated spare names)
+        self.by_name = {}
+        for spec in specs:
+            self.by_name.setdefault(spec.name, spec)
+
+    @staticmethod
+    def compile_bin_runs(specs):
+        """Group adjacent BIN fields into (Struct, first index, count, end) runs (a lone field is a run of one)"""
+        runs = []
+        run = []
+        for spec in specs + (None,):
+            if (spec is not None and spec.kind == "BIN" and spec.length in BIN_STRUCT_CODES
+                    and (not run or run[-1].end == spec.offset)):
+                run.append(spec)
+                continue
+            if run:
+                layout = struct.Struct(">" + "".join(BIN_STRUCT_CODES[s.length] for s in run))
+                runs.append((layout, run[0].index, len(run), run[-1].end))
+            run = [spec] if spec is not None and spec.kind == "BIN" and spec.length in BIN_STRUCT_CODES else []
+        return tuple(runs)
+
+    def decode(self, data, skip_blank=False, table=CP037_TABLE):
+        """Decode every field that fits in data into ParsedField tuples (text via the code page table)"""
+        make_field = ParsedField._make
+        size = len(data)
+        bin_values = [None] * len(self.fields)
+        for layout, first, count, end in self.bin_runs:
+            if end <= size:
+                bin_values[first:first + count] = layout.unpack_from(data, self.fields[first].offset)
+
+        # Text fields slice one EBCDIC translation of the record (up to the last text field)
+        text = codecs.charmap_decode(data[:self.text_end], 'replace', table)[0] if self.has_text else ""
+
+        decoded = []
+        append = decoded.append
+        for (spec, field_slice, end, blank, zero, decoder, text_fallback, decimal_slice), value in zip(
+                self.steps, bin_values):
+            if end > size:
+                continue
+            raw = data[field_slice]
+            if skip_blank and (raw == blank or raw == zero):
                 continue
-                
-            # Handle format with displayable text: "000 D5FD0000 C2C1C3C1 00000000 00000000 ** N   BACA        ¬"
-            # Split by '**' and take only the hex part
-            if '**' in line:
-                line = line.split('**')[0].strip()
-                
-            # Parse format: "000 D5FD0000 C2C1C3C1 00000000 00000000"
-            parts = line.split()
-            if len(parts) < 2:
+            if value is None:
+                if decoder is not None:
+                    value = decoder(raw) if decimal_slice is None else decoder(raw, decimal_places(data[decimal_slice]))
+                if decoder is None or (value is None and text_fallback):
+                    value = text[field_slice].rstrip('\x00').rstrip(' ')
+            append(make_field((spec, raw, value)))
+        return decoded
+
+    def get_row_templates(self, config):
+        """Report row format strings per field, built once per header size"""
+        key = tuple(sorted(config.items()))
+        templates = self.row_templates.get(key)
+        if templates is None:
+            field_width = config.get('field_width', 8)
+            length_width = config.get('length_width', 4)
+            row = "%%-%ds %%-%ds " % (config['hex_width'], config['value_width'])
+            templates = tuple(
+                f"{spec.name:<{field_width}} {spec.offset:04X}h {spec.length:<{length_width}} "
+                + row + spec.description.replace("%", "%%") + "\n"
+                for spec in self.fields
+            )
+            self.row_templates[key] = templates
+        return templates
+
+    def get_report_steps(self, config):
+        """Decode steps joined with (row template, hex slice, formatter) per field, built once per header size
+
+        BIN values get no formatter: the template's %s already calls str().
+        """
+        key = tuple(sorted(config.items()))
+        steps = self.report_steps.get(key)
+        if steps is None:
+            steps = self.report_steps[key] = tuple(
+                step[1:] + (template, spec.hex_slice, None if spec.formatter is format_str else spec.formatter)
+                for step, template, spec in zip(self.steps, self.get_row_templates(config), self.fields)
+            )
+        return steps
+
+    def report_rows(self, data, config, skip_blank=False, table=CP037_TABLE):
+        """Report rows of every field that fits in data, decoded and formatted in one pass
+
+        The text report's path: no ParsedField is built, and skip_blank
+        leaves blank fields out before they are decoded.
+        """
+        size = len(data)
+        bin_values = [None] * len(self.fields)
+        for layout, first, count, end in self.bin_runs:
+            if end <= size:
+                bin_values[first:first + count] = layout.unpack_from(data, self.fields[first].offset)
+        text = codecs.charmap_decode(data[:self.text_end], 'replace', table)[0] if self.has_text else ""
+        hex_data = data[:self.end].hex().upper()
+
+        steps = self.get_report_steps(config)
+        if size < self.end:
+            fitting = [(step, value) for step, value in zip(steps, bin_values) if step[1] <= size]
+            steps = [step for step, value in fitting]
+            bin_values = [value for step, value in fitting]
+
+        # One % over the joined row templates of the fields shown, rather than one per row
+        templates = []
+        add_template = templates.append
+        args = []
+        add = args.append
+        for (field_slice, end, blank, zero, decoder, text_fallback, decimal_slice,
+             template, hex_slice, formatter), value in zip(steps, bin_values):
+            raw = data[field_slice]
+            if skip_blank and (raw == blank or raw == zero):
                 continue
-                
+            if value is None:
+                if decoder is None:
+                    value = text[field_slice].rstrip('\x00').rstrip(' ')
+                else:
+                    value = decoder(raw) if decimal_slice is None else decoder(raw, decimal_places(data[decimal_slice]))
+                    if value is None and text_fallback:
+                        value = text[field_slice].rstrip('\x00').rstrip(' ')
+            if formatter is not None:
+                value = formatter(value, raw)
+            add_template(template)
+            add(hex_data[hex_slice])
+            add(value)
+        return ''.join(templates) % tuple(args)
+
+
+class ParsedRecord:
+    """Structured result of parsing one D5FD record"""
+
+    def __init__(self, data, record_type, layout, header, fields,
+                 items=None, end_marker_offset=None, items_truncated=False):
+        self.data = data
+        self.record_type = record_type
+        self.layout = layout              # RecordLayout, or None for unknown record types
+        self.header = header              # ParsedField list for the header, None if not decoded
+        self.fields = fields              # ParsedField list for the BTI structure, None if not decoded
+        self.items = items                # DataItem list, None if the layout has no variable data
+        self.end_marker_offset = end_marker_offset
+        self.items_truncated = items_truncated
+        self._by_name = None
+
+    @property
+    def length(self):
+        return len(self.data)
+
+    def get_field(self, name):
+        """Get a header or BTI ParsedField by name (None if absent)"""
+        if self._by_name is None:
+            self._by_name = {field.name: field for field in itertools.chain(self.header, self.fields)}
+        return self._by_name.get(name)
+
+    def get(self, name, default=None):
+        """Get the typed value of a header or BTI field by name"""
+        field = self.get_field(name)
+        return default if field is None else field.value
+
+    def to_dict(self):
+        """Plain dict of the record (spare fields omitted)"""
+        return {
+            "record_type": self.record_type,
+            "layout": self.layout.name if self.layout else None,
+            "length": self.length,
+            "header": {f.name: f.value for f in self.header if f.spec.kind != "SPARE"},
+            "fields": {f.name: f.value for f in self.fields if f.spec.kind != "SPARE"},
+            "items": [
+                {
+                    "number": item.number,
+                    "offset": item.offset,
+                    "type_id": item.type_id,
+                    "name": item.name,
+                    "data": item.data.hex().upper(),
+                    "text": item.text,
+                    "reps": {sub.name: sub.text for sub in item.reps} if item.reps is not None else None,
+                    "segments": [{sub.name: sub.text for sub in segment} for segment in item.segments]
+                    if item.segments is not None else None,
+                }
+                for item in self.items or ()
+            ],
+        }
+
+
+class RecordView:
+    """Lazy view of one record buffer: fields are decoded on first access and cached
+
+    Fields are read by name, as view["ND5FDTTF"] or view.ND5FDTKN. Creating
+    a view only wraps the buffer in a memoryview; the record type is read
+    when first needed.
+    """
+
+    __slots__ = ("data", "table", "_record_type", "_values")
+
+    def __init__(self, data, record_type=None, table=CP037_TABLE):
+        self.data = data if isinstance(data, memoryview) else memoryview(data)
+        self.table = table
+        self._record_type = record_type
+        self._values = None
+
+    @property
+    def record_type(self):
+        if self._record_type is None:
+            if len(self.data) > 0x022:
+                self._record_type = decode_char(self.data[0x020:0x023], self.table).strip()
+            else:
+                self._record_type = "UNK"
+        return self._record_type
+
+    @property
+    def layout(self):
+        """RecordLayout, or None for unknown record types"""
+        return RECORD_LAYOUTS.get(self.record_type)
+
+    @property
+    def length(self):
+        return len(self.data)
+
+    def get_spec(self, name):
+        """Compiled FieldSpec of a header or BTI field (None if the record type has no such field)"""
+        layout = self.layout
+        spec = layout.plan.by_name.get(name) if layout is not None else None
+        return spec if spec is not None else HEADER_PLAN.by_name.get(name)
+
+    def __getitem__(self, name):
+        values = self._values
+        if values is None:
+            values = self._values = {}
+        elif name in values:
+            return values[name]
+        spec = self.get_spec(name)
+        if spec is None:
+            raise KeyError(name)
+        if spec.end > len(self.data):
+            value = None  # record too short for this field
+        elif spec.decimal_slice is not None:
+            value = spec.decoder(self.data[spec.slice], self.table, decimal_places(self.data[spec.decimal_slice]))
+        elif spec.kind in TEXT_KINDS:
+            value = spec.decoder(self.data[spec.slice], self.table)
+        else:
+            value = spec.decoder(self.data[spec.slice])
+        values[name] = value
+        return value
+
+    def __getattr__(self, name):
+        # Only reached for names that are not attributes: field access such as view.ND5FDTKN
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"{self.record_type} record has no field {name}") from None
+
+    def __contains__(self, name):
+        return self.get_spec(name) is not None
+
+    def get(self, name, default=None):
+        """Typed value of a field (default if the record type has no such field)"""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def get_field(self, name):
+        """ParsedField for a field (None if absent or past the end of the record)"""
+        spec = self.get_spec(name)
+        if spec is None or spec.end > len(self.data):
+            return None
+        return ParsedField(spec, bytes(self.data[spec.slice]), self[name])
+
+    def item_table(self):
+        """ItemTable of the variable data items (None if the layout has none)"""
+        layout = self.layout
+        if layout is None or not layout.variable_offset:
+            return None
+        return ItemTable(self.data, layout.variable_offset)
+
+    def names(self):
+        """Names of the header and BTI fields of this record type"""
+        layout = self.layout
+        names = list(HEADER_PLAN.by_name)
+        if layout is not None:
+            names.extend(layout.plan.by_name)
+        return names
+
+
+# Main header fields
+HEADER_FIELDS = (
+    # Standard Header (ND5FDHDR)
+    ("ND5FDBID", 0x000, 2, "BIT", "RECORD ID = X'D5FD'"),
+    ("ND5FDCHK", 0x002, 1, "BIT", "RECORD CODE CHECK"),
+    ("ND5FDCTL", 0x003, 1, "BIT", "CONTROL BYTE"),
+    ("ND5FDPGM", 0x004, 4, "CHAR", "LAST PROGRAM TO FILE"),
+    ("ND5FDFCH", 0x008, 4, "FA4", "FORWARD CHAIN ADDRESS"),
+    ("ND5FDBCH", 0x00C, 4, "FA4", "BACKCHAIN ADDRESS"),
+    ("SPARE1", 0x010, 16, "SPARE", "SPARES"),
+    # BARTS Control Header (ND5FDCHD)
+    ("ND5FDTYP", 0x020, 3, "CHAR", "BARTS RECORD TYPE"),
+    ("ND5FDETK", 0x023, 1, "CHAR", "ELECTRONIC DOCUMENT"),
+    ("ND5FDBNC", 0x024, 2, "CHAR", "BLOCK NBR IN CHAIN"),
+    ("ND5FDNBC", 0x026, 2, "CHAR", "TOTAL NBR OF BLOCKS"),
+    ("ND5FDSN1", 0x028, 2, "BIN", "SEQUENCE NBR OF BLOCK"),
+    ("ND5FDSN2", 0x02A, 2, "BIN", "TOTAL NBR OF BLOCKS SENT"),
+    ("ND5FDNAB", 0x02C, 2, "BIN", "NEXT AVAILABLE BYTE"),
+    ("ND5FDCIR", 0x02E, 2, "BIN", "COUNT OF DATA ITEMS"),
+    # System Security Controls (ND5FDSSC)
+    ("ND5FDRTI", 0x030, 1, "BIT", "RETRANSMIT INDICATOR"),
+    ("ND5FDEXT", 0x031, 1, "CHAR", "XT TAXES ELIMINATED"),
+    ("ND5FDMUR", 0x032, 1, "CHAR", "BARTS USER INDICATOR"),
+    ("SPARE2", 0x033, 1, "SPARE", "SPARE"),
+    ("ND5FDH01", 0x034, 4, "BIN", "HASHTOTAL #1"),
+    ("ND5FDH02", 0x038, 4, "BIN", "HASHTOTAL #2"),
+    ("ND5FDH03", 0x03C, 2, "BIN", "HASHTOTAL #3"),
+    ("ND5FDH04", 0x03E, 2, "BIN", "HASHTOTAL #4"),
+    ("ND5FDH05", 0x040, 2, "BIN", "HASHTOTAL #5"),
+    ("ND5FDH06", 0x042, 2, "BIN", "HASHTOTAL #6"),
+    ("ND5FDH07", 0x044, 2, "BIN", "HASHTOTAL #7"),
+    ("ND5FDH08", 0x046, 2, "BIN", "HASHTOTAL #8"),
+    ("ND5FDH09", 0x048, 4, "BIN", "HASHTOTAL #9"),
+    ("ND5FDH10", 0x04C, 2, "BIN", "HASHTOTAL #10"),
+    ("ND5FDH11", 0x04E, 2, "BIN", "HASHTOTAL #11"),
+    ("ND5FDH12", 0x050, 4, "BIN", "HASHTOTAL #12"),
+    ("SPARE3", 0x054, 7, "SPARE", "SPARES"),
+    ("ND5FDTER", 0x05B, 3, "BIT", "CONNECTIVITY TRANSMISSION ERRORS"),
+    ("ND5FDTCI", 0x05E, 2, "BIN", "TOTAL COUNT OF ITINERARY SEGMENTS"),
+)
+
+# TAR structure fields (ND5FDTAR) - offset from 0x060
+TAR_FIELDS = (
+    ("ND5FDTKN", 0x000, 14, "CHAR", "TICKET NUMBER"),
+    ("ND5FDCTN", 0x00E, 3, "CHAR", "CONJUNCTION TICKET NBR RANGE"),
+    ("ND5FDPNL", 0x011, 6, "CHAR", "PNR LOCATOR"),
+    ("ND5FDCCP", 0x017, 1, "BIT", "CREDIT CARD RESTRICTIONS"),
+    ("ND5FDBDI", 0x018, 1, "CHAR", "BASE FARE DECIMAL INDICATOR"),
+    ("ND5FDBEI", 0x019, 1, "CHAR", "INVOL/REISSUE BACKGROUND"),
+    ("ND5FDTBS", 0x01A, 8, "PIC", "BASE FARE AMOUNT"),
+    ("ND5FDTCC", 0x022, 3, "CHAR", "BASE FARE CURRENCY CODE"),
+    ("ND5FDFCC", 0x025, 3, "CHAR", "TOTAL FARE CURRENCY CODE"),
+    ("ND5FDTDI", 0x028, 1, "CHAR", "TOTAL FARE DECIMAL INDICATOR"),
+    ("SPARE_TAR1", 0x029, 1, "SPARE", "SPARE BYTE"),
+    ("ND5FDTTF", 0x02A, 8, "PIC", "TOTAL FARE"),
+    ("ND5FDFTA", 0x032, 8, "PIC", "FARE TAX TOTAL AMOUNT"),
+    ("ND5FDPTA", 0x03A, 8, "PIC", "FORM OF PAYMENT TAX TOTAL AMOUNT"),
+    ("SPARE_TAR2", 0x042, 24, "SPARE", "SPARE BYTES"),
+    ("ND5FDFPI", 0x05A, 1, "BIT", "FARE PRICING INDICATOR"),
+    ("ND5FDFTI", 0x05B, 2, "CHAR", "FARE TYPE INDICATOR"),
+    ("SPARE_TAR3", 0x05D, 3, "SPARE", "SPARE BYTES"),
+    ("ND5FDTME", 0x060, 4, "CHAR", "TIME OF ACTIVITY (HHMM)"),
+    ("ND5FDDTE", 0x064, 2, "BIN", "DATE OF ACTIVITY"),
+    ("ND5FDCIC", 0x066, 3, "CHAR", "CITY CODE"),
+    ("SPARE_TAR4", 0x069, 2, "SPARE", "SPARES - CITY CODE EXPANSION"),
+    ("ND5FDOTN", 0x06B, 4, "CHAR", "OFFICE TYPE / NAME CODE"),
+    ("SPARE_TAR5", 0x06F, 1, "SPARE", "SPARE BYTE"),
+    ("ND5FDANS", 0x070, 5, "CHAR", "AGENT NUMERIC SINE"),
+    ("ND5FDAGI", 0x075, 2, "CHAR", "AGENT ID"),
+    ("SPARE_TAR6", 0x077, 1, "SPARE", "SPARE BYTE"),
+    ("ND5FDASA", 0x078, 3, "BIT", "SET ADDR OF TICKET CREATION"),
+    ("SPARE_TAR7", 0x07B, 1, "SPARE", "SPARE BYTE"),
+    ("ND5FDIAC", 0x07C, 2, "CHAR", "ISSUING AIRLINE CODE"),
+    ("SPARE_TAR8", 0x07E, 1, "SPARE", "SPARE - AIRLINE CODE EXPANSION"),
+    ("ND5FDFPP", 0x07F, 1, "CHAR", "PURPOSE OF FOP"),
+    ("ND5FDPTP", 0x080, 1, "CHAR", "PASSENGER TYPE CODE (PTC)"),
+    ("SPARE_TAR9", 0x081, 7, "SPARE", "SPARE BYTES"),
+    ("ND5FDTDF", 0x088, 1, "CHAR", "TICKET DATA ITEM AREA"),
+)
+
+# ATR structure fields (ND5FDATR) - offset from 0x060
+ATR_FIELDS = (
+    ("ND5FDWOU", 0x000, 2, "BIN", "COUNT OF TRANSACTION ENTRIES"),
+    ("SPARE_ATR1", 0x002, 2, "SPARE", "SPARES"),
+)
+
+# AIR structure fields (ND5FDAIR) - offset from 0x060
+AIR_FIELDS = (
+    ("ND5FDRTD", 0x000, 7, "CHAR", "AGENT ID"),
+    ("SPARE_AIR1", 0x007, 1, "SPARE", "SPARE"),
+    ("ND5FDRTC", 0x008, 2, "BIN", "COUNT OF TRANSACTION CODE ITEMS"),
+)
+
+# IFR structure fields (ND5FDIFR) - offset from 0x060
+IFR_FIELDS = (
+    ("ND5FDCNT", 0x000, 2, "BIN", "COUNT OF IN-FLIGHT SALES DATA ENTRIES"),
+    ("SPARE_IFR1", 0x002, 2, "SPARE", "SPARES"),
+)
+
+# BOW structure fields (ND5FDBOW) - offset from 0x060
+BOW_FIELDS = (
+    ("ND5FDDBD", 0x000, 7, "CHAR", "CREATION DATE"),
+    ("ND5FDSSS", 0x007, 3, "CHAR", "STATION CODE"),
+    ("ND5FDSLC", 0x00A, 4, "CHAR", "LOCATION CODE"),
+    ("ND5FDPAD", 0x00E, 3, "BIT", "PRINTER ADDRESS"),
+    ("ND5FDAII", 0x011, 8, "CHAR", "VOID AGENT ID"),
+    ("SPARE_BOW1", 0x019, 1, "SPARE", "SPARE"),
+    ("ND5FDSID", 0x01A, 10, "CHAR", "SECURITY ID"),
+    ("ND5FDBTA", 0x024, 4, "BIT", "BTI FILE ADDRESS"),
+)
+
+# COL structure fields (ND5FDCOL) - offset from 0x060
+COL_FIELDS = (
+    ("ND5FDXFC", 0x000, 4, "CHAR", "OFFICE CODE"),
+    ("ND5FDXTY", 0x004, 3, "CHAR", "CITY CODE"),
+    ("SPARE_COL1", 0x007, 2, "SPARE", "SPARES"),
+    ("ND5FDXLN", 0x009, 1, "BIT", "COLLECTION REPORT NUMBER"),
+    ("ND5FDXLD", 0x00A, 2, "BIN", "COLLECTION REPORT DATE"),
+    ("ND5FDXFD", 0x00C, 2, "BIN", "COLLECTION REPORT FROM DATE"),
+    ("ND5FDXAI", 0x00E, 7, "CHAR", "SUMMARY AGENT ID"),
+    ("ND5FDXID", 0x015, 7, "CHAR", "CLOSEOUT AGENT ID"),
+    ("ND5FDXOD", 0x01C, 2, "BIN", "CLOSEOUT DATE"),
+    ("ND5FDXON", 0x01E, 1, "BIT", "CLOSEOUT NUMBER"),
+    ("ND5FDXI1", 0x01F, 1, "BIT", "AGENT TRANSACTION INDICATOR"),
+    ("ND5FDRDF", 0x020, 1, "CHAR", "COLLECTION REPORT DATA"),
+    ("SPARE_COL2", 0x021, 3, "SPARE", "SPARES"),
+)
+
+# MIR structure fields (ND5FDMIR) - for MAR record type - offset from 0x060
+MIR_FIELDS = (
+    # Sales Location Group (ND5FDVLO)
+    ("ND5FDVFC", 0x000, 4, "CHAR", "OFFICE LOCATION"),
+    ("ND5FDVTY", 0x004, 3, "CHAR", "CITY CODE"),
+    ("SPARE_MIR1", 0x007, 2, "SPARE", "SPARES - CITY CODE EXPANSION"),
+
+    # Basic Transaction Info
+    ("ND5FDVID", 0x009, 7, "CHAR", "CREATING AGENT ID"),
+    ("ND5FDVVD", 0x010, 2, "BIN", "ACTIVITY DATE"),
+    ("ND5FDVYM", 0x012, 2, "BIN", "ACTIVITY TIME"),
+    ("ND5FDVOC", 0x014, 14, "CHAR", "DOCUMENT NUMBER"),
+    ("ND5FDVOJ", 0x022, 2, "CHAR", "CONJUNCTION TICKET NUMBER"),
+    ("ND5FDVCR", 0x024, 3, "CHAR", "DOCUMENT CURRENCY CODE"),
+    ("ND5FDVCA", 0x027, 6, "CHAR", "CREDIT CARD APPROVAL CODE"),
+    ("ND5FDVOP", 0x02D, 37, "CHAR", "FORM OF PAYMENT TEXT"),
+    ("ND5FDVOU", 0x052, 2, "BIN", "COUNT OF TRANSACTION CODE ITEMS"),
+    ("ND5FDVTC", 0x054, 2, "BIN", "COUNT OF TAX TYPE ITEMS"),
+    ("ND5FDVCI", 0x056, 1, "CHAR", "DOCUMENT DECIMAL INDICATOR"),
+    ("ND5FDCRD", 0x057, 1, "BIT", "CREDIT CARD RESTRICTIONS"),
+
+    # Transaction Code Items (3 x 12 bytes)
+    ("ND5FDVVM1", 0x058, 4, "BIN", "TRANSACTION AMOUNT 1"),
+    ("ND5FDVYP1", 0x05C, 3, "CHAR", "TRANSACTION CODE 1"),
+    ("ND5FDVPF1", 0x05F, 1, "CHAR", "PASSENGER FACILITY CHARGE INDICATOR 1"),
+    ("SPARE_CTI1", 0x060, 4, "SPARE", "SPARE BYTES 1"),
+
+    ("ND5FDVVM2", 0x064, 4, "BIN", "TRANSACTION AMOUNT 2"),
+    ("ND5FDVYP2", 0x068, 3, "CHAR", "TRANSACTION CODE 2"),
+    ("ND5FDVPF2", 0x06B, 1, "CHAR", "PASSENGER FACILITY CHARGE INDICATOR 2"),
+    ("SPARE_CTI2", 0x06C, 4, "SPARE", "SPARE BYTES 2"),
+
+    ("ND5FDVVM3", 0x070, 4, "BIN", "TRANSACTION AMOUNT 3"),
+    ("ND5FDVYP3", 0x074, 3, "CHAR", "TRANSACTION CODE 3"),
+    ("ND5FDVPF3", 0x077, 1, "CHAR", "PASSENGER FACILITY CHARGE INDICATOR 3"),
+    ("SPARE_CTI3", 0x078, 4, "SPARE", "SPARE BYTES 3"),
+
+    # Tax Type Items (3 x 8 bytes)
+    ("ND5FDTTI", 0x07C, 24, "CHAR", "TAX TYPE ITEMS (3x8)"),
+
+    # Transaction Amounts
+    ("ND5FDVAT", 0x094, 4, "BIN", "TRANSACTION TOTAL AMOUNT"),
+    ("ND5FDVBS", 0x098, 4, "BIN", "ADDITIONAL COLLECTION BASE AMOUNT"),
+    ("SPARE_MIR2", 0x09C, 2, "SPARE", "SPARE BYTES"),
+    ("ND5FDVNT", 0x09E, 2, "BIN", "COUNT OF ADDITIONAL COLLECTION TAX ITEMS"),
+
+    # Additional Collection Tax Items (3 x 8 bytes)
+    ("ND5FDATE", 0x0A0, 24, "CHAR", "ADDITIONAL COLLECTION TAX ITEMS (3x8)"),
+
+    ("ND5FDATA", 0x0B8, 4, "BIN", "ADDITIONAL COLLECTION TOTAL AMOUNT"),
+    ("ND5FDVEP", 0x0BC, 2, "BIN", "DEPARTURE DATE"),
+    ("ND5FDVRG", 0x0BE, 3, "CHAR", "ORIGIN STATION"),
+    ("SPARE_MIR3", 0x0C1, 2, "SPARE", "SPARES - STATION CODE EXPANSION"),
+    ("ND5FDACI", 0x0C3, 1, "CHAR", "REPS ACCOUNTING SYSTEM CODE"),
+
+    # Routing Data (4 x 8 bytes)
+    ("ND5FDVTG", 0x0C4, 32, "CHAR", "ROUTING DATA (4x8)"),
+    ("ND5FDVDN", 0x0E4, 14, "CHAR", "EXCHANGED DOCUMENT NUMBER"),
+    ("ND5FDVDC", 0x0F2, 1, "BIT", "EXCHANGED DOCUMENT INDICATOR"),
+    ("ND5FDXCG", 0x0F3, 4, "CHAR", "EXCHANGED DOCUMENT INDICATOR DATA"),
+    ("ND5FDVKT", 0x0F7, 14, "CHAR", "TICKET-BY-MAIL TICKET NUMBER"),
+    ("ND5FDVNR", 0x105, 2, "CHAR", "TICKET-BY-MAIL NUMBER RANGE"),
+    ("ND5FDVAM", 0x107, 29, "CHAR", "TICKET-BY-MAIL NAME PURCHASER"),
+    ("ND5FDQCT", 0x124, 4, "BIN", "AMOUNT TENDERED"),
+    ("ND5FDQUR", 0x128, 3, "CHAR", "CURRENCY CODE OF AMOUNT TENDERED"),
+    ("ND5FDQUS", 0x12B, 1, "CHAR", "TENDERED CURRENCY DECIMAL INDICATOR"),
+    # Transaction Code Items (3 x 8 bytes each)
+    ("ND5FDQAM1", 0x12C, 4, "BIN", "TRANSACTION AMOUNT 1"),
+    ("ND5FDQYP1", 0x130, 3, "CHAR", "TRANSACTION CODE 1"),
+    ("SPARE_QT1", 0x133, 1, "SPARE", "SPARE BYTE 1"),
+    ("ND5FDQAM2", 0x134, 4, "BIN", "TRANSACTION AMOUNT 2"),
+    ("ND5FDQYP2", 0x138, 3, "CHAR", "TRANSACTION CODE 2"),
+    ("SPARE_QT2", 0x13B, 1, "SPARE", "SPARE BYTE 2"),
+    ("ND5FDQAM3", 0x13C, 4, "BIN", "TRANSACTION AMOUNT 3"),
+    ("ND5FDQYP3", 0x140, 3, "CHAR", "TRANSACTION CODE 3"),
+    ("SPARE_QT3", 0x143, 1, "SPARE", "SPARE BYTE 3"),
+    # Tax Code Items (3 x 8 bytes each)
+    ("ND5FDQAX1", 0x144, 4, "BIN", "TAX AMOUNT 1"),
+    ("ND5FDQCD1", 0x148, 2, "CHAR", "TAX CODE 1"),
+    ("SPARE_QE1", 0x14A, 2, "SPARE", "SPARE BYTES 1"),
+    ("ND5FDQAX2", 0x14C, 4, "BIN", "TAX AMOUNT 2"),
+    ("ND5FDQCD2", 0x150, 2, "CHAR", "TAX CODE 2"),
+    ("SPARE_QE2", 0x152, 2, "SPARE", "SPARE BYTES 2"),
+    ("ND5FDQAX3", 0x154, 4, "BIN", "TAX AMOUNT 3"),
+    ("ND5FDQCD3", 0x158, 2, "CHAR", "TAX CODE 3"),
+    ("SPARE_QE3", 0x15A, 2, "SPARE", "SPARE BYTES 3"),
+    ("ND5FDQDC", 0x15C, 10, "CHAR", "DOCUMENT CURRENCY EXCHANGE RATE"),
+    ("ND5FDVPC", 0x166, 2, "BIN", "TOTAL PASSENGER COUNT FOR PFC'S"),
+    ("ND5FDCRT", 0x168, 3, "PIC", "COMMISSION RATE FOR GSA TRANSACTIONS"),
+    ("ND5FDREP", 0x16B, 14, "CHAR", "REPRINT DOCUMENT NUMBER"),
+    ("ND5FDCOM", 0x179, 11, "CHAR", "COMMISSION AMOUNT"),
+    ("ND5FDCLT", 0x184, 2, "CHAR", "REPS CARD LEVEL RESULTS"),
+    ("ND5FDFRE", 0x186, 10, "CHAR", "FREQUENT FLYER NUMBER"),
+    ("ND5FDRAS", 0x190, 3, "BIT", "AGENT SET ADDRESS"),
+    ("ND5FDMPS", 0x193, 1, "CHAR", "REPS AUTHORIZATION CHARACTERISTICS INDICATOR"),
+    ("ND5FDMVC", 0x194, 4, "CHAR", "REPS VALIDATION CODE"),
+    ("ND5FDMTR", 0x198, 9, "CHAR", "REPS TRANSACTION ID/BANKNET REFERENCE NUMBER"),
+    ("ND5FDMST", 0x1A1, 2, "CHAR", "REPS AUTHORIZATION RESPONSE/DOWNGRADE INDICATOR"),
+    ("ND5FDRAC", 0x1A3, 1, "CHAR", "REPS AUTHORIZATION SOURCE CODE"),
+    ("ND5FDPOS", 0x1A4, 2, "CHAR", "REPS POS ENTRY MODE"),
+    ("ND5FDBNT", 0x1A6, 2, "BIN", "REPS BANKNET REFERENCE DATE"),
+    ("ND5FDECI", 0x1A8, 2, "CHAR", "REPS ELECTRONIC COMMERCE INDICATOR (ECI)"),
+    ("ND5FDCAV", 0x1AA, 1, "CHAR", "REPS CARDHOLDER AUTHENTICATION VERIFICATION VALUE (CAVV)"),
+    ("ND5FDTIC", 0x1AB, 1, "CHAR", "REPS CARDHOLDER ACTIVATION TERMINAL ID (CAT)"),
+
+    # Flight Data (4 x 12 bytes)
+    ("ND5FDQFD", 0x1AC, 48, "CHAR", "ROUTING DATA (4x12)"),
+
+    ("ND5FDVOL", 0x1DC, 1, "CHAR", "VOL/INVOL INDICATOR"),
+    ("ND5FDRSN", 0x1DD, 3, "CHAR", "REASON CODE"),
+    ("ND5FDARD", 0x1E0, 15, "CHAR", "REPS ACQUIRER REFERENCE DATA (ARD)"),
+    ("ND5FDPSD", 0x1EF, 12, "CHAR", "REPS POINT OF SERVICE DATA (PSD)"),
+    ("ND5FDAVS", 0x1FB, 1, "CHAR", "ADDRESS VERIFICATION INDICATOR"),
+    ("ND5FDRL4", 0x1FC, 4, "CHAR", "REPS LAST FOUR DIGITS OF CREDIT CARD NUMBER"),
+    ("ND5FDRSD", 0x200, 1, "CHAR", "REPS ACCOUNT STATUS DATA"),
+    ("SPARE_MIR4", 0x201, 9, "SPARE", "SPARES"),
+    ("ND5FDRTR", 0x20A, 11, "CHAR", "REPS TOKEN REQUESTOR ID DATA"),
+    ("ND5FDRTL", 0x215, 2, "CHAR", "REPS TOKEN ASSURE LEVEL DATA"),
+    ("ND5FDRSI", 0x217, 1, "CHAR", "REPS SPEND QUALIFIED INDICATOR"),
+    ("ND5FDSP1", 0x218, 1, "CHAR", "REPS SECURITY PROTOCOL"),
+    ("ND5FDTRC", 0x219, 2, "CHAR", "REPS TRANSACTION INTEGRITY CLASS (TIC)"),
+    ("ND5FDPAN", 0x21B, 35, "CHAR", "REPS PAYMENT ACCOUNT REFERENCE NUMBER"),
+    ("ND5FDADI", 0x23E, 1, "CHAR", "REPS MARKET SPECIFIC AUTHORIZATION DATA INDICATOR"),
+    ("ND5FDSTA", 0x23F, 6, "CHAR", "REPS SYSTEM TRACE AUDIT NUMBER (STAN)"),
+    ("ND5FDTDC", 0x245, 2, "CHAR", "REPS TRANSACTION DATA CONDITION CODE"),
+    ("ND5FDPS2", 0x247, 13, "CHAR", "REPS POS DATA"),
+    ("ND5FDPRC", 0x254, 6, "CHAR", "REPS PROCESSING CODE"),
+    ("ND5FDCAN", 0x25A, 1, "CHAR", "REPS CARDHOLDER AUTHENTICATION"),
+    ("ND5FDSCI", 0x25B, 1, "CHAR", "REPS STORED CREDENTIAL INDICATOR"),
+    ("ND5FDAAV", 0x25C, 32, "CHAR", "REPS ACCOUNTHOLDER AUTHENTICATION VALUE"),
+    ("ND5FDSTI", 0x27C, 36, "CHAR", "REPS DIRECTORY SERVER TRANSACTION ID"),
+    ("ND5FDPPC", 0x2A0, 1, "CHAR", "REPS PROGRAM PROTOCOL"),
+
+    # Contactless REPS Data - Individual Fields within ND5FDCRP Group
+    ("ND5FDAAM", 0x2A1, 13, "CHAR", "TAG=9F02 AUTHORIZED AMOUNT"),
+    ("ND5FDAIP", 0x2AE, 4, "CHAR", "TAG=82 APPLICATION INTERCHANGE PROFILE"),
+    ("ND5FDARC", 0x2B2, 16, "CHAR", "TAG=9F26 APPLICATION REQUEST CRYPTOGRAM"),
+    ("ND5FDATC", 0x2C2, 4, "CHAR", "TAG=9F36 APPLICATION TRANSACTION COUNTER"),
+    ("ND5FDAUC", 0x2C6, 4, "CHAR", "TAG=5F2A AUTHORIZATION CURRENCY CODE"),
+    ("ND5FDADT", 0x2CA, 6, "CHAR", "TAG=9A AUTHORIZATION DATE"),
+    ("ND5FDCDT", 0x2D0, 2, "CHAR", "TAG=9F27 CRYPTOGRAM INFORMATION DATA"),
+    ("ND5FDCTT", 0x2D2, 2, "CHAR", "TAG=9C CRYPTOGRAM TRANSACTION TYPE"),
+    ("ND5FDCSN", 0x2D4, 3, "CHAR", "TAG=5F34 CARD SEQUENCE NUMBER"),
+    ("ND5FDCVM", 0x2D7, 6, "CHAR", "TAG=9F34 CARDHOLDER VERIFICATION METHOD"),
+    ("ND5FDCCC", 0x2DD, 1, "CHAR", "CHIP CONDITION CODE"),
+    ("ND5FDDFN", 0x2DE, 32, "CHAR", "TAG=84 DEDICATED FILE NAME"),
+    ("ND5FDDTC", 0x2FE, 2, "CHAR", "DEVICE TYPE"),
+    ("ND5FDFFT", 0x300, 8, "CHAR", "TAG=9F6E FORM FACTOR"),
+    ("ND5FDIFD", 0x308, 16, "CHAR", "TAG=9F1E INTERFACE DEVICE (IFD) SERIAL NO"),
+    ("ND5FDIAD", 0x318, 64, "CHAR", "TAG=9F10 ISSUER APPLICATION DATA (IAD)"),
+    ("ND5FDIRO", 0x358, 24, "CHAR", "TAG=71 ISSUER SCRIPT RESULTS PART I"),
+    ("ND5FDIRT", 0x370, 18, "CHAR", "TAG=72 ISSUER SCRIPT RESULTS PART II"),
+    ("ND5FDTKD", 0x382, 2, "CHAR", "TAG=9F53 TRANSACTION CATEGORY CODE"),
+    ("ND5FDTSC", 0x384, 8, "CHAR", "TAG=9F41 TRANSACTION SEQUENCE COUNTER"),
+    ("ND5FDTAV", 0x38C, 4, "CHAR", "TAG=9F09 TERMINAL APPLICATION VERSION NO"),
+    ("ND5FDTCP", 0x390, 6, "CHAR", "TAG=9F33 TERMINAL CAPABILITIES PROFILE"),
+    ("ND5FDTCO", 0x396, 4, "CHAR", "TAG=9F1A TERMINAL COUNTRY CODE"),
+    ("ND5FDTTD", 0x39A, 6, "CHAR", "TAG=9A TERMINAL TRANSMISSION DATE"),
+    ("ND5FDTTY", 0x3A0, 2, "CHAR", "TAG=9F35 TERMINAL TYPE"),
+    ("ND5FDTVR", 0x3A2, 10, "CHAR", "TAG=95 TERMINAL VERIFICATION RESULTS"),
+    ("ND5FDUNN", 0x3AC, 8, "CHAR", "TAG=9F37 UNPREDICTABLE NUMBER"),
+    ("ND5FDMPE", 0x3B4, 32, "CHAR", "PAYMENT REFERENCE ID"),
+
+    # Fill remaining space to complete 3998 bytes
+    ("MIR_REMAINING", 0x3D4, 3998-0x3D4, "SPARE", "REMAINING MIR STRUCTURE DATA"),
+)
+
+# MAR structure fields (ND5FDMAR) - offset from 0x060
+MAR_FIELDS = (
+    # Fixed length fields (880 bytes)
+    ("SPARE_MAR1", 0x000, 2, "SPARE", "SPARES"),
+
+    # Ticketing City Information
+    ("ND5FDMCI", 0x002, 3, "CHAR", "TICKETING CITY"),
+    ("SPARE_MAR2", 0x005, 3, "SPARE", "SPARES"),
+    ("ND5FDMTG", 0x008, 2, "CHAR", "TICKETING TELETYPE ADDRESS"),
+    ("ND5FDMAL", 0x00A, 2, "CHAR", "TICKETING AIRLINE"),
+    ("SPARE_MAR3", 0x00C, 2, "SPARE", "SPARES"),
+
+    # Passenger Names (2 x 29 bytes)
+    ("ND5FDMNS1", 0x00E, 29, "CHAR", "PASSENGER NAME 1"),
+    ("ND5FDMNS2", 0x02B, 29, "CHAR", "PASSENGER NAME 2"),
+    ("SPARE_MAR4", 0x048, 2, "SPARE", "SPARES"),
+
+    # MCO Number Information
+    ("ND5FDMMN", 0x04A, 14, "CHAR", "MCO NUMBER"),
+    ("ND5FDMDN", 0x058, 1, "CHAR", "DUPE MCO NBR INDICATOR"),
+    ("SPARE_MAR5", 0x059, 1, "SPARE", "SPARE"),
+    ("ND5FDMON", 0x05A, 14, "CHAR", "OLD MCO NUMBER"),
+    ("SPARE_MAR6", 0x068, 2, "SPARE", "SPARES"),
+    ("ND5FDMID", 0x06A, 7, "CHAR", "ISSUE DATE"),
+    ("SPARE_MAR7", 0x071, 1, "SPARE", "SPARE"),
+
+    # Activity Information
+    ("ND5FDMCT", 0x072, 3, "CHAR", "CITY"),
+    ("SPARE_MAR8", 0x075, 3, "SPARE", "SPARES"),
+    ("ND5FDMSI", 0x078, 2, "CHAR", "SELLING TELETYPE ADDRESS"),
+    ("ND5FDMAA", 0x07A, 2, "CHAR", "AIRLINE"),
+    ("SPARE_MAR9", 0x07C, 2, "SPARE", "SPARES"),
+    ("ND5FDMOC", 0x07E, 4, "CHAR", "OFFICE CODE"),
+    ("ND5FDMAG", 0x082, 5, "CHAR", "AGENT NUMERIC SINE"),
+    ("ND5FDMAN", 0x087, 2, "CHAR", "AGENT ID"),
+    ("SPARE_MAR10", 0x089, 1, "SPARE", "SPARE"),
+    ("ND5FDMCY", 0x08A, 3, "CHAR", "CITY CODE"),
+    ("SPARE_MAR11", 0x08D, 2, "SPARE", "SPARES"),
+    ("ND5FDMOF", 0x08F, 4, "CHAR", "OFFICE TYPE/NAME CODE"),
+    ("SPARE_MAR12", 0x093, 1, "SPARE", "SPARE"),
+    ("ND5FDMDT", 0x094, 2, "BIN", "DATE (Local Binary Day NBR)"),
+    ("ND5FDMTM", 0x096, 4, "CHAR", "TIME (Local)"),
+    ("ND5FDMAD", 0x09A, 6, "CHAR", "AGENT SET ADDRESS"),
+    ("SPARE_MAR13", 0x0A0, 6, "SPARE", "SPARES"),
+
+    # Base Fare Amount
+    ("ND5FDMBC", 0x0A6, 3, "CHAR", "BASE FARE CURRENCY CODE"),
+    ("SPARE_MAR14", 0x0A9, 1, "SPARE", "SPARE"),
+    ("ND5FDMBI", 0x0AA, 1, "CHAR", "BASE FARE DECIMAL INDICATOR"),
+    ("SPARE_MAR15", 0x0AB, 1, "SPARE", "SPARE"),
+    ("ND5FDMBA", 0x0AC, 8, "PIC", "BASE FARE AMOUNT"),
+
+    # Equivalent Fare Paid
+    ("ND5FDMEC", 0x0B4, 3, "CHAR", "EQUIVALENT FARE CURRENCY CODE"),
+    ("SPARE_MAR16", 0x0B7, 1, "SPARE", "SPARE"),
+    ("ND5FDMEA", 0x0B8, 8, "PIC", "EQUIVALENT FARE AMOUNT"),
+    ("SPARE_MAR17", 0x0C0, 2, "SPARE", "SPARES"),
+
+    # Tax Amounts
+    ("ND5FDMFC", 0x0C2, 2, "CHAR", "FIRST TAX CODE"),
+    ("SPARE_MAR18", 0x0C4, 2, "SPARE", "SPARES"),
+    ("ND5FDMFX", 0x0C6, 6, "PIC", "FIRST TAX AMOUNT"),
+    ("SPARE_MAR19", 0x0CC, 2, "SPARE", "SPARES"),
+    ("ND5FDMSC", 0x0CE, 2, "CHAR", "SECOND TAX CODE"),
+    ("SPARE_MAR20", 0x0D0, 2, "SPARE", "SPARES"),
+    ("ND5FDMSX", 0x0D2, 6, "PIC", "SECOND TAX AMOUNT"),
+    ("SPARE_MAR21", 0x0D8, 2, "SPARE", "SPARES"),
+    ("SPARE_MAR22", 0x0DA, 2, "SPARE", "SPARES"),
+    ("ND5FDMTE", 0x0DC, 2, "CHAR", "THIRD TAX CODE"),
+    ("SPARE_MAR23", 0x0DE, 2, "SPARE", "SPARES"),
+    ("ND5FDMTX", 0x0E0, 6, "PIC", "THIRD TAX AMOUNT"),
+    ("SPARE_MAR24", 0x0E6, 14, "SPARE", "SPARES"),
+
+    # Totals
+    ("ND5FDMCC", 0x0F4, 3, "CHAR", "TICKET TOTAL CURRENCY CODE"),
+    ("SPARE_MAR25", 0x0F7, 1, "SPARE", "SPARE"),
+    ("ND5FDMTO", 0x0F8, 8, "PIC", "TICKET TOTAL"),
+    ("SPARE_MAR26", 0x100, 2, "SPARE", "SPARES"),
+    ("ND5FDMMC", 0x102, 3, "CHAR", "MISCELLANEOUS TOTAL CURRENCY CODE"),
+    ("SPARE_MAR27", 0x105, 1, "SPARE", "SPARE"),
+    ("ND5FDMMA", 0x106, 8, "PIC", "MISCELLANEOUS TOTAL"),
+    ("SPARE_MAR28", 0x10E, 2, "SPARE", "SPARES"),
+    ("ND5FDMPC", 0x110, 3, "CHAR", "PTA TOTAL CURRENCY CODE"),
+    ("SPARE_MAR29", 0x113, 1, "SPARE", "SPARE"),
+    ("ND5FDMPI", 0x114, 1, "CHAR", "PTA Total Decimal Indicator"),
+    ("SPARE_MAR30", 0x115, 1, "SPARE", "SPARE"),
+    ("ND5FDMPA", 0x116, 8, "PIC", "PTA TOTAL"),
+
+    # Service Charge
+    ("ND5FDMSO", 0x11E, 3, "CHAR", "Service Charge CURRENCY CODE"),
+    ("SPARE_MAR31", 0x121, 1, "SPARE", "SPARE"),
+    ("ND5FDMSA", 0x122, 6, "PIC", "Service Charge Amount"),
+    ("SPARE_MAR32", 0x128, 2, "SPARE", "SPARES"),
+
+    # Purchaser Information
+    ("ND5FDMPN", 0x12A, 29, "CHAR", "PURCHASER NAME"),
+    ("SPARE_MAR33", 0x147, 1, "SPARE", "SPARE"),
+    ("ND5FDMPR", 0x148, 175, "CHAR", "PURCHASER ADDRESS"),
+    ("SPARE_MAR34", 0x1F7, 1, "SPARE", "SPARE"),
+    ("ND5FDMPP", 0x1F8, 80, "CHAR", "PURCHASER PHONE"),
+    ("ND5FDMCP", 0x248, 29, "CHAR", "CARD PRESENTED BY NAME"),
+    ("SPARE_MAR35", 0x265, 1, "SPARE", "SPARE"),
+    ("ND5FDMIA", 0x266, 8, "CHAR", "IATA NUMBER"),
+    ("SPARE_MAR36", 0x26E, 2, "SPARE", "SPARES"),
+
+    # Commission
+    ("ND5FDMIN", 0x270, 1, "CHAR", "COMMISSION TYPE INDICATOR"),
+    ("SPARE_MAR37", 0x271, 1, "SPARE", "SPARE"),
+    ("ND5FDMCN", 0x272, 11, "PIC", "COMMISSION RATE OR AMOUNT"),
+    ("SPARE_MAR38", 0x27D, 1, "SPARE", "SPARE"),
+
+    # Form of Payment
+    ("ND5FDMFO", 0x27E, 58, "CHAR", "FORM OF PAYMENT"),
+    ("ND5FDMCA", 0x2B8, 6, "CHAR", "CREDIT CARD APPROVAL CODE"),
+    ("SPARE_MAR39", 0x2BE, 4, "SPARE", "SPARES"),
+
+    # Residual Value
+    ("ND5FDMRC", 0x2C2, 3, "CHAR", "TOTAL RESIDUAL VALUE CURRENCY CODE"),
+    ("SPARE_MAR40", 0x2C5, 1, "SPARE", "SPARE"),
+    ("ND5FDMRA", 0x2C6, 8, "PIC", "TOTAL RESIDUAL VALUE AMOUNT"),
+    ("SPARE_MAR41", 0x2CE, 2, "SPARE", "SPARES"),
+
+    # Remarks and Routing
+    ("ND5FDMRI", 0x2D0, 57, "CHAR", "REMARKS INFORMATION"),
+    ("ND5FDMRT", 0x309, 57, "CHAR", "ROUTING INFORMATION"),
+
+    # Flight Information
+    ("ND5FDMFD", 0x342, 2, "BIN", "FLIGHT DATE"),
+    ("ND5FDMCD", 0x344, 2, "CHAR", "AIRLINE CODE"),
+    ("SPARE_MAR42", 0x346, 2, "SPARE", "SPARES"),
+    ("ND5FDMBO", 0x348, 3, "CHAR", "BOARDING CITY"),
+    ("SPARE_MAR43", 0x34B, 3, "SPARE", "SPARES"),
+    ("ND5FDMFN", 0x34E, 2, "BIT", "FLIGHT NUMBER"),
+
+    # Bankers Rate
+    ("ND5FDMBR", 0x350, 15, "PIC", "BANKERS BUYING RATE"),
+    ("SPARE_MAR44", 0x35F, 1, "SPARE", "SPARE"),
+
+    # Activity Indicators
+    ("ND5FDMCR", 0x360, 1, "CHAR", "NEWLY CREATED PTA"),
+    ("SPARE_MAR45", 0x361, 1, "SPARE", "SPARE"),
+    ("ND5FDMCM", 0x362, 1, "CHAR", "UPDATE TO CHANGE MCO NBR"),
+    ("SPARE_MAR46", 0x363, 1, "SPARE", "SPARE"),
+    ("ND5FDMUS", 0x364, 1, "CHAR", "UPDATE AND PNR SPLIT"),
+    ("SPARE_MAR47", 0x365, 1, "SPARE", "SPARE"),
+    ("ND5FDMUP", 0x366, 1, "CHAR", "UPDATE AND PNR NOT SPLIT"),
+    ("SPARE_MAR48", 0x367, 1, "SPARE", "SPARE"),
+    ("ND5FDMSP", 0x368, 1, "CHAR", "PTA NOT UPDATED BUT PNR SPLIT"),
+    ("SPARE_MAR49", 0x369, 1, "SPARE", "SPARE"),
+    ("ND5FDMDR", 0x36A, 1, "CHAR", "DELTA SOLD PTA CREDIT CARD REFUND"),
+    ("SPARE_MAR50", 0x36B, 1, "SPARE", "SPARE"),
+    ("ND5FDMRD", 0x36C, 1, "CHAR", "OTHER REFUND"),
+    ("SPARE_MAR51", 0x36D, 1, "SPARE", "SPARE"),
+    ("ND5FDMMS", 0x36E, 1, "CHAR", "MISCELLANEOUS FUNDS USED"),
+    ("SPARE_MAR52", 0x36F, 1, "SPARE", "SPARE"),
+
+    # Start of variable data items
+    ("ND5FDMDI", 0x370, 1, "CHAR", "START OF PREPAID DATA ITEMS"),
+)
+
+# VOI structure fields (ND5FDVOI) - offset from 0x060
+VOI_FIELDS = (
+    ("ND5FDVNB", 0x000, 14, "CHAR", "DOCUMENT NUMBER"),
+    ("ND5FDVCJ", 0x00E, 2, "CHAR", "CONJUNCTION NUMBER"),
+    ("ND5FDVCD", 0x010, 2, "BIN", "CREATION DATE (PARS BINARY DAY NBR)"),
+    ("ND5FDVAG", 0x012, 7, "CHAR", "CREATING AGENT ID"),
+    ("ND5FDVVA", 0x019, 7, "CHAR", "VOID AGENT ID"),
+    ("ND5FDVSL", 0x020, 7, "CHAR", "SALES LOCATION"),
+    ("ND5FDVOT", 0x027, 1, "CHAR", "VOID TYPE"),
+    ("ND5FDORT", 0x028, 1, "CHAR", "ORIGINAL REFUND TYPE"),
+    ("SPARE_VOI", 0x029, 9, "SPARE", "SPARES"),
+)
+
+# REF structure fields (ND5FDREF) - offset from 0x060
+REF_FIELDS = (
+    ("ND5FDREC", 0x000, 14, "CHAR", "REFUND RECEIPT NUMBER"),
+    ("ND5FDCCA", 0x00E, 21, "CHAR", "TYPE OF PAYMENT"),
+    ("ND5FDPCN", 0x023, 29, "CHAR", "PASSENGER NAME"),
+    ("ND5FDRCR", 0x040, 3, "CHAR", "CURRENCY CODE"),
+    ("ND5FDINV", 0x043, 1, "CHAR", "INVOLUNTARY INDICATOR"),
+    ("ND5FDORG", 0x044, 3, "CHAR", "ORIGIN CITY CODE"),
+    ("ND5FDDES", 0x047, 3, "CHAR", "DESTINATION CITY CODE"),
+    ("ND5FDTRA", 0x04A, 8, "CHAR", "TRAVEL AGY IDENTIFIER-IATA"),
+    ("ND5FDAGY", 0x052, 5, "CHAR", "AGENCY COMMISSION"),
+    ("ND5FDISS", 0x057, 3, "CHAR", "ISSUING CARRIER"),
+    ("ND5FDFAA", 0x05A, 8, "CHAR", "FARE AMOUNT"),
+    ("ND5FDTC1", 0x062, 3, "CHAR", "1ST MISC TRANSACTION CODE"),
+    ("ND5FDTC2", 0x065, 3, "CHAR", "2ND MISC TRANSACTION CODE"),
+    ("ND5FDTC3", 0x068, 3, "CHAR", "3RD MISC TRANSACTION CODE"),
+    ("ND5FDTA1", 0x06B, 8, "CHAR", "1ST MISC TRANSACTION AMOUNT"),
+    ("ND5FDTA2", 0x073, 8, "CHAR", "2ND MISC TRANSACTION AMOUNT"),
+    ("ND5FDTA3", 0x07B, 8, "CHAR", "3RD MISC TRANSACTION AMOUNT"),
+    ("ND5FDKN1", 0x0B0, 14, "CHAR", "1ST REFUNDED TICKET NUMBER"),
+    ("ND5FDKN2", 0x0BE, 14, "CHAR", "2ND REFUNDED TICKET NUMBER"),
+    ("ND5FDKN3", 0x0CC, 14, "CHAR", "3RD REFUNDED TICKET NUMBER"),
+    ("ND5FDKN4", 0x0DA, 14, "CHAR", "4TH REFUNDED TICKET NUMBER"),
+    ("ND5FDKN5", 0x0E8, 14, "CHAR", "5TH REFUNDED TICKET NUMBER"),
+    ("ND5FDCN1", 0x0F6, 4, "CHAR", "1ST REFUNDED TICKET COUPON"),
+    ("ND5FDCN2", 0x0FA, 4, "CHAR", "2ND REFUNDED TICKET COUPON"),
+    ("ND5FDCN3", 0x0FE, 4, "CHAR", "3RD REFUNDED TICKET COUPON"),
+    ("ND5FDCN4", 0x102, 4, "CHAR", "4TH REFUNDED TICKET COUPON"),
+    ("ND5FDCN5", 0x106, 4, "CHAR", "5TH REFUNDED TICKET COUPON"),
+    ("ND5FDPNG", 0x10A, 3, "CHAR", "PENALTY CHARGE CODE - PEN"),
+    ("ND5FDNT2", 0x10D, 7, "CHAR", "PENALTY CHARGE AMOUNT"),
+    ("ND5FDTRT", 0x114, 8, "CHAR", "TOTAL REFUNDED AMOUNT"),
+    ("ND5FDSTM", 0x11C, 7, "CHAR", "SYSTEM DATE"),
+    ("ND5FDELC", 0x123, 7, "CHAR", "SALES LOCATION"),
+    ("ND5FDATD", 0x12A, 7, "CHAR", "AGENT ID"),
+    ("ND5FDCOD", 0x131, 3, "CHAR", "ADMIN SERVICE CHG CODE - ASC"),
+    ("ND5FDCOS", 0x134, 7, "CHAR", "ADMIN SERVICE CHG AMT"),
+    ("ND5FDOTC", 0x1E0, 3, "CHAR", "OTHER MISC CHARGES CODE"),
+    ("ND5FDOTA", 0x1E3, 7, "CHAR", "OTHER MISC CHARGES AMOUNT"),
+    ("ND5FDPRI", 0x1EA, 1, "CHAR", "PROCESSING INDICATOR"),
+    ("ND5FDPNM", 0x290, 38, "CHAR", "PAYEE NAME"),
+    ("ND5FDAD1", 0x2B6, 30, "CHAR", "PAYEE ADDRESS 1"),
+    ("ND5FDAD2", 0x2D4, 30, "CHAR", "PAYEE ADDRESS 2"),
+    ("ND5FDCTY", 0x2F2, 15, "CHAR", "CITY"),
+    ("ND5FDSUB", 0x301, 2, "CHAR", "SUBCOUNTRY"),
+    ("ND5FDCTR", 0x303, 3, "CHAR", "COUNTRY"),
+    ("ND5FDZIP", 0x306, 9, "CHAR", "ZIP CODE"),
+    ("ND5FDREA", 0x30F, 1, "CHAR", "REASON FOR REFUND"),
+    ("ND5FDDTI", 0x310, 2, "BIN", "ORIGINAL DATE TKT ISSUED"),
+    ("ND5FDCKN", 0x312, 15, "CHAR", "REFUND CHECK NUMBER"),
+    ("ND5FDDCI", 0x321, 2, "BIN", "DATE REFUND CHECK ISSUED"),
+    ("ND5FDFFN", 0x323, 10, "CHAR", "FREQUENT FLYER NUMBER"),
+    ("ND5FDFTN", 0x32D, 4, "CHAR", "FLIGHT NUMBER"),
+    ("ND5FDFDT", 0x331, 2, "BIN", "FLIGHT DATE"),
+    ("ND5FDDNR", 0x333, 14, "CHAR", "REPRINT DOCUMENT NUMBER"),
+    ("ND5FDREI", 0x341, 1, "CHAR", "REFUND/EXCHANGE INDICATOR"),
+    ("ND5FDPEI", 0x342, 1, "CHAR", "PAPER/ELECTRONIC INDICATOR"),
+    ("ND5FDNTN", 0x343, 13, "CHAR", "NEW TICKET NUMBER"),
+    ("ND5FDAMT", 0x350, 11, "CHAR", "REFUND AMOUNT COMPUTED"),
+    ("ND5FDRMK", 0x35B, 55, "CHAR", "REMARKS FROM TEMPLATE"),
+    ("ND5FDRM2", 0x392, 30, "CHAR", "SECOND LINE OF REMARKS"),
+    ("ND5FDRRD", 0x3B0, 7, "CHAR", "REFUND REQUEST DATE"),
+    ("ND5FDARF", 0x3B7, 1, "BIT", "CREDIT CARD RESTRICTIONS"),
+    ("SPARE_REF1", 0x3B8, 8, "SPARE", "SPARES"),
+
+    # Refund Taxes (99 x 16 bytes each) - break down first few entries
+    ("ND5FD99C1", 0x3C0, 2, "CHAR", "TAX CODE 1"),
+    ("SPARE_TX1", 0x3C2, 3, "SPARE", "SPARES 1"),
+    ("ND5FD99T1", 0x3C5, 11, "CHAR", "TAX AMOUNT 1"),
+
+    ("ND5FD99C2", 0x3D0, 2, "CHAR", "TAX CODE 2"),
+    ("SPARE_TX2", 0x3D2, 3, "SPARE", "SPARES 2"),
+    ("ND5FD99T2", 0x3D5, 11, "CHAR", "TAX AMOUNT 2"),
+
+    ("ND5FD99C3", 0x3E0, 2, "CHAR", "TAX CODE 3"),
+    ("SPARE_TX3", 0x3E2, 3, "SPARE", "SPARES 3"),
+    ("ND5FD99T3", 0x3E5, 11, "CHAR", "TAX AMOUNT 3"),
+
+    ("ND5FD99C4", 0x3F0, 2, "CHAR", "TAX CODE 4"),
+    ("SPARE_TX4", 0x3F2, 3, "SPARE", "SPARES 4"),
+    ("ND5FD99T4", 0x3F5, 11, "CHAR", "TAX AMOUNT 4"),
+
+    ("ND5FD99C5", 0x400, 2, "CHAR", "TAX CODE 5"),
+    ("SPARE_TX5", 0x402, 3, "SPARE", "SPARES 5"),
+    ("ND5FD99T5", 0x405, 11, "CHAR", "TAX AMOUNT 5"),
+
+    # Remaining 94 tax entries (94 x 16 = 1504 bytes)
+    ("ND5FDTXS_REMAINING", 0x410, 1504, "CHAR", "REMAINING REFUND TAXES (94x16)"),
+
+    # Tax Surcharge Data (99 x 5 bytes each) - break down first few
+    ("ND5FDOBT1", 0x9F0, 2, "CHAR", "FEE CODE 1"),
+    ("ND5FDOBS1", 0x9F2, 3, "CHAR", "FEE SUBCODE 1"),
+
+    ("ND5FDOBT2", 0x9F5, 2, "CHAR", "FEE CODE 2"),
+    ("ND5FDOBS2", 0x9F7, 3, "CHAR", "FEE SUBCODE 2"),
+
+    ("ND5FDOBT3", 0x9FA, 2, "CHAR", "FEE CODE 3"),
+    ("ND5FDOBS3", 0x9FC, 3, "CHAR", "FEE SUBCODE 3"),
+
+    # Remaining 96 surcharge entries (96 x 5 = 480 bytes)
+    ("ND5FDOBA_REMAINING", 0x9FF, 480, "CHAR", "REMAINING TAX SURCHARGE DATA (96x5)"),
+
+    ("ND5FDRPE", 0xBDF, 32, "CHAR", "PAYMENT REFERENCE ID"),
+)
+
+# Variable length data items structure (ND5FDITM)
+# Used by both TAR records (at ND5FDTDF offset) and PAR records (at ND5FDMDI offset)
+VARIABLE_DATA_ITEM_FIELDS = (
+    ("ND5FDTID", 0x000, 1, "BIT", "Data Item Type - ID"),
+    ("ND5FDTCT", 0x001, 2, "BIN", "Byte count of this data item"),
+    ("ND5FDVTD", 0x003, 1, "CHAR", "Start of Variable Length Text (1-1400 bytes)"),
+)
+
+
+# Offset of the ND5FDBTI structure that follows the header
+BTI_OFFSET = 0x060
+
+# Record ID at offset 0 of every record, used to find records in raw binary input
+RECORD_ID = b"\xD5\xFD"
+
+# EBCDIC A-I, J-R, S-Z (record type codes are alphabetic)
+EBCDIC_LETTERS = frozenset(range(0xC1, 0xCA)) | frozenset(range(0xD1, 0xDA)) | frozenset(range(0xE2, 0xEA))
+
+RecordLayout = namedtuple("RecordLayout", ["name", "record_types", "fields", "banner", "variable_offset", "plan"])
+
+# (record types, layout name, fields, banner, field where variable data items start)
+LAYOUT_DEFINITIONS = (
+    (("TAR", "NBT"), "TAR", TAR_FIELDS, "Using TAR (Ticket Accounting Record) structure", "ND5FDTDF"),
+    (("REF",), "REF", REF_FIELDS, "Using REF (Refund) structure", None),
+    (("MAR",), "MIR", MIR_FIELDS, "Using MIR (Miscellaneous Transaction Data) structure", None),
+    (("PAR",), "MAR", MAR_FIELDS, "Using MAR (Prepaid Accounting Data) structure", "ND5FDMDI"),
+    (("VOI",), "VOI", VOI_FIELDS, "Using VOI (Void Transaction) structure", None),
+    (("ATR",), "ATR", ATR_FIELDS, "Using ATR (Agent Transaction) structure", None),
+    (("AIR", "VDC"), "AIR", AIR_FIELDS, "Using AIR (Additional Collection) structure", None),
+    (("IFR",), "IFR", IFR_FIELDS, "Using IFR (In-Flight Sales) structure", None),
+    (("BOW",), "BOW", BOW_FIELDS, "Using BOW (List Transaction Data) structure", None),
+    (("COL", "CRR"), "COL", COL_FIELDS, "Using COL (Collection Report) structure", None),
+)
+
+
+def build_layout_registry(definitions):
+    """Build the read-only record type -> RecordLayout registry"""
+    registry = {}
+    for record_types, name, fields, banner, variable_field in definitions:
+        variable_offset = None
+        if variable_field:
+            variable_offset = BTI_OFFSET + next(
+                offset for field_name, offset, _, _, _ in fields if field_name == variable_field
+            )
+        layout = RecordLayout(name, record_types, fields, banner, variable_offset, LayoutPlan(fields, BTI_OFFSET))
+        for record_type in record_types:
+            registry[record_type] = layout
+    return MappingProxyType(registry)
+
+
+# Built once at import and shared by every parser
+HEADER_PLAN = LayoutPlan(HEADER_FIELDS)
+
+
+class NullRecordTimer:
+    """Stage timer of a parser without stats (see d5fd_stats.RecordTimer): every hook does nothing"""
+
+    def start(self):
+        pass
+
+    def header_done(self, record_type, length, known):
+        pass
+
+    def bti_done(self, record_type):
+        pass
+
+    def items_done(self, items):
+        pass
+
+
+NULL_RECORD_TIMER = NullRecordTimer()
+RECORD_LAYOUTS = build_layout_registry(LAYOUT_DEFINITIONS)
+
+
+# Report column widths per header size
+HEADER_CONFIGS = {
+    "small": {
+        "sep_width": 20, 
+        "table_width": 20, 
+        "hex_width": 10, 
+        "value_width": 8,
+        "field_width": 8,
+        "offset_width": 6,
+        "length_width": 4
+    },
+    "normal": {"sep_width": 80, "table_width": 120, "hex_width": 32, "value_width": 30},
+    "large": {"sep_width": 120, "table_width": 160, "hex_width": 40, "value_width": 35}
+}
+
+
+class D5FDFileParser:
+    # Shared layout tables, kept as attributes for existing callers
+    header_fields = HEADER_FIELDS
+    tar_fields = TAR_FIELDS
+    atr_fields = ATR_FIELDS
+    air_fields = AIR_FIELDS
+    ifr_fields = IFR_FIELDS
+    bow_fields = BOW_FIELDS
+    col_fields = COL_FIELDS
+    mir_fields = MIR_FIELDS
+    mar_fields = MAR_FIELDS
+    voi_fields = VOI_FIELDS
+    ref_fields = REF_FIELDS
+    variable_data_item_fields = VARIABLE_DATA_ITEM_FIELDS
+
+    def __init__(self, header_size="small", code_page="cp037", stats=None):
+        self.header_size = header_size
+        self.code_page = code_page
+        self.ebcdic_table = get_ebcdic_table(code_page)
+        # d5fd_stats.ParserStats collecting stage timings, or None (the default) to skip all timing
+        self.stats = stats
+        self.record_timer = NULL_RECORD_TIMER if stats is None else stats.record_timer(DATA_ITEM_TYPES)
+
+    def get_variable_data_offset(self, record_type):
+        """Get the offset where variable length data items start"""
+        layout = RECORD_LAYOUTS.get(record_type)
+        return layout.variable_offset if layout else None  # No variable data for other record types
+
+
+    def parse_displaced_line(self, line):
+        """Split a displacement dump line into (offset, hex data), or None if it has no data
+
+        The hex data keeps its spaces; bytes.fromhex() skips them.
+        """
+        # Handle format with displayable text: "000 D5FD0000 C2C1C3C1 00000000 00000000 ** N   BACA        ¬"
+        # Split by '**' and take only the hex part
+        parts = line.partition('**')[0].split(None, 1)
+        if len(parts) < 2:
+            return None
+
+        try:
+            offset = int(parts[0], 16)  # Convert hex offset to int
+        except ValueError:
+            return None
+        return offset, parts[1]
+
+    def build_displaced_record(self, data_dict):
+        """Build a continuous byte array from {offset: hex data} lines of one record"""
+        record = bytearray()
+        for offset, hex_data in sorted(data_dict.items()):
             try:
-                offset = int(parts[0], 16)  # Convert hex offset to int
-                hex_data = ''.join(parts[1:])  # Join all hex parts
-                
-                # Skip lines with all zeros
-                if hex_data.replace('0', '') == '':
-                    continue
-                    
-                data_dict[offset] = hex_data
+                self.write_displaced_data(record, offset, bytes.fromhex(hex_data))
             except ValueError:
                 continue
-        
-        # Build continuous byte array
-        if not data_dict:
-            return b''
-            
-        max_offset = max(data_dict.keys())
-        result = bytearray(max_offset + len(bytes.fromhex(data_dict[max_offset])))
-        
-        for offset, hex_data in data_dict.items():
+        return bytes(record)
+
+    @staticmethod
+    def write_displaced_data(record, offset, data):
+        """Write data at offset into a growable record buffer (gaps are zero-filled)"""
+        gap = offset - len(record)
+        if gap >= 0:
+            if gap:
+                record += bytes(gap)
+            record += data
+        else:
+            record[offset:offset + len(data)] = data
+
+    def iter_displaced_records(self, lines):
+        """Yield one byte buffer per record from displacement-format dump lines
+
+        Single pass: each line is hex-decoded straight into the current
+        record's buffer. A new record starts when the offset goes back
+        (normally to 000, where the next X'D5FD' record ID sits), so only one
+        record is held at a time. All-zero lines are skipped; they only
+        reappear as zero fill when later data follows them.
+        """
+        parse_line = self.parse_displaced_line
+        write_data = self.write_displaced_data
+        record = bytearray()
+        prev_offset = -1
+
+        for line in lines:
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            offset, hex_data = parsed
+
+            # Record boundary: offset wrapped back to the start of a new record
+            if offset <= prev_offset and record:
+                yield bytes(record)
+                record = bytearray()
+            prev_offset = offset
+
             try:
-                data_bytes = bytes.fromhex(hex_data)
-                result[offset:offset + len(data_bytes)] = data_bytes
+                data = bytes.fromhex(hex_data)
             except ValueError:
+                continue  # not a dump line
+            # Skip lines with all zeros
+            if not any(data):
                 continue
-                
-        return bytes(result)
+            write_data(record, offset, data)
+
+        if record:
+            yield bytes(record)
+
+    def parse_displaced_input(self, input_data):
+        """Parse input data with displacement offsets (first record only)"""
+        return next(self.iter_displaced_records(io.StringIO(input_data)), b'')
+
+    def is_displaced_line(self, line):
+        """Check if a dump line starts with a displacement offset"""
+        first = line.strip().split()[0]
+        return first.isdigit() or any(c in first for c in 'ABCDEF')
+
+    def iter_input_lines(self, hex_input):
+        """Iterate the lines of hex text or of an iterable of lines (e.g. an open file), skipping leading blanks
+
+        Returns (first non-blank line, remaining lines); the first line is None for empty input.
+        """
+        lines = iter(io.StringIO(hex_input) if isinstance(hex_input, str) else hex_input)
+        return next((line for line in lines if line.strip()), None), lines
+
+    def iter_records(self, hex_input):
+        """Yield one byte buffer per record from hex text or an iterable of lines (e.g. an open file)
+
+        Lines are consumed as they are read, so a large dump is never loaded whole.
+        """
+        first_line, lines = self.iter_input_lines(hex_input)
+        if first_line is None:
+            return
 
-    def hex_to_bytes(self, hex_string):
         # Check if input has displacement format
-        if any(line.strip().split()[0].isdigit() or 
-               any(c in line.strip().split()[0] for c in 'ABCDEF') 
-               for line in hex_string.split('\n') if line.strip()):
-            return self.parse_displaced_input(hex_string)
+        if self.is_displaced_line(first_line):
+            yield from self.iter_displaced_records(itertools.chain([first_line], lines))
         else:
-            hex_clean = hex_string.replace(' ', '').replace('\n', '')
-            return bytes.fromhex(hex_clean)
+            # Continuous hex string: a single record
+            record = bytearray()
+            for line in itertools.chain([first_line], lines):
+                record += bytes.fromhex(line.partition('**')[0])
+            yield bytes(record)
+
+    def is_record_start(self, buffer, pos):
+        """Check that an X'D5FD' at pos is followed by an alphabetic BARTS record type"""
+        type_code = buffer[pos + 0x020:pos + 0x023]
+        return len(type_code) == 3 and all(byte in EBCDIC_LETTERS for byte in type_code)
+
+    def find_record_start(self, buffer, start):
+        """Find the next record header at or after start (-1 if none)"""
+        pos = buffer.find(RECORD_ID, start)
+        while pos != -1 and not self.is_record_start(buffer, pos):
+            pos = buffer.find(RECORD_ID, pos + 1)
+        return pos
+
+    def iter_binary_spans(self, buffer):
+        """Yield (start, end) byte ranges of the records in a raw EBCDIC binary buffer
+
+        A record starts at an X'D5FD' record ID and runs to the next record ID
+        found past its ND5FDNAB (next available byte), so record IDs inside
+        the used part of a record are not mistaken for a new record.
+        """
+        size = len(buffer)
+        pos = self.find_record_start(buffer, 0)
+        while pos != -1:
+            next_available = int.from_bytes(buffer[pos + 0x02C:pos + 0x02E], 'big')
+            next_pos = self.find_record_start(buffer, pos + max(next_available, BTI_OFFSET))
+            yield pos, (size if next_pos == -1 else next_pos)
+            pos = next_pos
+
+    def iter_binary_records(self, buffer):
+        """Yield zero-copy memoryview slices of the records in a raw binary buffer"""
+        view = memoryview(buffer)
+        for start, end in self.iter_binary_spans(buffer):
+            yield view[start:end]
+
+    def iter_binary_file(self, path):
+        """Yield memoryview records from a raw binary file mapped with mmap"""
+        with open_input(path, binary=True) as mapped:
+            yield from self.iter_binary_records(mapped)
+
+    def iter_binary_chunks(self, buffer, records_per_chunk=500):
+        """Yield (first record number, bytes) chunks of whole records from a raw binary buffer"""
+        first_record = 1
+        spans = []
+        for spans_count, span in enumerate(self.iter_binary_spans(buffer), 1):
+            spans.append(span)
+            if len(spans) >= records_per_chunk:
+                yield first_record, buffer[spans[0][0]:spans[-1][1]]
+                first_record = spans_count + 1
+                spans = []
+        if spans:
+            yield first_record, buffer[spans[0][0]:spans[-1][1]]
+
+    def iter_record_chunks(self, hex_input, records_per_chunk=500):
+        """Yield (first record number, lines) chunks that each hold whole records
+
+        Only the line offsets are looked at, so chunks can be handed to
+        worker processes that do the hex decoding and parsing.
+        """
+        first_line, lines = self.iter_input_lines(hex_input)
+        if first_line is None:
+            return
+        if not self.is_displaced_line(first_line):
+            # Continuous hex string: a single record
+            yield 1, [first_line] + list(lines)
+            return
+
+        chunk = []
+        first_record = record_number = 1
+        prev_offset = -1
+        for line in itertools.chain([first_line], lines):
+            parsed = self.parse_displaced_line(line)
+            if parsed is None:
+                continue
+            offset = parsed[0]
+            if offset <= prev_offset:
+                record_number += 1
+                if record_number - first_record >= records_per_chunk:
+                    yield first_record, chunk
+                    chunk = []
+                    first_record = record_number
+            prev_offset = offset
+            chunk.append(line)
+        if chunk:
+            yield first_record, chunk
+
+    def hex_to_bytes(self, hex_string):
+        return next(self.iter_records(hex_string), b'')
 
     def ebcdic_to_ascii(self, data):
-        try:
-            return codecs.decode(data, 'cp037', errors='replace').rstrip('\x00').rstrip(' ')
-        except:
-            return data.hex().upper()
+        return decode_char(data, self.ebcdic_table)
 
     def parse_credit_card_restrictions(self, field_data):
         """Parse Credit Card Restrictions bit field"""
-        if len(field_data) != 1:
-            return "Invalid length"
-            
-        byte_value = field_data[0]
-        restrictions = []
-        
-        # Bit mappings for Credit Card Restrictions
-        bit_mappings = {
-            0x80: "World Pay Restricted Country",  # Bit 0
-            0x40: "Elavon",                        # Bit 1  
-            0x20: "American Express",              # Bit 2
-            0x10: "Visa",                          # Bit 3
-            0x08: "Chase (Bank)",                  # Bit 4
-            0x04: "Converge",                      # Bit 5
-            0x02: "SITA",                          # Bit 6
-            0x01: "World Pay Currency"             # Bit 7
-        }
-        
-        for bit_mask, description in bit_mappings.items():
-            if byte_value & bit_mask:
-                restrictions.append(description)
-        
-        if restrictions:
-            return f"0x{byte_value:02X} ({', '.join(restrictions)})"
-        else:
-            return f"0x{byte_value:02X} (No restrictions)"
+        return credit_card_restrictions(field_data)
 
     def format_value(self, field_data, field_type, field_name=None):
-        # Date fields that should use BCD conversion
-        date_fields = {"ND5FDDTE", "ND5FDXLD", "ND5FDXFD", "ND5FDXOD", "ND5FDVVD", 
-                      "ND5FDVEP", "ND5FDBNT", "ND5FDMDT", "ND5FDMFD", "ND5FDVCD", 
-                      "ND5FDDTI", "ND5FDDCI", "ND5FDFDT"}
-        
-        # Check for date field conversion
-        if field_name and field_name in date_fields and field_type == "BIN" and len(field_data) == 2:
-            binary_date = int.from_bytes(field_data, 'big')
-            if binary_date > 0:  # Only convert non-zero dates
-                return self.binary_to_bcd_date(binary_date, 7)  # Use 7-char format DDMMMYY
-            else:
-                return "0"
-        
-        if field_type == "CHAR":
-            return self.ebcdic_to_ascii(field_data)
-        elif field_type == "BIN":
-            return str(int.from_bytes(field_data, 'big'))
-        elif field_type == "PIC":
-            # Handle PIC format for monetary amounts
-            hex_str = field_data.hex().upper()
-            # Extract digits from F0 prefixed bytes (F0 = EBCDIC '0', F1 = EBCDIC '1', etc.)
-            digits = ''.join([hex_str[i+1] for i in range(0, len(hex_str), 2) if hex_str[i] == 'F'])
-            if digits and digits.isdigit() and len(digits) >= 2:
-                value = int(digits) / 100.0  # Assume 2 decimal places
-                return f"{value:.2f}"
-            return self.ebcdic_to_ascii(field_data)
-        elif field_type == "BIT":
-            # Special handling for Credit Card Restrictions fields
-            if field_name and "CCP" in field_name or "CRD" in field_name or "ARF" in field_name:
-                return self.parse_credit_card_restrictions(field_data)
-            return field_data.hex().upper()
-        elif field_type == "SPARE":
-            return "(SPARE)"
-        else:
-            return field_data.hex().upper()
+        kind = field_kind(field_name, field_type, len(field_data))
+        decoder, formatter = FIELD_KINDS[kind]
+        value = decoder(field_data, self.ebcdic_table) if kind in TEXT_KINDS else decoder(field_data)
+        return value if formatter is None else formatter(value, field_data)
 
     def binary_to_bcd_date(self, binary_date, format_size=6):
-        """Convert binary date to BCD format"""
-        import datetime
-        
-        # December 31, 1962 is day number zero (day 1 = January 1, 1963)
-        epoch = datetime.date(1962, 12, 31)
-        target_date = epoch + datetime.timedelta(days=binary_date - 1)
-        
-        if format_size == 6:  # MMDDYY
-            return f"{target_date.month:02d}{target_date.day:02d}{target_date.year % 100:02d}"
-        else:
-            # Legacy formats for backward compatibility
-            months = "JANFEBMARAPRMAYJUNJULAUGSEPOCTNOVDEC"
-            month_abbr = months[target_date.month * 3 - 3:target_date.month * 3]
-            
-            if format_size == 5:  # DDMMM
-                return f"{target_date.day:02d}{month_abbr}"
-            elif format_size == 7:  # DDMMMYY
-                return f"{target_date.day:02d}{month_abbr}{target_date.year % 100:02d}"
-            elif format_size == 9:  # DDMMMYYYY
-                return f"{target_date.day:02d}{month_abbr}{target_date.year}"
-            else:
-                return f"{target_date.day:02d}{month_abbr}"
+        """Convert binary date to BCD format
+
+        format_size 6 gives MMDDYY; the legacy sizes 5, 7 and 9 give DDMMM,
+        DDMMMYY and DDMMMYYYY (any other size DDMMM).
+        """
+        date_format = BCD_DATE_FORMATS.get(format_size, "DDMMM")
+        if 0 < binary_date < DATE_TABLE_SIZE:
+            return get_date_table(date_format)[binary_date]
+        # Day zero and day numbers past the table keep the plain date arithmetic
+        return DATE_FORMATTERS[date_format](DATE_EPOCH + datetime.timedelta(days=binary_date - 1))
 
     def is_blank_field(self, field_data):
         """Check if field contains all EBCDIC spaces (0x40)"""
@@ -773,392 +1831,592 @@ class D5FDFileParser:
             return self.ebcdic_to_ascii(type_data).strip()
         return "UNK"
 
-    def parse_reps_data(self, reps_data, output_file):
-        """Parse REPS data (item 71) with up to 221 bytes structure"""
-        output_file.write(f"    REPS Data Structure ({len(reps_data)} bytes available):\n")
-        
-        if len(reps_data) == 0:
-            output_file.write("    No REPS data available\n")
-            return
-        offset = 0
-        
-        # REPS field definitions
-        reps_fields = [
-            ("Auth Characteristics Indicator", 1),
-            ("Validation Code", 4),
-            ("Trans ID/Banknet Reference", 9),
-            ("Auth Response/Downgrade Indicator", 2),
-            ("Auth Source Code", 1),
-            ("POS Entry Mode", 2),
-            ("Banknet Reference Date", 2),
-            ("AVS Response Code", 1),
-            ("Electronic Commerce Indicator", 2),
-            ("Cardholder Auth Verification Value", 1),
-            ("Cardholder Activation Terminal ID", 1),
-            ("Card Level Results", 2),
-            ("Acquirer Reference Data", 15),
-            ("Point of Service Data", 12),
-            ("Accounting System Code/Cardholder ID", 1),
-            ("Last Four Digits of Credit Card", 4),
-            ("Account Status Data", 1),
-            ("Spare Bytes", 9),
-            ("Token Requestor ID Data", 11),
-            ("Token Assurance Level Data", 2),
-            ("Spend Qualified Indicator", 1),
-            ("Security Protocol", 1),
-            ("Transaction Integrity Class", 2),
-            ("Payment Account Reference Number", 35),
-            ("Market Specific Auth Data Indicator", 1),
-            ("System Trace Audit Number", 6),
-            ("Transaction Data Condition Code", 2),
-            ("POS Data", 13),
-            ("Processing Code", 6),
-            ("Cardholder Authentication", 1),
-            ("Stored Credential Indicator", 1),
-            ("Account Holder Auth Value", 32),
-            ("Directory Server Transaction ID", 36),
-            ("Program Protocol", 1)
+    def decode_reps_data(self, reps_data, text=None):
+        """Decode REPS data (item 71) with up to 221 bytes structure into SubFields
+
+        text is the already translated reps_data, if the caller has it.
+        """
+        if text is None:
+            text = ebcdic_text(reps_data, self.ebcdic_table)
+        size = len(reps_data)
+        return [
+            SubField(name, offset, length, reps_data[offset:end], text[offset:end].rstrip('\x00').rstrip(' '))
+            for name, offset, length, end in REPS_SUBFIELDS
+            if end <= size
         ]
-        
-        for field_name, field_length in reps_fields:
-            if offset + field_length <= len(reps_data):
-                field_data = reps_data[offset:offset + field_length]
-                hex_value = field_data.hex().upper()
-                ascii_value = self.ebcdic_to_ascii(field_data)
-                output_file.write(f"      {field_name:<35} ({field_length:2d}): {hex_value:<20} {ascii_value}\n")
-                offset += field_length
-            else:
-                break
 
-    def parse_itinerary_segments(self, segment_data, output_file):
-        """Parse itinerary segment data (item 74) - 26 bytes per segment"""
-        output_file.write("    Itinerary Segment Data (26 bytes per segment):\n")
-        
-        segment_length = 26
-        num_segments = len(segment_data) // segment_length
-        
-        for segment_num in range(num_segments):
-            offset = segment_num * segment_length
-            if offset + segment_length <= len(segment_data):
-                segment = segment_data[offset:offset + segment_length]
-                output_file.write(f"\n      Segment {segment_num + 1}:\n")
-                
-                # Parse each field in the 26-byte segment
-                field_offset = 0
-                segment_fields = [
-                    ("Carrier Code", 3),
-                    ("Flight Number", 4),
-                    ("Class of Service", 2),
-                    ("Departure Date", 5),
-                    ("Departure Time", 4),
-                    ("Origin City Code", 3),
-                    ("Destination City Code", 3),
-                    ("Reservation Status", 2)
-                ]
-                
-                for field_name, field_length in segment_fields:
-                    if field_offset + field_length <= len(segment):
-                        field_data = segment[field_offset:field_offset + field_length]
-                        hex_value = field_data.hex().upper()
-                        ascii_value = self.ebcdic_to_ascii(field_data)
-                        output_file.write(f"        {field_name:<20} ({field_length}): {hex_value:<12} {ascii_value}\n")
-                        field_offset += field_length
-                    else:
-                        break
+    def decode_itinerary_segments(self, segment_data, text=None):
+        """Decode itinerary segment data (item 74) - 26 bytes per segment
 
-    def parse_variable_data_items(self, data, start_offset, output_file):
-        """Parse variable length data items (ND5FDITM)"""
+        text is the already translated segment_data, if the caller has it.
+        """
+        if text is None:
+            text = ebcdic_text(segment_data, self.ebcdic_table)
+        return [
+            [
+                SubField(name, offset, length, segment_data[base + offset:base + end],
+                         text[base + offset:base + end].rstrip('\x00').rstrip(' '))
+                for name, offset, length, end in SEGMENT_SUBFIELDS
+            ]
+            for base in range(0, len(segment_data) // SEGMENT_LENGTH * SEGMENT_LENGTH, SEGMENT_LENGTH)
+        ]
+
+    def get_reps_row(self, reps_data):
+        """RepsRow of a REPS (item 71) payload"""
+        return decode_reps_row(reps_data, self.ebcdic_table)
+
+    def get_segment_rows(self, segment_data):
+        """SegmentRow list of an itinerary (item 74) payload"""
+        return decode_segment_rows(segment_data, self.ebcdic_table)
+
+    def decode_variable_data_items(self, data, start_offset):
+        """Decode variable length data items (ND5FDITM)
+
+        Every item up to the end marker is decoded. Returns (items, end
+        marker offset or None, truncated flag); truncated means the scan
+        stopped at an item with an invalid length.
+        """
+        items = []
         if start_offset >= len(data):
-            return
+            return items, None, False
         
-        # Data item type mappings from D5FD.h (decimal values)
-        data_item_types = {
-            1: ("Transmission Control Number", "Control number for transmission"),
-            2: ("Passenger Name", "Name of the passenger"),
-            4: ("Group or Convention Name", "Group or convention identifier"),
-            6: ("Name Remarks", "Additional name information"),
-            8: ("Telephone Number", "Contact telephone number"),
-            10: ("TBM Mailing Address", "Ticket-by-mail mailing address"),
-            12: ("TBM Billing Address", "Ticket-by-mail billing address"),
-            14: ("Date Ticket Mailed", "Date ticket was mailed"),
-            16: ("Frequent Flyer Number", "Loyalty program number"),
-            20: ("Reprinted Ticket Numbers", "Numbers of reprinted tickets"),
-            22: ("Form of Payment", "Payment method details"),
-            24: ("Count of Psgrs Associated With FOP", "Number of passengers for this payment"),
-            25: ("Equivalent Fare Paid Decimal Indicator", "Decimal position indicator"),
-            26: ("Equivalent Fare Paid", "Equivalent fare amount"),
-            28: ("Equivalent Fare Paid Currency Code", "Currency for equivalent fare"),
-            29: ("Tkt/Doc Effective Date", "Document effective date"),
-            30: ("Tkt/Doc Expiration Date", "Document expiration date"),
-            31: ("Booking Class Limitation", "Class restrictions"),
-            32: ("Approval Code", "Payment approval code"),
-            36: ("Tour Code", "Tour package identifier"),
-            38: ("Number of Tickets Exchanged", "Count of exchanged tickets"),
-            39: ("Exchanged Ticket Value Decimal Indicator", "Decimal position for exchange value"),
-            40: ("Issued in Exchange for Ticket Number", "Original ticket number"),
-            42: ("Issued in Exchange for Coupon Numbers", "Original coupon numbers"),
-            44: ("Value of Exchanged Ticket", "Monetary value of exchange"),
-            46: ("Original Issue Ticket Number", "First issue ticket number"),
-            48: ("Date of Original Issue", "Original issue date"),
-            50: ("Place of Original Issue", "Original issue location"),
-            52: ("Form of Payment of Exchanged Ticket(s)", "Payment method for exchanged tickets"),
-            54: ("Exchanged Ticket Currency Code", "Currency for exchanged tickets"),
-            56: ("ATC/IATA Number", "Agent/airline identifier"),
-            58: ("Commission Rate", "Agent commission percentage"),
-            60: ("Total Amount Adjusted", "Total adjustment amount"),
-            61: ("PTA Amounts Decimal Indicator", "PTA decimal position"),
-            62: ("Count of MCO Numbers", "Number of MCO documents"),
-            64: ("MCO Number", "Miscellaneous charges order number"),
-            66: ("Original Fare Currency Code", "Original fare currency"),
-            68: ("Original PTA Total", "Original PTA amount"),
-            70: ("FOP of Each PTA", "Form of payment for each PTA"),
-            71: ("REPS DATA", "Credit card processing data"),
-            72: ("Fare Calculation", "Fare calculation details"),
-            74: ("Itinerary Segment Data", "Flight segment information"),
-            76: ("Fare Basis", "Fare basis code"),
-            78: ("Connecting/Stopover Code", "Connection/stopover indicator"),
-            80: ("Validity Dates", "Ticket validity dates"),
-            82: ("Seat Assignment", "Assigned seat information"),
-            84: ("Baggage Allowance", "Baggage allowance details"),
-            86: ("Endorsement Box/Penalty", "Endorsement and penalty information"),
-            88: ("Commission Amount", "Commission amount"),
-            89: ("Booking Class/Date", "Booking class and date"),
-            90: ("Reissue Tax Breakdown", "Tax breakdown for reissue"),
-            93: ("Reissue PFC Breakdown", "PFC breakdown for reissue"),
-            94: ("Tax Surcharge Data", "Fee information for Global Collect"),
-            95: ("Document Taxes", "Document tax information"),
-            96: ("GTO Commission Rate", "GTO commission rate"),
-            97: ("GTO Commission Amount", "GTO commission amount"),
-            200: ("Servicing Carrier Accounting Code", "ARC servicing carrier code"),
-            202: ("Servicing Carrier Guarantee Code", "ARC guarantee code"),
-            204: ("Agency Number (ATC/IATA)", "ARC agency number"),
-            206: ("Agency Number Check Digit", "ARC agency check digit"),
-            208: ("Credit Card Contractor Number", "ARC credit card contractor"),
-            210: ("Commission Rate", "ARC commission rate"),
-            212: ("Commission Amount", "ARC commission amount"),
-            214: ("Tax Code (Future)", "ARC future tax code"),
-            216: ("Ticketing Carrier Accounting Code", "ARC ticketing carrier code"),
-            218: ("Domestic/International Code", "ARC domestic/international indicator"),
-            220: ("Self-Sale Code", "ARC self-sale code"),
-        }
-        
-        config = self.get_header_config()
-        output_file.write("\n" + "=" * config["sep_width"] + "\n")
-        output_file.write("VARIABLE LENGTH DATA ITEMS (ND5FDITM)\n")
-        output_file.write("=" * config["sep_width"] + "\n")
-
-        current_offset = start_offset
+        # Item text slices one EBCDIC translation of the record
+        text = ebcdic_text(data, self.ebcdic_table)
+        item_types = DATA_ITEM_TYPES
         item_count = 0
 
-        while current_offset < len(data) - 2:
-            # Read type ID (1 byte)
-            type_id = data[current_offset]
-            
-            # Check for end marker (4E)
-            if type_id == 0x4E:
-                output_file.write(f"\nEnd marker found at offset {current_offset:04X}h\n")
-                break
-                
-            # Skip if we hit zero padding
-            if type_id == 0:
-                current_offset += 1
-                continue
-                
-            # Read total length (2 bytes, big-endian) - includes type + length + data
-            if current_offset + 3 > len(data):
-                break
-                
-            total_length = int.from_bytes(data[current_offset + 1:current_offset + 3], 'big')
-            
-            if total_length < 3 or current_offset + total_length > len(data):
-                break
-            
-            # Data length = total length - 3 (1 byte type + 2 bytes length)
-            data_length = total_length - 3
-            
+        for type_id, offset, total_length in iter_item_entries(data, start_offset):
+            if type_id == ITEM_END_MARKER:
+                return items, offset, False
+            if type_id is None:
+                return items, None, True  # malformed item length
+
             item_count += 1
-            type_name, description = data_item_types.get(type_id, ("Unknown Type", "Unknown data item"))
-            
-            output_file.write(f"\nData Item #{item_count}:\n")
-            output_file.write(f"  Offset:       {current_offset:04X}h\n")
-            output_file.write(f"  Type ID:      {type_id:02X}h ({type_id} decimal)\n")
-            output_file.write(f"  Name:         {type_name}\n")
-            output_file.write(f"  Total Length: {total_length} bytes\n")
-            output_file.write(f"  Data Length:  {data_length} bytes\n")
-            output_file.write(f"  Description:  {description}\n")
-        
-            if data_length > 0:
-                item_data = data[current_offset + 3:current_offset + 3 + data_length]
-                hex_value = item_data.hex().upper()
-                ascii_value = self.ebcdic_to_ascii(item_data)
-                output_file.write(f"  Data:         {hex_value}\n")
-                output_file.write(f"  ASCII:        {ascii_value}\n")
-                
-                # Special handling for REPS data (item 71 = 0x47)
-                if type_id == 0x47:
-                    output_file.write("\n")
-                    output_file.write(f"  REPS Data detected (length: {data_length} bytes)\n")
-                    self.parse_reps_data(item_data, output_file)
-                
-                # Special handling for Itinerary Segment data (item 74 = 0x4A)
-                elif type_id == 0x4A and data_length >= 26:
-                    output_file.write("\n")
-                    self.parse_itinerary_segments(item_data, output_file)
-        
-            # Move to next item using total length
-            current_offset += total_length
-        
-            if item_count >= 30:
-                output_file.write("  ... (truncated after 30 items)\n")
-                break
+            type_name, description = item_types.get(type_id, UNKNOWN_DATA_ITEM)
+            data_start = offset + ITEM_HEADER_SIZE
+            data_end = offset + total_length
+            item_data = data[data_start:data_end]
+            item_text = text[data_start:data_end]
+
+            reps = segments = None
+            if total_length > ITEM_HEADER_SIZE:
+                if type_id == REPS_ITEM:
+                    reps = self.decode_reps_data(item_data, item_text)
+                elif type_id == ITINERARY_ITEM and total_length - ITEM_HEADER_SIZE >= SEGMENT_LENGTH:
+                    segments = self.decode_itinerary_segments(item_data, item_text)
+
+            items.append(DataItem(item_count, offset, type_id, type_name, description, total_length,
+                                  item_data, item_text.rstrip('\x00').rstrip(' '), reps, segments))
+
+        return items, None, False
 
     def get_header_config(self):
-        configs = {
-            "small": {
-                "sep_width": 20, 
-                "table_width": 20, 
-                "hex_width": 10, 
-                "value_width": 8,
-                "field_width": 8,
-                "offset_width": 6,
-                "length_width": 4
-            },
-            "normal": {"sep_width": 80, "table_width": 120, "hex_width": 32, "value_width": 30},
-            "large": {"sep_width": 120, "table_width": 160, "hex_width": 40, "value_width": 35}
-        }
-        return configs.get(self.header_size, configs["small"])
+        return HEADER_CONFIGS.get(self.header_size, HEADER_CONFIGS["small"])
 
+    def view_record(self, data, record_type=None):
+        """Lazy RecordView of a record buffer (fields decoded on access)"""
+        return RecordView(data, record_type, self.ebcdic_table)
+
+    def iter_views(self, records):
+        """RecordView per record buffer"""
+        table = self.ebcdic_table
+        return (RecordView(data, None, table) for data in records)
+
+    def item_table(self, data, record_type=None):
+        """ItemTable of a record's variable data items (None if its layout has none)"""
+        if record_type is None:
+            record_type = self.get_record_type(data)
+        offset = self.get_variable_data_offset(record_type)
+        if not offset:
+            return None
+        return ItemTable(data, offset)
+
+    def parse_record(self, data, record_type=None):
+        """Parse one record buffer into a ParsedRecord (record_type overrides ND5FDTYP)"""
+        timer = self.record_timer
+        timer.start()
+        if record_type is None:
+            record_type = self.get_record_type(data)
+        layout = RECORD_LAYOUTS.get(record_type)
+        header = HEADER_PLAN.decode(data, table=self.ebcdic_table)
+        timer.header_done(record_type, len(data), layout is not None)
+        if layout is None:
+            return ParsedRecord(data, record_type, None, header, [])
+
+        fields = layout.plan.decode(data, table=self.ebcdic_table)
+        timer.bti_done(record_type)
+        items, end_marker_offset, truncated = self.decode_layout_items(data, layout)
+        if items is not None:
+            timer.items_done(items)
+        return ParsedRecord(data, record_type, layout, header, fields, items, end_marker_offset, truncated)
+
+    def report_record(self, data):
+        """ParsedRecord with items but no decoded fields: the text report formats those straight from data"""
+        record_type = self.get_record_type(data)
+        layout = RECORD_LAYOUTS.get(record_type)
+        if layout is None:
+            return ParsedRecord(data, record_type, None, None, [])
+        return ParsedRecord(data, record_type, layout, None, None, *self.decode_layout_items(data, layout))
+
+    def decode_layout_items(self, data, layout):
+        """(items, end marker offset, truncated) of a record; items is None if its layout has none (TAR and PAR do)"""
+        if layout.variable_offset and layout.variable_offset < len(data):
+            return self.decode_variable_data_items(data, layout.variable_offset)
+        return None, None, False
+
+    # Text report renderer: writes a ParsedRecord (or one section of it) as fixed-width text
+
+    def render_record(self, record, output_file, record_number=1):
+        if self.stats is not None:
+            start = time.perf_counter()
+        output_file.write("D5FD Enhanced Record Parser Results\n")
+        output_file.write(f"Record Number: {record_number}\n")
+        output_file.write(f"Total Data Length: {record.length} bytes\n\n")
+
+        self.write_header_section(record.header, record.data, output_file)
+        self.write_bti_section(record, output_file)
 
-    def parse_header(self, data, output_file):
+        config = self.get_header_config()
+        output_file.write("\n" + "=" * config["sep_width"] + "\n")
+        if self.stats is not None:
+            self.stats.add_time("render", time.perf_counter() - start)
+
+    def write_table_heading(self, title, output_file):
         config = self.get_header_config()
         output_file.write("=" * config["sep_width"] + "\n")
-        output_file.write("HEADER FIELDS\n")
+        output_file.write(title + "\n")
         output_file.write("=" * config["sep_width"] + "\n")
         output_file.write(f"{'Field':<{config.get('field_width', 8)}} {'Offset':<{config.get('offset_width', 6)}} {'Len':<{config.get('length_width', 4)}} {'Hex':<{config['hex_width']}} {'Value':<{config['value_width']}} {'Description'}\n")
         output_file.write("-" * config["table_width"] + "\n")
 
-        for field_name, offset, length, field_type, description in self.header_fields:
-            if offset + length <= len(data):
-                field_data = data[offset:offset + length]
-                hex_value = field_data.hex().upper()
-                formatted_value = self.format_value(field_data, field_type, field_name)
-                output_file.write(f"{field_name:<{config.get('field_width', 8)}} {offset:04X}h {length:<{config.get('length_width', 4)}} {hex_value:<{config['hex_width']}} {formatted_value:<{config['value_width']}} {description}\n")
+    def write_field_rows(self, plan, fields, data, output_file, skip_blank=False):
+        """Write one report row per decoded field of a layout plan (fields None: decode them from data)"""
+        if fields is None:
+            output_file.write(plan.report_rows(data, self.get_header_config(), skip_blank, self.ebcdic_table))
+            return
+        templates = plan.get_row_templates(self.get_header_config())
+        hex_data = data.hex().upper()
+        rows = []
+        for spec, raw, value in fields:
+            if skip_blank and (raw == spec.blank or raw == spec.zero):
+                continue
+            rows.append(templates[spec.index] % (
+                hex_data[spec.hex_slice],
+                value if spec.formatter is None else spec.formatter(value, raw),
+            ))
+        output_file.write(''.join(rows))
 
+    def write_header_section(self, header, data, output_file):
+        self.write_table_heading("HEADER FIELDS", output_file)
+        self.write_field_rows(HEADER_PLAN, header, data, output_file)
 
-    def parse_bti_structure(self, data, record_type, output_file):
+    def write_bti_section(self, record, output_file):
+        config = self.get_header_config()
+        output_file.write("\n")
+        self.write_table_heading(f"ND5FDBTI STRUCTURE - TYPE: {record.record_type}", output_file)
+
+        layout = record.layout
+        if layout is None:
+            output_file.write(f"Unknown record type: {record.record_type}, using generic parsing\n")
+            if record.length > BTI_OFFSET:
+                raw_data = record.data[BTI_OFFSET:BTI_OFFSET + min(100, record.length - BTI_OFFSET)]
+                output_file.write(f"Raw BTI Data: {raw_data.hex().upper()}\n")
+            return
+        output_file.write(layout.banner + "\n")
+        output_file.write("-" * config["table_width"] + "\n")
+
+        self.write_field_rows(layout.plan, record.fields, record.data, output_file, skip_blank=True)
+
+        if record.items is not None:
+            self.write_item_section(record.items, record.end_marker_offset, record.items_truncated, output_file)
+
+    def write_item_section(self, items, end_marker_offset, truncated, output_file):
         config = self.get_header_config()
-        bti_offset = 0x060
-        
         output_file.write("\n" + "=" * config["sep_width"] + "\n")
-        output_file.write(f"ND5FDBTI STRUCTURE - TYPE: {record_type}\n")
+        output_file.write("VARIABLE LENGTH DATA ITEMS (ND5FDITM)\n")
         output_file.write("=" * config["sep_width"] + "\n")
-        output_file.write(f"{'Field':<{config.get('field_width', 8)}} {'Offset':<{config.get('offset_width', 6)}} {'Len':<{config.get('length_width', 4)}} {'Hex':<{config['hex_width']}} {'Value':<{config['value_width']}} {'Description'}\n")
-        output_file.write("-" * config["table_width"] + "\n")
 
-        if record_type in ["TAR", "NBT"]:
-            fields = self.tar_fields
-            output_file.write("Using TAR (Ticket Accounting Record) structure\n")
-        elif record_type == "REF":
-            fields = self.ref_fields
-            output_file.write("Using REF (Refund) structure\n")
-        elif record_type == "MAR":
-            fields = self.mir_fields
-            output_file.write("Using MIR (Miscellaneous Transaction Data) structure\n")
-        elif record_type == "PAR":
-            fields = self.mar_fields
-            output_file.write("Using MAR (Prepaid Accounting Data) structure\n")
-        elif record_type == "VOI":
-            fields = self.voi_fields
-            output_file.write("Using VOI (Void Transaction) structure\n")
-        elif record_type == "ATR":
-            fields = self.atr_fields
-            output_file.write("Using ATR (Agent Transaction) structure\n")
-        elif record_type in ["AIR", "VDC"]:
-            fields = self.air_fields
-            output_file.write("Using AIR (Additional Collection) structure\n")
-        elif record_type == "IFR":
-            fields = self.ifr_fields
-            output_file.write("Using IFR (In-Flight Sales) structure\n")
-        elif record_type == "BOW":
-            fields = self.bow_fields
-            output_file.write("Using BOW (List Transaction Data) structure\n")
-        elif record_type in ["COL", "CRR"]:
-            fields = self.col_fields
-            output_file.write("Using COL (Collection Report) structure\n")
+        for item in items:
+            data_length = len(item.data)
+            output_file.write(f"\nData Item #{item.number}:\n")
+            output_file.write(f"  Offset:       {item.offset:04X}h\n")
+            output_file.write(f"  Type ID:      {item.type_id:02X}h ({item.type_id} decimal)\n")
+            output_file.write(f"  Name:         {item.name}\n")
+            output_file.write(f"  Total Length: {item.total_length} bytes\n")
+            output_file.write(f"  Data Length:  {data_length} bytes\n")
+            output_file.write(f"  Description:  {item.description}\n")
+
+            if data_length > 0:
+                output_file.write(f"  Data:         {item.data.hex().upper()}\n")
+                output_file.write(f"  ASCII:        {item.text}\n")
+
+                if item.reps is not None:
+                    output_file.write("\n")
+                    output_file.write(f"  REPS Data detected (length: {data_length} bytes)\n")
+                    self.write_reps_section(data_length, item.reps, output_file)
+                elif item.segments is not None:
+                    output_file.write("\n")
+                    self.write_segment_section(item.segments, output_file)
+
+        if truncated:
+            output_file.write("  ... (item scan stopped at an invalid item length)\n")
+        if end_marker_offset is not None:
+            output_file.write(f"\nEnd marker found at offset {end_marker_offset:04X}h\n")
+
+    def write_reps_section(self, available_length, reps, output_file):
+        output_file.write(f"    REPS Data Structure ({available_length} bytes available):\n")
+        if available_length == 0:
+            output_file.write("    No REPS data available\n")
+            return
+        for sub in reps:
+            output_file.write(f"      {sub.name:<35} ({sub.length:2d}): {sub.raw.hex().upper():<20} {sub.text}\n")
+
+    def write_segment_section(self, segments, output_file):
+        output_file.write("    Itinerary Segment Data (26 bytes per segment):\n")
+        for segment_num, segment in enumerate(segments, 1):
+            output_file.write(f"\n      Segment {segment_num}:\n")
+            for sub in segment:
+                output_file.write(f"        {sub.name:<20} ({sub.length}): {sub.raw.hex().upper():<12} {sub.text}\n")
+
+    def parse_header(self, data, output_file):
+        self.write_header_section(None, data, output_file)
+
+    def parse_bti_structure(self, data, record_type, output_file):
+        # Only the layout fields and items: the BTI section does not show the header
+        layout = RECORD_LAYOUTS.get(record_type)
+        if layout is None:
+            record = ParsedRecord(data, record_type, None, None, [])
         else:
-            output_file.write(f"Unknown record type: {record_type}, using generic parsing\n")
-            if len(data) > bti_offset:
-                raw_data = data[bti_offset:bti_offset + min(100, len(data) - bti_offset)]
-                output_file.write(f"Raw BTI Data: {raw_data.hex().upper()}\n")
+            record = ParsedRecord(data, record_type, layout, None, None, *self.decode_layout_items(data, layout))
+        self.write_bti_section(record, output_file)
+
+    def parse_variable_data_items(self, data, start_offset, output_file):
+        """Parse variable length data items (ND5FDITM)"""
+        if start_offset >= len(data):
             return
-        
-        output_file.write("-" * config["table_width"] + "\n")
-        
-        for field_name, rel_offset, length, field_type, description in fields:
-            abs_offset = bti_offset + rel_offset
-            if abs_offset + length <= len(data):
-                field_data = data[abs_offset:abs_offset + length]
-                if self.is_blank_or_zero_field(field_data):
-                    continue
-                hex_value = field_data.hex().upper()
-                formatted_value = self.format_value(field_data, field_type, field_name)
-                output_file.write(f"{field_name:<{config.get('field_width', 8)}} {abs_offset:04X}h {length:<{config.get('length_width', 4)}} {hex_value:<{config['hex_width']}} {formatted_value:<{config['value_width']}} {description}\n")
-
-        # Parse variable length data items for TAR and PAR records
-        variable_offset = self.get_variable_data_offset(record_type)
-        if variable_offset and variable_offset < len(data):
-            self.parse_variable_data_items(data, variable_offset, output_file)
-
-    def parse_record_to_file(self, hex_input, output_file):
+        self.write_item_section(*self.decode_variable_data_items(data, start_offset), output_file)
+
+    def parse_reps_data(self, reps_data, output_file):
+        """Parse REPS data (item 71) with up to 221 bytes structure"""
+        self.write_reps_section(len(reps_data), self.decode_reps_data(reps_data), output_file)
+
+    def parse_itinerary_segments(self, segment_data, output_file):
+        """Parse itinerary segment data (item 74) - 26 bytes per segment"""
+        self.write_segment_section(self.decode_itinerary_segments(segment_data), output_file)
+
+    def parse_record_to_file(self, hex_input, output_file, first_record_number=1):
+        """Parse every record in the input and write the reports; returns the record count"""
+        return self.write_reports(self.iter_records(hex_input), output_file, first_record_number)
+
+    def write_reports(self, records, output_file, first_record_number=1):
+        """Write the report of every record buffer in records; returns the record count"""
+        return self.write_numbered_reports(enumerate(records, first_record_number), output_file)
+
+    def write_numbered_reports(self, numbered_records, output_file):
+        """Write the report of every (record number, record buffer) pair; returns the record count"""
+        record_count = 0
         try:
-            data = self.hex_to_bytes(hex_input)
-            
-            output_file.write("D5FD Enhanced Record Parser Results\n")
-            output_file.write(f"Total Data Length: {len(data)} bytes\n\n")
-            
-            self.parse_header(data, output_file)
-            record_type = self.get_record_type(data)
-            self.parse_bti_structure(data, record_type, output_file)
-            
-            config = self.get_header_config()
-            output_file.write("\n" + "=" * config["sep_width"] + "\n")
-            
+            for record_number, data in numbered_records:
+                record_count += 1
+                self.write_record_report(data, output_file, record_number)
+            if record_count == 0:
+                output_file.write("No records found in input\n")
         except Exception as e:
             output_file.write(f"Error parsing record: {e}\n")
+        return record_count
+
+    def write_record_report(self, data, output_file, record_number=1):
+        try:
+            if self.stats is None:
+                record = self.report_record(data)
+            else:
+                record = self.parse_record(data)  # decoded up front so parse and render are timed apart
+            self.render_record(record, output_file, record_number)
+        except Exception as e:
+            output_file.write(f"Error parsing record: {e}\n")
+
+def parse_chunk(header_size, output_format, chunk, first_record_number, binary=False, code_page="cp037",
+                record_filter=None, collect_stats=False):
+    """Worker: parse one chunk of dump lines (or raw binary records with binary=True)
+
+    Returns (record count, report text, stats) for the text format, or
+    (record count, [(table name, row), ...], stats) for the export formats.
+    Only records passing record_filter (a d5fd_filter.RecordFilter) are
+    parsed; stats is the chunk's d5fd_stats.ParserStats with collect_stats,
+    else None.
+    """
+    stats = None
+    if collect_stats:
+        import d5fd_stats
+        stats = d5fd_stats.ParserStats()
+    parser = D5FDFileParser(header_size, code_page, stats)
+    records = parser.iter_binary_records(chunk) if binary else parser.iter_records(chunk)
+    if stats is not None:
+        records = stats.time_records(records, "binary_scan" if binary else "hex_decode")
+    numbered_records = enumerate(records, first_record_number)
+    if record_filter is not None:
+        numbered_records = record_filter.filter_numbered(numbered_records)
+    if output_format == "text":
+        output_buffer = io.StringIO()
+        record_count = parser.write_numbered_reports(numbered_records, output_buffer)
+        return record_count, output_buffer.getvalue(), stats
+
+    import d5fd_export
+    record_count = 0
+    table_rows = []
+    for record_number, data in numbered_records:
+        record_count += 1
+        record = parser.parse_record(data)
+        if stats is None:
+            table_rows.extend(d5fd_export.record_table_rows(record_number, record))
+        else:
+            start = time.perf_counter()
+            table_rows.extend(d5fd_export.record_table_rows(record_number, record))
+            stats.add_time("render", time.perf_counter() - start)
+    return record_count, table_rows, stats
+
+
+def iter_parallel_results(header_size, output_format, chunks, workers, binary=False, code_page="cp037",
+                          record_filter=None, collect_stats=False):
+    """Parse chunks in a process pool and yield parse_chunk() results in input order
+
+    At most two chunks per worker are in flight, so memory stays flat
+    however large the input is.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for first_record_number, chunk in chunks:
+            pending.append(executor.submit(parse_chunk, header_size, output_format, chunk,
+                                           first_record_number, binary, code_page, record_filter, collect_stats))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+@contextlib.contextmanager
+def open_input(input_file, binary=False):
+    """Open a hex dump as text, or map a raw binary file read-only with mmap"""
+    if not binary:
+        with open(input_file, 'r') as f:
+            yield f
+        return
+
+    with open(input_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # record views still alive; the mapping is released with them
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="D5FD file-based parser")
+    arg_parser.add_argument("input_file", nargs="?", default="input.txt", help="hex dump input (default: input.txt)")
+    arg_parser.add_argument("output_file", nargs="?", default="output.txt", help="output file (default: output.txt)")
+    arg_parser.add_argument("header_size", nargs="?", default="small", help="small, normal, or large")
+    arg_parser.add_argument("--format", dest="output_format", default="text",
+                            choices=["text", "csv", "jsonl", "parquet"],
+                            help="text report, or one table per record type plus an items table")
+    arg_parser.add_argument("--row-group-size", type=int, default=10000,
+                            help="rows buffered per table before writing (csv/jsonl/parquet)")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="parse record chunks in N worker processes (output order is kept)")
+    arg_parser.add_argument("--chunk-records", type=int, default=500,
+                            help="records per worker chunk (with --workers)")
+    arg_parser.add_argument("--binary", action="store_true",
+                            help="input is raw EBCDIC binary (memory-mapped) instead of a hex dump")
+    arg_parser.add_argument("--type", dest="record_types", action="append", default=[], metavar="TYPES",
+                            help="only records of these types, e.g. --type TAR,REF")
+    arg_parser.add_argument("--where", action="append", default=[], metavar="NAME=VALUE",
+                            help="only records whose field has this value, e.g. --where ND5FDCIC=DFW (repeatable)")
+    arg_parser.add_argument("--chains", action="store_true",
+                            help="join forward/back chained blocks into logical records (not with --workers)")
+    arg_parser.add_argument("--code-page", default="cp037", choices=CODE_PAGES,
+                            help="EBCDIC code page for text fields (default: cp037)")
+    arg_parser.add_argument("--group-by", action="append", default=[], metavar="FIELDS",
+                            help="aggregate instead of reporting: group records by these fields, "
+                                 "e.g. --group-by ND5FDFCC,ND5FDCIC")
+    arg_parser.add_argument("--agg", action="append", default=[], metavar="FUNC:FIELD",
+                            help="aggregate per group: sum, min, max or distinct of a field, or count (repeatable)")
+    arg_parser.add_argument("--stats", action="store_true",
+                            help="print per-stage counts and timings after the run")
+    arg_parser.add_argument("--stats-file", metavar="PATH",
+                            help="write the run statistics to PATH in Prometheus text format")
+    return arg_parser
+
+
+def report_chain_problem(problem):
+    print(f"Chain warning: {problem.message}")
+
+
+def build_record_filter(args):
+    """RecordFilter for --type/--where, or None when every record is wanted"""
+    if not args.record_types and not args.where:
+        return None
+    import d5fd_filter
+    types = [record_type for value in args.record_types for record_type in value.split(",")]
+    return d5fd_filter.RecordFilter(types, args.where, args.code_page)
+
+
+def iter_input_records(parser, args, source, record_filter=None):
+    """(record number, record buffer) pairs from an opened input (see open_input)
+
+    Chained blocks are joined with --chains; records failing record_filter
+    are skipped before any decoding, keeping their input record numbers.
+    """
+    if args.binary:
+        records = parser.iter_binary_records(source)
+    else:
+        records = parser.iter_records(source)
+    if parser.stats is not None:
+        records = parser.stats.time_records(records, "binary_scan" if args.binary else "hex_decode")
+    if args.chains:
+        import d5fd_chain
+        logical_records = d5fd_chain.iter_logical_records(records, on_problem=report_chain_problem,
+                                                          code_page=parser.code_page)
+        records = (record.data for record in logical_records)
+    numbered_records = enumerate(records, 1)
+    if record_filter is not None:
+        numbered_records = record_filter.filter_numbered(numbered_records)
+    return numbered_records
+
+
+def iter_input_results(parser, args, source, output_format, record_filter=None):
+    """(record count, output) per parse_chunk() result for an opened input, parsed by args.workers processes
+
+    Worker statistics are merged into parser.stats when it is set.
+    """
+    if args.binary:
+        chunks = parser.iter_binary_chunks(source, args.chunk_records)
+    else:
+        chunks = parser.iter_record_chunks(source, args.chunk_records)
+    stats = parser.stats
+    for record_count, output, chunk_stats in iter_parallel_results(
+            args.header_size, output_format, chunks, args.workers, args.binary,
+            parser.code_page, record_filter, stats is not None):
+        if chunk_stats is not None:
+            stats.merge(chunk_stats)
+        yield record_count, output
+
+
+def write_text_output(parser, args, source, output_file, record_filter=None):
+    """Write the text report for every (matching) input record; returns the record count"""
+    if args.workers <= 1:
+        return parser.write_numbered_reports(iter_input_records(parser, args, source, record_filter), output_file)
+
+    record_count = 0
+    for chunk_count, text in iter_input_results(parser, args, source, "text", record_filter):
+        record_count += chunk_count
+        output_file.write(text)
+    if record_count == 0:
+        output_file.write("No records found in input\n")
+    return record_count
+
+
+def write_export_output(parser, args, source, output_file, record_filter=None):
+    """Export every (matching) input record as tables; returns (record count, table paths)"""
+    import d5fd_export
+    if args.workers <= 1:
+        return d5fd_export.export_numbered_records(parser, iter_input_records(parser, args, source, record_filter),
+                                                   output_file, args.output_format, args.row_group_size)
+
+    record_count = 0
+    with d5fd_export.RecordExporter(output_file, args.output_format, args.row_group_size) as exporter:
+        for chunk_count, table_rows in iter_input_results(parser, args, source, args.output_format,
+                                                          record_filter):
+            record_count += chunk_count
+            for table_name, row in table_rows:
+                exporter.add_row(table_name, row)
+        paths = list(exporter.paths)
+    return record_count, paths
+
+
+def write_aggregate_output(parser, args, source, output_file, record_filter=None):
+    """Group-by/aggregate every (matching) input record into one table; returns the record count"""
+    import d5fd_aggregate
+    group_by = [name for value in args.group_by for name in value.split(",")]
+    aggregator = d5fd_aggregate.GroupAggregator(group_by, args.agg or ["count"], parser.code_page)
+    aggregator.add_records(data for record_number, data in iter_input_records(parser, args, source, record_filter))
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        if args.output_format == "csv":
+            aggregator.write_csv(f)
+        elif args.output_format == "jsonl":
+            aggregator.write_jsonl(f)
+        else:
+            aggregator.write_text(f)
+    return aggregator.records
+
 
 def main():
-    # Default file names
-    input_file = "input.txt"
-    output_file = "output.txt"
-    header_size = "small"  # Default header size
-    
-    # Check if custom file names provided as arguments
-    if len(sys.argv) >= 3:
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
-    if len(sys.argv) >= 4:
-        header_size = sys.argv[3]  # small, normal, or large
+    args = build_arg_parser().parse_args()
+    input_file = args.input_file
+    output_file = args.output_file
     
-    parser = D5FDFileParser(header_size)
+    stats = None
+    if args.stats or args.stats_file:
+        import d5fd_stats
+        stats = d5fd_stats.ParserStats()
+    parser = D5FDFileParser(args.header_size, args.code_page, stats)
     
     try:
         # Read input file
         if not os.path.exists(input_file):
             print(f"Error: Input file '{input_file}' not found!")
-            print("Usage: py d5fd_file_parser.py [input_file] [output_file]")
+            print("Usage: py d5fd_file_parser.py [input_file] [output_file] [header_size] [options]")
             print("Default: py d5fd_file_parser.py (uses input.txt and output.txt)")
             return
         
-        with open(input_file, 'r') as f:
-            hex_data = f.read().strip()
+        if args.chains and args.workers > 1:
+            print("Error: --chains cannot be combined with --workers (chains may span worker chunks)")
+            return
+        
+        aggregate = bool(args.group_by or args.agg)
+        if aggregate and args.output_format == "parquet":
+            print("Error: --group-by/--agg results are written as text, csv or jsonl")
+            return
+        
+        if args.output_format == "parquet":
+            import d5fd_export
+            if not d5fd_export.parquet_available():
+                print("Parquet export skipped: pyarrow is not installed (pip install pyarrow)")
+                return
         
-        # Parse and write to output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            parser.parse_record_to_file(hex_data, f)
+        record_filter = build_record_filter(args)
+        
+        # Stream records from the input file and write to output file(s)
+        with open_input(input_file, args.binary) as source:
+            if aggregate:
+                record_count = write_aggregate_output(parser, args, source, output_file, record_filter)
+                output_paths = [output_file]
+            elif args.output_format == "text":
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    record_count = write_text_output(parser, args, source, f, record_filter)
+                output_paths = [output_file]
+            else:
+                record_count, output_paths = write_export_output(parser, args, source, output_file, record_filter)
         
         print(f"Parsing completed!")
+        print(f"Records parsed: {record_count}")
         print(f"Input file: {input_file}")
-        print(f"Output file: {output_file}")
+        for path in output_paths:
+            print(f"Output file: {path}")
+        
+        if stats is not None:
+            stats.bytes_in = os.path.getsize(input_file)
+            stats.bytes_out = sum(os.path.getsize(path) for path in output_paths if os.path.exists(path))
+            stats.finish()
+            if args.stats:
+                stats.write_summary(sys.stdout)
+            if args.stats_file:
+                stats.write_prometheus(args.stats_file)
+                print(f"Stats file: {args.stats_file}")
         
     except Exception as e:
         print(f"Error: {e}")
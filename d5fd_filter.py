@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+D5FD Record Filter
+Selects records by record type and field values before they are decoded.
+Types and values are encoded to EBCDIC once, so each record is matched by
+comparing raw bytes at the known field offsets.
+"""
+
+import codecs
+
+from d5fd_file_parser import HEADER_PLAN, RECORD_LAYOUTS, decimal_places, get_ebcdic_table
+
+TYPE_SLICE = slice(0x020, 0x023)  # ND5FDTYP
+WHOLE_RECORD = slice(None)
+
+
+def parse_condition(text):
+    """Split a NAME=VALUE condition"""
+    name, sep, value = text.partition("=")
+    name = name.strip().upper()
+    if not sep or not name:
+        raise ValueError(f"Invalid condition '{text}' (expected NAME=VALUE)")
+    return name, value.strip()
+
+
+def make_test(spec, value, code_page):
+    """Raw-bytes test for one field condition"""
+    if spec.kind == "CHAR":
+        # Stored space (or NUL) padded; compare without the padding
+        expected = codecs.encode(value, code_page).rstrip(b"\x40")
+        return lambda raw: bytes(raw).rstrip(b"\x40\x00") == expected
+    if spec.kind == "BIN" and value.isdigit():
+        expected = int(value).to_bytes(spec.length, "big")
+        return lambda raw: raw == expected
+
+    # Other kinds compare the decoded report text of just this field
+    table = get_ebcdic_table(code_page)
+    decoder, formatter = spec.decoder, spec.formatter
+    text_kind = spec.kind in ("CHAR", "PIC")
+
+    if spec.decimal_slice is not None:
+        # PIC amount scaled by its decimal indicator: tested on the whole record (see compile_checks)
+        field_slice, decimal_slice = spec.slice, spec.decimal_slice
+
+        def test(data):
+            raw = data[field_slice]
+            decoded = decoder(raw, table, decimal_places(data[decimal_slice]))
+            return formatter(decoded, raw) == value
+        return test
+
+    def test(raw):
+        decoded = decoder(raw, table) if text_kind else decoder(raw)
+        return str(decoded if formatter is None else formatter(decoded, raw)) == value
+    return test
+
+
+def compile_checks(specs, conditions, code_page):
+    """(slice, end, test) per condition, or None if a condition's field is not in specs"""
+    checks = []
+    for name, value in conditions:
+        spec = specs.get(name)
+        if spec is None:
+            return None
+        field_slice = WHOLE_RECORD if spec.decimal_slice is not None else spec.slice
+        checks.append((field_slice, spec.end, make_test(spec, value, code_page)))
+    return tuple(checks)
+
+
+class RecordFilter:
+    """Record type / field value filter matched on raw record bytes
+
+    types are record type codes (TAR, REF, ...); where holds NAME=VALUE
+    conditions on header or BTI fields. A record matches if its type is one
+    of types and every condition holds.
+    """
+
+    def __init__(self, types=None, where=(), code_page="cp037"):
+        self.type_names = tuple(record_type.strip().upper() for record_type in types or () if record_type.strip())
+        self.where = tuple(where)
+        self.code_page = code_page
+        get_ebcdic_table(code_page)  # validates the code page
+        self.types = frozenset(codecs.encode(record_type.ljust(3), code_page) for record_type in self.type_names) or None
+
+        conditions = [parse_condition(text) for text in self.where]
+        known = {spec.name for spec in HEADER_PLAN.fields}
+        for layout in RECORD_LAYOUTS.values():
+            known.update(spec.name for spec in layout.plan.fields)
+        unknown = [name for name, value in conditions if name not in known]
+        if unknown:
+            raise ValueError(f"Unknown field: {unknown[0]}")
+
+        header_specs = {spec.name: spec for spec in HEADER_PLAN.fields}
+        # Checks per raw type code; records of other types only have header fields
+        self.default_checks = compile_checks(header_specs, conditions, code_page)
+        self.checks = {}
+        for record_type, layout in RECORD_LAYOUTS.items():
+            specs = dict(header_specs)
+            specs.update((spec.name, spec) for spec in layout.plan.fields)
+            self.checks[codecs.encode(record_type, code_page)] = compile_checks(specs, conditions, code_page)
+
+    def __reduce__(self):
+        # Rebuilt from its arguments in worker processes (the compiled tests are closures)
+        return RecordFilter, (self.type_names, self.where, self.code_page)
+
+    def matches(self, data):
+        """Check a record buffer without decoding it"""
+        type_code = bytes(data[TYPE_SLICE])
+        if self.types is not None and type_code not in self.types:
+            return False
+        checks = self.checks.get(type_code, self.default_checks)
+        if checks is None:
+            return False
+        size = len(data)
+        for field_slice, end, test in checks:
+            if end > size or not test(data[field_slice]):
+                return False
+        return True
+
+    def filter(self, records):
+        """Matching record buffers"""
+        matches = self.matches
+        return (data for data in records if matches(data))
+
+    def filter_numbered(self, numbered_records):
+        """Matching (record number, record buffer) pairs"""
+        matches = self.matches
+        return ((record_number, data) for record_number, data in numbered_records if matches(data))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+D5FD Document Index
+Builds a sidecar index (an SQLite file) that maps document numbers to
+(file, byte offset, length) over hex dump or raw binary files, so a single
+record can be found, read with one seek and decoded without parsing the
+whole dump.
+
+Usage:
+    py d5fd_index.py build dumps.idx dump1.txt [dump2.txt ...] [--binary]
+    py d5fd_index.py lookup dumps.idx 0012345678901 [output.txt]
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+from d5fd_file_parser import CODE_PAGES, RECORD_LAYOUTS, D5FDFileParser, open_input
+
+# Key fields indexed per record layout
+INDEX_FIELDS = {
+    "TAR": ("ND5FDTKN", "ND5FDPNL"),
+    "MIR": ("ND5FDVOC",),
+    "VOI": ("ND5FDVNB",),
+    "REF": ("ND5FDREC",),
+}
+
+# Compiled key field specs per record type code
+KEY_SPECS = {
+    record_type: tuple(spec for spec in layout.plan.fields if spec.name in INDEX_FIELDS[layout.name])
+    for record_type, layout in RECORD_LAYOUTS.items()
+    if layout.name in INDEX_FIELDS
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    binary INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    record_type TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file_id);
+"""
+
+# Created after the bulk insert into an empty index, which is much faster than maintaining it row by row
+KEY_INDEX = "CREATE INDEX IF NOT EXISTS entries_key ON entries (key)"
+
+INSERT_BATCH_SIZE = 10000
+
+# One indexed record location
+IndexEntry = namedtuple("IndexEntry", ["key", "field", "record_type", "path", "binary", "offset", "length"])
+
+
+def record_keys(parser, data):
+    """(key, field name, record type) for each non-blank key field of a record"""
+    record_type = parser.get_record_type(data)
+    keys = []
+    for spec in KEY_SPECS.get(record_type, ()):
+        if spec.end <= len(data):
+            key = parser.ebcdic_to_ascii(data[spec.slice]).strip()
+            if key:
+                keys.append((key, spec.name, record_type))
+    return keys
+
+
+def iter_dump_spans(parser, dump_file):
+    """Yield (byte offset, byte length, lines) per record of a displacement-format dump opened in binary mode"""
+    position = start = 0
+    prev_offset = -1
+    lines = []
+    for raw_line in dump_file:
+        line = raw_line.decode("latin-1")  # the ASCII gutter may hold any byte
+        parsed = parser.parse_displaced_line(line)
+        if parsed is not None:
+            if parsed[0] <= prev_offset and lines:
+                yield start, position - start, lines
+                lines = []
+            if not lines:
+                start = position
+            prev_offset = parsed[0]
+            lines.append(line)
+        position += len(raw_line)
+    if lines:
+        yield start, position - start, lines
+
+
+def iter_file_records(parser, path, binary=False):
+    """Yield (byte offset, byte length, record buffer) for every record of a dump or raw binary file"""
+    if binary:
+        with open_input(path, binary=True) as buffer:
+            view = memoryview(buffer)
+            for start, end in parser.iter_binary_spans(buffer):
+                yield start, end - start, view[start:end]
+        return
+
+    with open(path, "rb") as dump_file:
+        for start, length, lines in iter_dump_spans(parser, dump_file):
+            data = next(parser.iter_displaced_records(lines), None)
+            if data:
+                yield start, length, data
+
+
+class DocumentIndex:
+    """Sidecar index of document numbers over dump files"""
+
+    def __init__(self, index_path, parser=None):
+        self.index_path = index_path
+        self.parser = parser or D5FDFileParser()
+        self.connection = sqlite3.connect(index_path)
+        self.connection.executescript(SCHEMA)
+
+    def add_file(self, path, binary=False):
+        """Index every record of a file (replacing an older index of it); returns (records, keys)"""
+        return self.add_files([path], binary)[0]
+
+    def add_files(self, paths, binary=False):
+        """Index several files in one transaction; returns (records, keys) per file
+
+        When the database starts empty, the key index is dropped for the
+        whole bulk insert and created again at the end; otherwise it stays in
+        place, as rebuilding it over every earlier file would cost more than
+        the insert. If any file fails, everything is rolled back, so the
+        database keeps its previous entries and its key index.
+        """
+        connection = self.connection
+        connection.execute("BEGIN")
+        try:
+            if connection.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None:
+                connection.execute("DROP INDEX IF EXISTS entries_key")
+            counts = [self.insert_file(path, binary) for path in paths]
+            connection.execute(KEY_INDEX)
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+        return counts
+
+    def insert_file(self, path, binary):
+        """Insert the entries of one file, replacing an older index of it (no commit)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        connection = self.connection
+        row = connection.execute("SELECT file_id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            connection.execute("DELETE FROM entries WHERE file_id = ?", row)
+            connection.execute("DELETE FROM files WHERE file_id = ?", row)
+        file_id = connection.execute(
+            "INSERT INTO files (path, binary, size, mtime) VALUES (?, ?, ?, ?)",
+            (path, int(binary), stat.st_size, stat.st_mtime),
+        ).lastrowid
+
+        record_count = key_count = 0
+        rows = []
+        for start, length, data in iter_file_records(self.parser, path, binary):
+            record_count += 1
+            for key, field, record_type in record_keys(self.parser, data):
+                rows.append((key, field, record_type, file_id, start, length))
+            if len(rows) >= INSERT_BATCH_SIZE:
+                key_count += self.insert_entries(rows)
+        key_count += self.insert_entries(rows)
+        return record_count, key_count
+
+    def insert_entries(self, rows):
+        self.connection.executemany(
+            "INSERT INTO entries (key, field, record_type, file_id, offset, length) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        count = len(rows)
+        rows.clear()
+        return count
+
+    def lookup(self, key):
+        """IndexEntry list for a document number or PNR locator"""
+        rows = self.connection.execute(
+            "SELECT e.key, e.field, e.record_type, f.path, f.binary, e.offset, e.length"
+            " FROM entries e JOIN files f ON f.file_id = e.file_id WHERE e.key = ?"
+            " ORDER BY f.path, e.offset",
+            (key.strip(),),
+        )
+        return [IndexEntry(key, field, record_type, path, bool(binary), offset, length)
+                for key, field, record_type, path, binary, offset, length in rows]
+
+    def is_stale(self, entry):
+        """Check whether an entry's file changed since it was indexed"""
+        size, mtime = self.connection.execute(
+            "SELECT size, mtime FROM files WHERE path = ?", (entry.path,)).fetchone()
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return True
+        return stat.st_size != size or stat.st_mtime != mtime
+
+    def read_record(self, entry):
+        """Read one indexed record buffer with a single seek"""
+        with open(entry.path, "rb") as f:
+            f.seek(entry.offset)
+            chunk = f.read(entry.length)
+        if entry.binary:
+            return chunk
+        return next(self.parser.iter_records(io.StringIO(chunk.decode("latin-1"))), b"")
+
+    def get_records(self, key):
+        """(IndexEntry, ParsedRecord) for every record indexed under key"""
+        return [(entry, self.parser.parse_record(self.read_record(entry))) for entry in self.lookup(key)]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="D5FD document number index")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index the records of dump files")
+    build.add_argument("index_file", help="sidecar index file (created if missing)")
+    build.add_argument("input_files", nargs="+", help="hex dump (or raw binary) files")
+    build.add_argument("--binary", action="store_true", help="inputs are raw EBCDIC binary")
+    build.add_argument("--code-page", default="cp037", choices=CODE_PAGES, help="EBCDIC code page")
+
+    lookup = commands.add_parser("lookup", help="decode the records for a document number or PNR locator")
+    lookup.add_argument("index_file", help="sidecar index file")
+    lookup.add_argument("key", help="ticket/document/refund number or PNR locator")
+    lookup.add_argument("output_file", nargs="?", help="write the reports here instead of the screen")
+    lookup.add_argument("header_size", nargs="?", default="small", help="small, normal, or large")
+    lookup.add_argument("--code-page", default="cp037", choices=CODE_PAGES, help="EBCDIC code page")
+    return arg_parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+
+    try:
+        if args.command == "build":
+            missing = [path for path in args.input_files if not os.path.exists(path)]
+            if missing:
+                print(f"Error: Input file '{missing[0]}' not found!")
+                return
+            with DocumentIndex(args.index_file, D5FDFileParser(code_page=args.code_page)) as index:
+                counts = index.add_files(args.input_files, args.binary)
+                for path, (record_count, key_count) in zip(args.input_files, counts):
+                    print(f"Indexed {path}: {record_count} records, {key_count} keys")
+            print(f"Index file: {args.index_file}")
+            return
+
+        if not os.path.exists(args.index_file):
+            print(f"Error: Index file '{args.index_file}' not found!")
+            return
+        parser = D5FDFileParser(args.header_size, args.code_page)
+        with DocumentIndex(args.index_file, parser) as index:
+            entries = index.lookup(args.key)
+            if not entries:
+                print(f"No records found for {args.key}")
+                return
+            out = open(args.output_file, "w", encoding="utf-8") if args.output_file else sys.stdout
+            try:
+                for record_number, entry in enumerate(entries, 1):
+                    stale = " (file changed since indexing)" if index.is_stale(entry) else ""
+                    print(f"{entry.field} {entry.key}: {entry.path} offset {entry.offset} length {entry.length}{stale}")
+                    parser.write_record_report(index.read_record(entry), out, record_number)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            if args.output_file:
+                print(f"Output file: {args.output_file}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
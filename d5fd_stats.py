@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+D5FD Parser Statistics
+Counters and cumulative timings of a parser run: hex decode (or binary
+scan), header, BTI per record type, variable data items and output
+rendering, plus bytes in/out and unknown record and item types. A parser
+only collects them when given a ParserStats (D5FDFileParser(stats=...)).
+The numbers can be printed as a summary, passed to callbacks while the run
+goes on, or written as a Prometheus text file.
+"""
+
+import collections
+import os
+import time
+
+# Stages in report order; "bti" is also kept per record type
+STAGES = ("hex_decode", "binary_scan", "header", "bti", "items", "render")
+
+
+class ParserStats:
+    """Stage counts and cumulative seconds of one parser run
+
+    Callbacks added with add_callback() are called with the stats every
+    callback_interval records and once more from finish().
+    """
+
+    def __init__(self, callback_interval=10000):
+        self.calls = collections.Counter()
+        self.seconds = collections.Counter()
+        self.bti_calls = collections.Counter()
+        self.bti_seconds = collections.Counter()
+        self.unknown_record_types = collections.Counter()
+        self.unknown_item_types = collections.Counter()
+        self.records = 0
+        self.record_bytes = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.callback_interval = callback_interval
+        self.callbacks = []
+
+    def __getstate__(self):
+        # Sent back from worker processes without the callbacks
+        state = dict(self.__dict__)
+        state["callbacks"] = []
+        return state
+
+    def add_time(self, stage, seconds, calls=1):
+        self.calls[stage] += calls
+        self.seconds[stage] += seconds
+
+    def add_bti_time(self, record_type, seconds):
+        self.add_time("bti", seconds)
+        self.bti_calls[record_type] += 1
+        self.bti_seconds[record_type] += seconds
+
+    def count_record(self, record_type, length, known=True):
+        self.records += 1
+        self.record_bytes += length
+        if not known:
+            self.unknown_record_types[record_type] += 1
+        if self.callbacks and self.records % self.callback_interval == 0:
+            self.notify()
+
+    def count_items(self, items, known_types):
+        for item in items:
+            if item.type_id not in known_types:
+                self.unknown_item_types[item.type_id] += 1
+
+    def record_timer(self, known_item_types=()):
+        """RecordTimer adding a parser's per-record stage timings to these stats"""
+        return RecordTimer(self, known_item_types)
+
+    def time_records(self, records, stage="hex_decode"):
+        """Yield records, timing how long each takes to produce (reading and decoding the input)"""
+        clock = time.perf_counter
+        iterator = iter(records)
+        while True:
+            start = clock()
+            data = next(iterator, None)
+            if data is None:
+                return
+            self.add_time(stage, clock() - start)
+            yield data
+
+    def merge(self, other):
+        """Add the counts of another ParserStats (e.g. from a worker process)"""
+        for name in ("calls", "seconds", "bti_calls", "bti_seconds", "unknown_record_types", "unknown_item_types"):
+            getattr(self, name).update(getattr(other, name))
+        self.record_bytes += other.record_bytes
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        previous = self.records
+        self.records += other.records
+        if self.callbacks and self.records // self.callback_interval > previous // self.callback_interval:
+            self.notify()
+
+    def add_callback(self, callback):
+        """Call callback(stats) periodically during the run and from finish()"""
+        self.callbacks.append(callback)
+
+    def notify(self):
+        for callback in self.callbacks:
+            callback(self)
+
+    def finish(self):
+        self.notify()
+
+    def iter_stage_rows(self):
+        """(label, calls, seconds) per stage that ran, with BTI broken down by record type"""
+        for stage in STAGES:
+            if self.calls[stage]:
+                yield stage, self.calls[stage], self.seconds[stage]
+            if stage == "bti":
+                for record_type in sorted(self.bti_calls):
+                    yield f"  bti {record_type}", self.bti_calls[record_type], self.bti_seconds[record_type]
+
+    def write_summary(self, output_file):
+        output_file.write("Parser statistics:\n")
+        output_file.write(f"  {'Stage':<16} {'Calls':>10} {'Seconds':>10} {'us/call':>10}\n")
+        for label, calls, seconds in self.iter_stage_rows():
+            output_file.write(f"  {label:<16} {calls:>10} {seconds:>10.3f} {seconds / calls * 1e6:>10.1f}\n")
+        output_file.write(f"  Records: {self.records} ({self.record_bytes} record bytes)\n")
+        output_file.write(f"  Bytes in: {self.bytes_in}  Bytes out: {self.bytes_out}\n")
+        if self.unknown_record_types:
+            counts = ", ".join(f"{record_type or '(blank)'}={count}"
+                               for record_type, count in self.unknown_record_types.most_common())
+            output_file.write(f"  Unknown record types: {counts}\n")
+        if self.unknown_item_types:
+            counts = ", ".join(f"{type_id}={count}" for type_id, count in self.unknown_item_types.most_common())
+            output_file.write(f"  Unknown item types: {counts}\n")
+
+    def prometheus_lines(self, prefix="d5fd"):
+        """Prometheus text exposition lines for the counters"""
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in samples:
+                label_text = "{" + ",".join(f'{key}="{escape_label(val)}"' for key, val in labels) + "}" if labels else ""
+                lines.append(f"{prefix}_{name}{label_text} {value}")
+
+        lines = []
+        metric("stage_calls_total", "Calls per parsing stage.",
+               [((("stage", stage),), self.calls[stage]) for stage in STAGES if self.calls[stage]])
+        metric("stage_seconds_total", "Cumulative seconds per parsing stage.",
+               [((("stage", stage),), self.seconds[stage]) for stage in STAGES if self.calls[stage]])
+        metric("bti_records_total", "Records whose BTI structure was decoded, per record type.",
+               [((("record_type", record_type),), count) for record_type, count in sorted(self.bti_calls.items())])
+        metric("bti_seconds_total", "Cumulative BTI decode seconds per record type.",
+               [((("record_type", record_type),), seconds) for record_type, seconds in sorted(self.bti_seconds.items())])
+        metric("records_total", "Records parsed.", [((), self.records)])
+        metric("record_bytes_total", "Bytes of the parsed records.", [((), self.record_bytes)])
+        metric("input_bytes_total", "Bytes read from the input file.", [((), self.bytes_in)])
+        metric("output_bytes_total", "Bytes written to the output file(s).", [((), self.bytes_out)])
+        metric("unknown_record_types_total", "Records of a type without a layout.",
+               [((("record_type", record_type),), count)
+                for record_type, count in sorted(self.unknown_record_types.items())])
+        metric("unknown_item_types_total", "Variable data items of an unknown type.",
+               [((("type_id", type_id),), count) for type_id, count in sorted(self.unknown_item_types.items())])
+        return lines
+
+    def write_prometheus(self, path, prefix="d5fd"):
+        """Write the counters as a Prometheus text file (replaced atomically, for textfile collectors)"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.prometheus_lines(prefix)) + "\n")
+        os.replace(temp_path, path)
+
+
+class RecordTimer:
+    """Times the header, BTI and item stages of each record a parser decodes
+
+    D5FDFileParser.parse_record calls start() and then one hook as each stage
+    ends; a parser without stats gets hooks that do nothing instead.
+    """
+
+    def __init__(self, stats, known_item_types=()):
+        self.stats = stats
+        self.known_item_types = known_item_types
+        self.last = 0.0
+
+    def lap(self):
+        """Seconds since start() or the previous lap"""
+        now = time.perf_counter()
+        seconds = now - self.last
+        self.last = now
+        return seconds
+
+    def start(self):
+        self.last = time.perf_counter()
+
+    def header_done(self, record_type, length, known):
+        self.stats.add_time("header", self.lap())
+        self.stats.count_record(record_type, length, known)
+        self.start()  # callbacks run by count_record are not BTI time
+
+    def bti_done(self, record_type):
+        self.stats.add_bti_time(record_type, self.lap())
+
+    def items_done(self, items):
+        self.stats.add_time("items", self.lap())
+        self.stats.count_items(items, self.known_item_types)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
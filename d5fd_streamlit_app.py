@@ -1,7 +1,23 @@
 import streamlit as st
-from d5fd_file_parser import D5FDFileParser
+from d5fd_file_parser import CODE_PAGES, D5FDFileParser
+from d5fd_index import record_keys
+import collections
+import hashlib
 import io
-import re
+import itertools
+import threading
+import time
+
+# Bytes held by the parses kept in the cache (input, field table and report);
+# least recently used parses are evicted (and stopped) past this
+PARSE_CACHE_BYTES = 256 << 20
+
+# Estimated bytes per field table row besides its text: the column list slots
+# and the headers of the strings built for the row
+TABLE_ROW_BYTES = 200
+
+# Seconds between UI refreshes while a background parse is running
+REFRESH_SECONDS = 0.5
 
 # Set wide layout and page title
 st.set_page_config(page_title="Core Ticketing - BTI Data Parser", layout="wide")
@@ -132,94 +148,275 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def format_output_with_dynamic_widths(output_text):
-    """Format output with dynamic column widths based on actual data"""
-    lines = output_text.split('\n')
-    data_lines = []
-    
-    # Parse data lines to find maximum widths
-    max_field_width = len("Field")
-    max_offset_width = len("Offset")
-    max_length_width = len("Len")
-    max_hex_width = len("Hex")
-    max_value_width = len("Value")
-    
-    for line in lines:
-        # Look for data lines with the pattern: FieldName OffsetH Length HexValue Value Description
-        parts = line.split()
-        if len(parts) >= 5 and len(parts[0]) > 0 and parts[1].endswith('h') and parts[2].isdigit():
-            field_name = parts[0]
-            offset = parts[1]
-            length = parts[2]
-            hex_value = parts[3]
-            
-            # Find value and description
-            remaining = ' '.join(parts[4:])
-            # Split at first space after non-space characters for value
-            value_match = re.match(r'^(\S+)\s*(.*)', remaining)
-            if value_match:
-                value = value_match.group(1)
-                description = value_match.group(2)
-            else:
-                value = remaining
-                description = ""
-            
-            # Update max widths
-            max_field_width = max(max_field_width, len(field_name))
-            max_offset_width = max(max_offset_width, len(offset))
-            max_length_width = max(max_length_width, len(length))
-            max_hex_width = max(max_hex_width, len(hex_value))
-            max_value_width = max(max_value_width, len(value))
-            
-            data_lines.append((field_name, offset, length, hex_value, value, description))
-    
-    # Add padding to widths
-    max_field_width += 2
-    max_offset_width += 2
-    max_length_width += 2
-    max_hex_width += 2
-    max_value_width += 2
-    
-    # Rebuild output with proper formatting
-    processed_lines = []
-    
-    for line in lines:
-        # Handle header lines
-        if ('Field Name' in line or 'Field' in line) and 'Offset' in line and ('Length' in line or 'Len' in line):
-            header = (f"{'Field':<{max_field_width}}"
-                     f"{'Offset':<{max_offset_width}}"
-                     f"{'Len':<{max_length_width}}"
-                     f"{'Hex':<{max_hex_width}}"
-                     f"{'Value':<{max_value_width}}"
-                     f"Description")
-            processed_lines.append(header)
-        elif line.startswith('-'):
-            # Create dynamic separator
-            total_width = max_field_width + max_offset_width + max_length_width + max_hex_width + max_value_width + 15
-            processed_lines.append('-' * min(total_width, 120))
-        elif line.startswith('='):
-            # Create dynamic separator for equals
-            total_width = max_field_width + max_offset_width + max_length_width + max_hex_width + max_value_width + 15
-            processed_lines.append('=' * min(total_width, 120))
+@st.cache_resource
+def get_parser(code_page):
+    """One parser per code page, shared across reruns and sessions"""
+    return D5FDFileParser(code_page=code_page)
+
+
+# Columns of the field table built from parse results
+TABLE_COLUMNS = ("Record", "Section", "Field", "Offset", "Len", "Hex", "Value", "Description")
+
+# Columns of the fixed-width text view (Description follows unpadded)
+TEXT_COLUMNS = ("Field", "Offset", "Len", "Hex", "Value")
+
+PAGE_SIZES = (100, 500, 1000, 5000)
+
+
+def record_rows(record_number, record):
+    """Field table rows for one ParsedRecord, in report order (blank BTI fields skipped as in the report)"""
+    rows = []
+    for section, fields in (("HEADER", record.header), (f"BTI {record.record_type}", record.fields)):
+        for field in fields:
+            if section != "HEADER" and field.is_blank:
+                continue
+            rows.append((record_number, section, field.name, f"{field.offset:04X}h", field.length,
+                         field.hex, str(field.text), field.description))
+    for item in record.items or ():
+        rows.append((record_number, "ITEMS", f"#{item.number} {item.type_id:02X}h", f"{item.offset:04X}h",
+                     item.total_length, item.data.hex().upper(), item.text, item.name))
+        subfield_groups = [("REPS", item.reps)] if item.reps is not None else []
+        subfield_groups += [(f"SEGMENT {n}", segment) for n, segment in enumerate(item.segments or (), 1)]
+        for section, subfields in subfield_groups:
+            for sub in subfields:
+                rows.append((record_number, f"ITEM #{item.number} {section}", sub.name, f"+{sub.offset}",
+                             sub.length, sub.raw.hex().upper(), sub.text, ""))
+    return rows
+
+
+def rows_size(rows):
+    """Estimated bytes of field table rows: the text built for each row plus TABLE_ROW_BYTES"""
+    text_bytes = sum(len(offset) + len(hex_text) + len(value) for _, _, _, offset, _, hex_text, value, _ in rows)
+    return text_bytes + len(rows) * TABLE_ROW_BYTES
+
+
+class ParseJob:
+    """Parses one input in a background thread; results grow while the UI reruns
+
+    Readers only look at the first row_count table rows and the first
+    len(record_starts) records, which are published after their rows.
+    cancel() stops the parse before its next record.
+    """
+
+    def __init__(self, parser, data):
+        self.parser = parser
+        self.data = data
+        self.total_bytes = len(data)
+        self.bytes_read = 0
+        self.table = {column: [] for column in TABLE_COLUMNS}
+        self.row_count = 0
+        self.record_starts = []
+        self.keys = {}            # document number / PNR locator -> record numbers
+        self.report_parts = []
+        self.result_bytes = 0     # estimated size of the table rows and report parts
+        self.error = None
+        self.cancelled = False
+        self.started = time.perf_counter()
+        self.finished = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def iter_lines(self):
+        for raw_line in io.BytesIO(self.data):
+            self.bytes_read += len(raw_line)
+            yield raw_line.decode("utf-8", errors="replace")
+
+    def run(self):
+        try:
+            for record_number, data in enumerate(self.parser.iter_records(self.iter_lines()), 1):
+                if self.cancelled:
+                    self.error = "Parse cancelled"
+                    return
+                self.add_record(record_number, data)
+            if not self.record_starts:
+                self.report_parts.append("No records found in input\n")
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.bytes_read = self.total_bytes
+            self.finished = time.perf_counter()
+
+    def add_record(self, record_number, data):
+        output_buffer = io.StringIO()
+        try:
+            record = self.parser.parse_record(data)
+            self.parser.render_record(record, output_buffer, record_number)
+            rows = record_rows(record_number, record)
+        except Exception as e:
+            output_buffer.write(f"Error parsing record: {e}\n")
+            rows = [(record_number, "ERROR", "", "", 0, "", f"Error parsing record: {e}", "")]
+
+        start = self.row_count
+        for column, values in zip(TABLE_COLUMNS, zip(*rows)):
+            self.table[column].extend(values)
+        for key, field, record_type in record_keys(self.parser, data):
+            self.keys.setdefault(key, []).append(record_number)
+        report = output_buffer.getvalue()
+        self.report_parts.append(report)
+        self.result_bytes += len(report) + rows_size(rows)
+        self.record_starts.append(start)
+        self.row_count = start + len(rows)
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def size(self):
+        """Estimated bytes held by the job: its input and its results so far"""
+        return self.total_bytes + self.result_bytes
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    @property
+    def progress(self):
+        return min(1.0, self.bytes_read / self.total_bytes) if self.total_bytes else 1.0
+
+    @property
+    def records_per_second(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return len(self.record_starts) / elapsed if elapsed > 0 else 0.0
+
+    def get_report(self):
+        return "".join(self.report_parts)
+
+
+@st.cache_resource
+def get_parse_jobs():
+    """Parse jobs by (content hash, code page), shared across reruns and sessions"""
+    return threading.Lock(), collections.OrderedDict()
+
+
+def get_parse_job(content_hash, code_page, data):
+    """Start parsing an input, or return the job already parsing (or done parsing) it"""
+    lock, jobs = get_parse_jobs()
+    key = (content_hash, code_page)
+    with lock:
+        job = jobs.get(key)
+        if job is None:
+            job = jobs[key] = ParseJob(get_parser(code_page), data)
         else:
-            # Check if this is a data line we parsed
-            found_data = False
-            for data in data_lines:
-                if line.startswith(data[0]) and data[1] in line:
-                    formatted_line = (f"{data[0]:<{max_field_width}}"
-                                    f"{data[1]:<{max_offset_width}}"
-                                    f"{data[2]:<{max_length_width}}"
-                                    f"{data[3]:<{max_hex_width}}"
-                                    f"{data[4]:<{max_value_width}}"
-                                    f"{data[5]}")
-                    processed_lines.append(formatted_line)
-                    found_data = True
-                    break
-            
-            if not found_data:
-                processed_lines.append(line)
-    
-    return '\n'.join(processed_lines)
+            jobs.move_to_end(key)
+        # Results keep growing while jobs run, so sizes are checked on every rerun
+        evict_parse_jobs(jobs, PARSE_CACHE_BYTES)
+    return job
+
+
+def evict_parse_jobs(jobs, limit):
+    """Drop least recently used jobs, cancelling their parse, until their inputs and results fit in limit bytes
+
+    The newest job (the last one) always stays, however large it is.
+    """
+    total = sum(job.size for job in jobs.values())
+    while total > limit and len(jobs) > 1:
+        key, job = jobs.popitem(last=False)
+        job.cancel()
+        total -= job.size
+
+
+def get_content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def format_record_text(table, start, end):
+    """Fixed-width text of table rows start:end, with column widths computed once per section"""
+    lines = []
+    for section, indexes in itertools.groupby(range(start, end), key=table["Section"].__getitem__):
+        indexes = list(indexes)
+        widths = [
+            max(len(column), max(len(str(table[column][i])) for i in indexes)) + 2
+            for column in TEXT_COLUMNS
+        ]
+        heading = "".join(f"{column:<{width}}" for column, width in zip(TEXT_COLUMNS, widths)) + "Description"
+        lines += ["", section, "=" * min(len(heading), 120), heading, "-" * min(len(heading), 120)]
+        for i in indexes:
+            lines.append("".join(f"{str(table[column][i]):<{width}}" for column, width in zip(TEXT_COLUMNS, widths))
+                         + table["Description"][i])
+    return "\n".join(lines).lstrip("\n")
+
+
+def record_row_range(job, record_number):
+    """(start, end) field table rows of a published record, or None while its end is not known yet
+
+    A record ends where the next one starts; only the last record of a
+    finished parse ends at row_count, which keeps growing while parsing.
+    """
+    done = job.done  # read first: once done, record_starts and row_count are final
+    starts = job.record_starts
+    start = starts[record_number - 1]
+    if record_number < len(starts):
+        return start, starts[record_number]
+    if done:
+        return start, job.row_count
+    return None
+
+
+def show_field_table(table, total):
+    """Paginated dataframe of the first total rows of the field table"""
+    size_column, page_column = st.columns(2)
+    page_size = size_column.selectbox("Rows per page:", PAGE_SIZES, index=1)
+    page_count = max(1, -(-total // page_size))
+    # Fixed label and key, so the page survives reruns while the page count grows
+    page = min(page_column.number_input("Page:", min_value=1, value=1, step=1, key="table_page"), page_count)
+    page_column.caption(f"Page {page} of {page_count}")
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    st.dataframe({column: values[start:end] for column, values in table.items()},
+                 use_container_width=True, hide_index=True)
+
+
+def show_record_text(job, record_count):
+    """Fixed-width text view of one record, picked by index or by ticket/document number"""
+    index_column, key_column = st.columns(2)
+    record_number = min(index_column.number_input("Record:", min_value=1, value=1, step=1, key="text_record"),
+                        record_count)
+    index_column.caption(f"Record {record_number} of {record_count}")
+    key = key_column.text_input("Or ticket / document number / PNR locator:").strip()
+    if key:
+        record_numbers = [n for n in job.keys.get(key, ()) if n <= record_count]
+        if not record_numbers:
+            st.warning(f"No record found for {key}" + ("" if job.done else " yet"))
+            return
+        if len(record_numbers) > 1:
+            st.write(f"{key} is in records {', '.join(map(str, record_numbers))}")
+        record_number = record_numbers[0]
+
+    row_range = record_row_range(job, record_number)
+    if row_range is None:
+        st.info(f"Record {record_number} is still being parsed")
+        return
+    st.code(format_record_text(job.table, *row_range), language=None)
+
+
+def show_parse_job(job):
+    """Progress, then whatever has been parsed so far"""
+    # Snapshot: rows of the records published so far
+    record_count = len(job.record_starts)
+    total = job.row_count if job.done else (job.record_starts[-1] if record_count else 0)
+    if not job.done and record_count:
+        record_count -= 1  # the newest record may still be publishing its rows
+
+    status = f"{record_count} records, {total} fields, {job.records_per_second:.0f} records/sec"
+    if job.done:
+        st.write(status)
+    else:
+        st.progress(job.progress, text=f"Parsing... {status}")
+    if job.error:
+        st.error(f"Error parsing input: {job.error}")
+
+    if record_count:
+        view = st.radio("View:", ["Table", "Text"], horizontal=True)
+        if view == "Table":
+            show_field_table(job.table, total)
+        else:
+            show_record_text(job, record_count)
+    elif job.done:
+        st.write("No records found in input")
+
+    if job.done:
+        st.download_button("Download Output", job.get_report(), file_name="parsed_output.txt", mime="text/plain")
+
 
 def main():
     st.markdown("<div class='main-container'>", unsafe_allow_html=True)
@@ -228,36 +425,48 @@ def main():
     st.write("Choose an input method to provide BTI hex data for parsing.")
 
     input_method = st.radio("Choose input method:", ["Upload hex file", "Paste hex data"])
+    code_page = st.selectbox("EBCDIC code page:", CODE_PAGES)
 
-    hex_data = ""
+    input_data = b""
+    content_hash = None
     parse_clicked = False
     
     if input_method == "Upload hex file":
-        uploaded_file = st.file_uploader("Upload a hex file", type=["txt"])
+        uploaded_file = st.file_uploader("Upload a hex file (one or many records)", type=["txt"])
         if uploaded_file is not None:
-            hex_data = uploaded_file.read().decode("utf-8")
+            input_data = uploaded_file.getvalue()
+            # Hash each upload once, not on every rerun
+            hashed = st.session_state.get("upload_hash")
+            if hashed is None or hashed[0] != uploaded_file.file_id:
+                hashed = st.session_state["upload_hash"] = (uploaded_file.file_id, get_content_hash(input_data))
+            content_hash = hashed[1]
             parse_clicked = True  # Auto-parse for uploaded files
     else:
         hex_data = st.text_area("Paste hex data here", height=250)
         parse_clicked = st.button("Parse Data")
+        input_data = hex_data.encode("utf-8")
+        content_hash = get_content_hash(input_data) if hex_data else None
 
     st.markdown("</div>", unsafe_allow_html=True)
 
-    if hex_data and parse_clicked:
-        parser = D5FDFileParser()
-        output_buffer = io.StringIO()
-        parser.parse_record_to_file(hex_data, output_buffer)
-        output_text = output_buffer.getvalue()
+    if content_hash and parse_clicked:
+        st.session_state["parsed_hash"] = content_hash
 
-        # Format with dynamic column widths
-        formatted_output = format_output_with_dynamic_widths(output_text)
+    # Keep showing the parsed input while the user pages through it
+    if content_hash and st.session_state.get("parsed_hash") == content_hash:
+        # Reruns with the same input reuse the running or finished parse
+        job = get_parse_job(content_hash, code_page, input_data)
 
         st.markdown("<div class='section'>", unsafe_allow_html=True)
         st.subheader("Parsed Output")
-        st.code(formatted_output, language=None)
-        st.download_button("Download Output", output_text, file_name="parsed_output.txt", mime="text/plain")
+        show_parse_job(job)
         st.markdown("</div>", unsafe_allow_html=True)
 
+        if not job.done:
+            # Poll: results stream in on each rerun until the parse finishes
+            time.sleep(REFRESH_SECONDS)
+            st.rerun()
+
     st.markdown("</div>", unsafe_allow_html=True)
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+"""Tests of the group-by aggregator"""
+
+import io
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_aggregate import GroupAggregator  # noqa: E402
+from d5fd_encoder import RecordEncoder  # noqa: E402
+
+
+def encode_records():
+    encoder = RecordEncoder()
+    return [
+        encoder.encode("TAR", {"ND5FDFCC": "USD", "ND5FDTDI": "3", "ND5FDTTF": "-1.234", "ND5FDTKN": "1"}),
+        encoder.encode("TAR", {"ND5FDFCC": "USD", "ND5FDTTF": "12.5", "ND5FDTKN": "2"}),
+        encoder.encode("TAR", {"ND5FDFCC": "USD", "ND5FDTDI": "0", "ND5FDTTF": "700", "ND5FDTKN": "1"}),
+        encoder.encode("TAR", {"ND5FDFCC": "EUR", "ND5FDTTF": "0.10", "ND5FDTKN": "3"}),
+        encoder.encode("MAR", {"ND5FDVFC": "ATL1", "ND5FDVID": "AGENT7"}),
+    ]
+
+
+def test_sums_are_exact_across_decimal_indicators():
+    aggregator = GroupAggregator(["ND5FDFCC"], ["sum:ND5FDTTF", "count"]).add_records(encode_records())
+    assert aggregator.columns == ["ND5FDFCC", "sum(ND5FDTTF)", "count"]
+    assert list(aggregator.iter_rows()) == [
+        ["EUR", Decimal("0.10"), 1],
+        ["USD", Decimal("711.266"), 3],
+    ]
+    # The MAR record has neither field
+    assert (aggregator.records, aggregator.skipped) == (4, 1)
+
+
+def test_min_max_and_distinct():
+    aggregator = GroupAggregator(["ND5FDFCC"], ["min:ND5FDTTF", "max:ND5FDTTF", "distinct:ND5FDTKN"])
+    aggregator.add_records(encode_records())
+    usd = next(row for row in aggregator.iter_rows() if row[0] == "USD")
+    assert usd[1:] == [Decimal("-1.234"), Decimal("700"), 2]
+
+
+def test_count_without_groups_counts_every_record():
+    aggregator = GroupAggregator().add_records(encode_records())
+    assert list(aggregator.iter_rows()) == [[5]]
+    assert aggregator.skipped == 0
+
+
+def test_invalid_aggregates():
+    with pytest.raises(ValueError, match="Cannot sum ND5FDFCC"):
+        GroupAggregator(aggregates=["sum:ND5FDFCC"])
+    with pytest.raises(ValueError, match="Unknown field: ND5FDXXX"):
+        GroupAggregator(["ND5FDXXX"])
+    with pytest.raises(ValueError, match="Unknown aggregate"):
+        GroupAggregator(aggregates=["avg:ND5FDTTF"])
+    with pytest.raises(ValueError, match="needs a field"):
+        GroupAggregator(aggregates=["sum"])
+
+
+def test_result_formats():
+    aggregator = GroupAggregator(["ND5FDFCC"], ["sum:ND5FDTTF"]).add_records(encode_records())
+    csv_output = io.StringIO()
+    aggregator.write_csv(csv_output)
+    assert csv_output.getvalue().splitlines() == ["ND5FDFCC,sum(ND5FDTTF)", "EUR,0.10", "USD,711.266"]
+
+    jsonl_output = io.StringIO()
+    aggregator.write_jsonl(jsonl_output)
+    assert jsonl_output.getvalue().splitlines()[1] == '{"ND5FDFCC": "USD", "sum(ND5FDTTF)": "711.266"}'
+
+    text_output = io.StringIO()
+    aggregator.write_text(text_output)
+    lines = text_output.getvalue().splitlines()
+    assert "Records skipped (fields not in their layout): 1" in lines
+    assert lines[-1].split() == ["USD", "711.266"]
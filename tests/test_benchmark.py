@@ -0,0 +1,35 @@
+"""Tests of the benchmark's synthetic records and regression checks"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import d5fd_benchmark as benchmark  # noqa: E402
+from d5fd_file_parser import D5FDFileParser  # noqa: E402
+
+
+def test_synthetic_items_decode_field_by_field():
+    record = D5FDFileParser().parse_record(benchmark.build_record("TAR", 1))
+    reps = next(item.reps for item in record.items if item.reps is not None)
+    segments = next(item.segments for item in record.items if item.segments)
+
+    assert [sub.text for sub in reps[:3]] == ["A", "1234", "BANKNET01"]
+    assert sum(sub.length for sub in reps) == len(reps[-1].raw) + reps[-1].offset == 221
+    assert [[sub.text for sub in segment] for segment in segments] == [
+        ["DL", "1234", "Y", "01JAN", "0800", "ATL", "DFW", "OK"],
+        ["AA", "0100", "F", "02JAN", "1230", "DFW", "LAX", "HK"],
+        ["UA", "0999", "J", "05JAN", "2355", "LAX", "SFO", "OK"],
+    ]
+
+
+def test_find_regressions_checks_rates_and_peak_memory():
+    baseline = {"TAR": {"bti": 1000.0, "render": 1000.0, "peak_kb": 100.0}}
+    results = {"TAR": {"bti": 700.0, "render": 900.0, "peak_kb": 130.0}}
+
+    assert benchmark.find_regressions(results, baseline, 0.25) == [
+        ("TAR", "bti", 1000.0, 700.0),
+        ("TAR", "peak_kb", 100.0, 130.0),
+    ]
+    assert benchmark.find_regressions(results, baseline, 0.5) == []
+
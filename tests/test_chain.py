@@ -0,0 +1,92 @@
+"""Tests of chained block reassembly into logical records"""
+
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_benchmark import build_record  # noqa: E402
+from d5fd_chain import iter_logical_records  # noqa: E402
+from d5fd_file_parser import BTI_OFFSET, RECORD_LAYOUTS  # noqa: E402
+
+
+def make_block(header, body, forward, back, block_number, block_count):
+    """Block of header bytes and body with its chain fields, block numbers and NAB set"""
+    block = bytearray(header[:BTI_OFFSET]) + body
+    struct.pack_into(">II", block, 0x008, forward, back)
+    block[0x024:0x028] = f"{block_number:02d}{block_count:02d}".encode("cp037")
+    block[0x02C:0x02E] = len(block).to_bytes(2, "big")
+    return bytes(block)
+
+
+def split_record(data, addresses):
+    """(file address, block) pairs chaining data's item area over len(addresses) blocks"""
+    start = RECORD_LAYOUTS["TAR"].variable_offset + 40
+    step = (len(data) - start) // (len(addresses) - 1)
+    cuts = [BTI_OFFSET] + [start + step * number for number in range(len(addresses) - 1)] + [len(data)]
+    count = len(addresses)
+    blocks = []
+    for number, address in enumerate(addresses):
+        forward = addresses[number + 1] if number + 1 < count else 0
+        back = addresses[number - 1] if number else 0
+        blocks.append((address, make_block(data, data[cuts[number]:cuts[number + 1]], forward, back,
+                                           number + 1, count)))
+    return blocks
+
+
+def test_chain_rejoins_item_area():
+    data = build_record("TAR", 1)
+    blocks = split_record(data, (0x100, 0x200, 0x300))
+    records = list(iter_logical_records(blocks))
+
+    assert len(records) == 1 and records[0].complete
+    assert records[0].data[BTI_OFFSET:] == data[BTI_OFFSET:]
+
+
+def test_records_keep_first_block_order_across_batches():
+    prime, middle, last = split_record(build_record("TAR", 2), (0x100, 0x200, 0x300))
+    singles = [(0x1000 + number, build_record("REF", number)) for number in range(3)]
+    # The chain's prime block is in the first batch of three, its overflow blocks in the second
+    blocks = [prime, singles[0], singles[1], middle, last, singles[2]]
+    problems = []
+    records = list(iter_logical_records(blocks, batch_size=3, on_problem=problems.append))
+
+    assert not problems
+    assert [record.blocks[0].sequence for record in records] == [0, 1, 2, 5]
+    assert [len(record.blocks) for record in records] == [3, 1, 1, 1]
+    assert records[0].complete
+
+
+def test_chain_links_without_file_addresses():
+    data = build_record("TAR", 3)
+    blocks = [block for address, block in split_record(data, (0x100, 0x200, 0x300))]
+    records = list(iter_logical_records(blocks))
+
+    assert len(records) == 1 and records[0].complete
+    assert records[0].data[BTI_OFFSET:] == data[BTI_OFFSET:]
+
+
+def test_missing_block_reports_incomplete_chain_and_orphan():
+    prime, middle, last = split_record(build_record("TAR", 4), (0x100, 0x200, 0x300))
+    problems = []
+    records = list(iter_logical_records([prime, last], on_problem=problems.append))
+
+    assert [(len(record.blocks), record.complete) for record in records] == [(1, False)]
+    assert [(problem.kind, len(problem.blocks)) for problem in problems] == [("incomplete", 1), ("orphan", 1)]
+    assert problems[1].blocks[0].address == 0x300
+
+
+def test_block_count_and_loop_problems():
+    data = build_record("TAR", 5)
+    start = RECORD_LAYOUTS["TAR"].variable_offset + 40
+    short = [(0x100, make_block(data, data[BTI_OFFSET:start], 0x200, 0, 1, 3)),
+             (0x200, make_block(data, data[start:], 0, 0x100, 2, 3))]
+    looped = [(0x500, make_block(data, data[BTI_OFFSET:start], 0x600, 0, 1, 2)),
+              (0x600, make_block(data, data[start:], 0x500, 0x500, 2, 2))]
+    problems = []
+    records = list(iter_logical_records(short + looped, on_problem=problems.append))
+
+    assert [(len(record.blocks), record.complete) for record in records] == [(2, False), (2, False)]
+    assert [problem.kind for problem in problems] == ["block count", "loop"]
+    assert problems[0].message == "block count chain at block 1: 2 block(s) linked, 3 expected"
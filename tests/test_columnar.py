@@ -0,0 +1,126 @@
+"""Tests of the NumPy column decoders against the scalar decoders"""
+
+import os
+import sys
+from decimal import Decimal
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_benchmark import build_record  # noqa: E402
+from d5fd_columnar import (  # noqa: E402
+    column_decimals, decode_amount_column, decode_columns, decode_packed_column, decode_pic_column,
+    decode_places_column, decode_segment_columns, iter_column_batches,
+)
+from d5fd_encoder import RecordEncoder  # noqa: E402
+from d5fd_file_parser import RECORD_LAYOUTS, D5FDFileParser, packed_value, zoned_value  # noqa: E402
+
+
+def block(rows):
+    return np.array([list(row) for row in rows], dtype=np.uint8)
+
+
+def column_values(column):
+    """Python values of a masked column, None where masked"""
+    return [None if masked else int(value) for value, masked in zip(column.data, np.ma.getmaskarray(column))]
+
+
+ZONED_ROWS = [
+    "00012345".encode("cp037"),
+    "0001234".encode("cp037") + b"\xd5",   # -12345
+    "0001234".encode("cp037") + b"\xc5",   # +12345
+    b"\x40" * 8,                           # blank
+    "0012 345".encode("cp037"),            # embedded space
+    bytes(8),                              # binary zeros
+]
+
+PACKED_ROWS = [
+    b"\x00\x01\x23\x4c",
+    b"\x00\x01\x23\x4d",
+    b"\x00\x01\x23\x4f",
+    b"\x00\x01\x2a\x4c",                   # bad digit nibble
+    b"\x00\x01\x23\x45",                   # bad sign nibble
+    b"\x40\x40\x40\x40",
+]
+
+
+def test_decode_pic_column_matches_zoned_value():
+    column = decode_pic_column(block(ZONED_ROWS))
+    assert column_values(column) == [zoned_value(row) for row in ZONED_ROWS]
+    assert column_values(column) == [12345, -12345, 12345, None, None, None]
+
+
+def test_decode_pic_column_wide_fields_are_exact():
+    rows = [("9" * 25).encode("cp037"), ("9" * 24).encode("cp037") + b"\xd9", b"\x40" * 25]
+    column = decode_pic_column(block(rows))
+    assert column.dtype == object
+    assert column_values(column) == [int("9" * 25), -int("9" * 25), None]
+
+
+def test_decode_packed_column_matches_packed_value():
+    column = decode_packed_column(block(PACKED_ROWS))
+    assert column_values(column) == [packed_value(row) for row in PACKED_ROWS]
+    assert column_values(column) == [1234, -1234, 1234, None, None, None]
+
+
+def test_decode_packed_column_wide_fields_are_exact():
+    rows = [bytes.fromhex("9" * 19 + "c"), bytes.fromhex("9" * 19 + "d"), bytes.fromhex("9" * 17 + "a9" + "c")]
+    column = decode_packed_column(block(rows))
+    assert column.dtype == object
+    assert column_values(column) == [int("9" * 19), -int("9" * 19), None]
+
+
+def test_decimal_indicator_scaling():
+    places = decode_places_column(block([b"\xf3", b"\xf0", b"\x40"]))
+    assert places.tolist() == [3, 0, 2]
+
+    units = np.ma.masked_array([12345, -5, 7], mask=[False, False, True])
+    assert column_decimals(units, places).tolist() == [Decimal("12.345"), Decimal("-5"), None]
+    assert column_decimals(units, 2).tolist() == [Decimal("123.45"), Decimal("-0.05"), None]
+
+
+def test_decode_amount_column_matches_parse_record():
+    encoder = RecordEncoder()
+    records = [
+        encoder.encode("TAR", {"ND5FDTDI": "3", "ND5FDTTF": "-1.234"}),
+        encoder.encode("TAR", {"ND5FDTTF": "12.5"}),
+        encoder.encode("TAR", {"ND5FDTDI": "0", "ND5FDTTF": "700"}),
+    ]
+    spec = RECORD_LAYOUTS["TAR"].plan.by_name["ND5FDTTF"]
+    width = max(len(data) for data in records)
+    array = block(data.ljust(width, b"\x00") for data in records)
+    parser = D5FDFileParser()
+    assert decode_amount_column(array, spec).tolist() == [
+        parser.parse_record(data).get("ND5FDTTF") for data in records]
+
+
+def test_decode_columns_match_parse_record():
+    records = [build_record("TAR", seed) for seed in range(5)]
+    names = ["ND5FDTKN", "ND5FDFCC", "ND5FDDTE", "ND5FDCIR"]
+    columns = decode_columns(records, "TAR", names)
+    parser = D5FDFileParser()
+    for row, data in enumerate(records):
+        record = parser.parse_record(data)
+        assert columns["ND5FDTKN"][row] == record.get("ND5FDTKN")
+        assert columns["ND5FDFCC"][row] == record.get("ND5FDFCC")
+        assert columns["ND5FDDTE"][row].astype(object) == record.get("ND5FDDTE")
+        assert columns["ND5FDCIR"][row] == record.get("ND5FDCIR")
+
+
+def test_iter_column_batches_picks_one_type():
+    records = [build_record(record_type, seed) for seed, record_type in enumerate(["TAR", "REF", "TAR", "TAR"])]
+    batches = list(iter_column_batches(records, "TAR", ["ND5FDTKN"], batch_size=2))
+    assert [len(batch["ND5FDTKN"]) for batch in batches] == [2, 1]
+    parser = D5FDFileParser()
+    expected = [parser.parse_record(data).get("ND5FDTKN") for data in records if data[0x20:0x23] == b"\xe3\xc1\xd9"]
+    assert [value for batch in batches for value in batch["ND5FDTKN"]] == expected
+
+
+def test_decode_segment_columns():
+    parser = D5FDFileParser()
+    payload = next(item.data for item in parser.parse_record(build_record("TAR", 1)).items if item.segments)
+    columns = decode_segment_columns([payload, payload[:26]])
+    assert columns["payload"].tolist() == [0, 0, 0, 1]
+    assert columns["segment"].tolist() == [1, 2, 3, 1]
+    assert columns["carrier_code"].tolist() == ["DL", "AA", "UA", "DL"]
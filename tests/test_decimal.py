@@ -0,0 +1,102 @@
+"""Tests of the zoned, packed and PIC decimal decoders and decimal indicator scaling"""
+
+import io
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_encoder import RecordEncoder  # noqa: E402
+from d5fd_file_parser import (  # noqa: E402
+    D5FDFileParser, decimal_places, decode_pic, format_pic, packed_value, pic_value, zoned_value,
+)
+
+
+def zoned(text, sign=None):
+    """Zoned bytes of a digit string; sign "C" or "D" goes in the last byte's zone"""
+    data = text.encode("cp037")
+    if sign is not None:
+        data = data[:-1] + bytes((data[-1] & 0x0F | (0xC0 if sign == "C" else 0xD0),))
+    return data
+
+
+def test_zoned_value():
+    assert zoned_value(zoned("00123")) == 123
+    assert zoned_value(zoned("00123", "C")) == 123
+    assert zoned_value(zoned("00123", "D")) == -123
+    assert zoned_value(zoned("00")) == 0
+
+
+def test_zoned_value_rejects_non_digits():
+    assert zoned_value(b"\x40" * 5) is None                 # blank
+    assert zoned_value(bytes(5)) is None                    # binary zeros
+    assert zoned_value(zoned("12 45")) is None              # embedded space
+    assert zoned_value(zoned("12A45")) is None              # letter
+    assert zoned_value(zoned("1")) is None                  # fewer than two digits
+    assert zoned_value(zoned("0012") + b"\xda") is None     # D zone on a non-digit nibble
+    assert zoned_value(zoned("0012", "D") + zoned("3")) is None  # sign zone not on the last byte
+
+
+def test_zoned_value_is_exact_past_int64():
+    digits = "9" * 30
+    assert zoned_value(zoned(digits)) == int(digits)
+    assert zoned_value(zoned(digits, "D")) == -int(digits)
+
+
+def test_packed_value():
+    assert packed_value(b"\x12\x3c") == 123
+    assert packed_value(b"\x12\x3d") == -123
+    assert packed_value(b"\x12\x3b") == -123
+    assert packed_value(b"\x12\x3f") == 123                 # unsigned
+    assert packed_value(b"\x0c") == 0
+    assert packed_value(bytes.fromhex("9" * 39 + "d")) == -int("9" * 39)
+
+
+def test_packed_value_rejects_bad_nibbles():
+    assert packed_value(b"\x1a\x3c") is None                # digit nibble above 9
+    assert packed_value(b"\x12\x34") is None                # no sign nibble
+    assert packed_value(b"\x40\x40") is None                # blank
+    assert packed_value(b"") is None
+
+
+def test_pic_value_scales_exactly():
+    assert pic_value(zoned("00012345")) == Decimal("123.45")
+    assert pic_value(zoned("00012345", "D")) == Decimal("-123.45")
+    assert pic_value(zoned("00012345"), 3) == Decimal("12.345")
+    assert pic_value(zoned("00012345"), 0) == Decimal("12345")
+    assert pic_value(zoned("9" * 20), 2) == Decimal("9" * 18 + ".99")
+    assert pic_value(b"\x40" * 8) is None
+
+
+def test_decode_pic_falls_back_to_text():
+    assert decode_pic(zoned("00012345")) == Decimal("123.45")
+    assert decode_pic("N/A     ".encode("cp037")) == "N/A"
+    assert format_pic(Decimal("-1.50"), b"") == "-1.50"
+    assert format_pic(Decimal("12.000"), b"") == "12.000"
+
+
+def test_decimal_places():
+    assert decimal_places(zoned("3")) == 3
+    assert decimal_places(zoned("0")) == 0
+    assert decimal_places(b"\x40") == 2
+    assert decimal_places(b"\x40", default=0) == 0
+    assert decimal_places(b"") == 2
+
+
+def test_amounts_scaled_by_their_decimal_indicator():
+    parser = D5FDFileParser()
+    encoder = RecordEncoder()
+    three = encoder.encode("TAR", {"ND5FDTDI": "3", "ND5FDTTF": "-1.234", "ND5FDBDI": "0", "ND5FDTBS": "1500"})
+    default = encoder.encode("TAR", {"ND5FDTTF": "12.5"})
+
+    record = parser.parse_record(three)
+    assert record.get("ND5FDTTF") == Decimal("-1.234")
+    assert record.get("ND5FDTBS") == Decimal("1500")
+    # Without an indicator digit the amount has two decimals
+    assert parser.parse_record(default).get("ND5FDTTF") == Decimal("12.50")
+
+    report = io.StringIO()
+    parser.write_record_report(three, report)
+    row = next(line for line in report.getvalue().splitlines() if line.startswith("ND5FDTTF"))
+    assert " -1.234 " in row
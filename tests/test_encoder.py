@@ -0,0 +1,96 @@
+"""Tests of the record encoder"""
+
+import datetime
+import json
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import d5fd_encoder  # noqa: E402
+from d5fd_encoder import RecordEncoder  # noqa: E402
+from d5fd_file_parser import D5FDFileParser  # noqa: E402
+
+MIXED_SPECS = (
+    {"record_type": "TAR", "fields": {"ND5FDTKN": "0012345678901"}},
+    {"record_type": "MAR", "fields": {"ND5FDVFC": "ATL1", "ND5FDVID": "AGENT7"}},
+)
+
+
+def run_encoder(monkeypatch, tmp_path, specs, *options):
+    input_path = tmp_path / "records.jsonl"
+    input_path.write_text("".join(json.dumps(spec) + "\n" for spec in specs))
+    output_path = tmp_path / "records.txt"
+    monkeypatch.setattr(sys, "argv", ["d5fd_encoder.py", str(input_path), str(output_path), *options])
+    d5fd_encoder.main()
+    return output_path
+
+
+def test_sequence_over_mixed_record_types(monkeypatch, tmp_path, capsys):
+    output_path = run_encoder(monkeypatch, tmp_path, MIXED_SPECS, "--count", "5", "--sequence", "ND5FDTKN")
+    assert "Records written: 5" in capsys.readouterr().out
+
+    parser = D5FDFileParser()
+    records = [parser.parse_record(data) for data in parser.iter_records(output_path.read_text())]
+    assert [record.record_type for record in records] == ["TAR", "MAR", "TAR", "MAR", "TAR"]
+    # TAR records are numbered by their place in the output; MAR records have no ND5FDTKN and stay as encoded
+    assert [record.get("ND5FDTKN") for record in records[::2]] == ["00000000000001", "00000000000003",
+                                                                   "00000000000005"]
+    assert all(record.get("ND5FDVFC") == "ATL1" and record.get("ND5FDVID") == "AGENT7" for record in records[1::2])
+    assert records[1].data == records[3].data
+
+
+def test_sequence_field_in_no_layout_is_an_error(monkeypatch, tmp_path, capsys):
+    run_encoder(monkeypatch, tmp_path, MIXED_SPECS, "--sequence", "ND5FDXXX")
+    assert capsys.readouterr().out.strip() == "Error: Unknown sequence field: ND5FDXXX"
+
+
+def test_spec_round_trips_through_the_parser():
+    spec = {
+        "record_type": "TAR",
+        "fields": {"ND5FDTKN": "0012345678901", "ND5FDFCC": "USD", "ND5FDTDI": "3", "ND5FDTTF": "-1.234",
+                   "ND5FDTBS": "99999.99", "ND5FDDTE": "2024-02-29", "ND5FDH01": 4000000000},
+        "items": [
+            {"type": 71, "reps": {"validation_code": "AB12", "Last Four Digits of Credit Card": "4242"}},
+            {"type": 74, "segments": [{"carrier_code": "DL", "flight_number": "1234"},
+                                      {"carrier_code": "AA", "origin_city_code": "DFW"}]},
+            {"type": 80, "text": "FREE TEXT"},
+        ],
+    }
+    record = D5FDFileParser().parse_record(RecordEncoder().encode_spec(spec))
+
+    assert record.record_type == "TAR"
+    assert record.get("ND5FDTKN") == "0012345678901"
+    assert record.get("ND5FDFCC") == "USD"
+    assert record.get("ND5FDTTF") == Decimal("-1.234")
+    assert record.get("ND5FDTBS") == Decimal("99999.99")
+    assert record.get("ND5FDDTE") == datetime.date(2024, 2, 29)
+    assert record.get("ND5FDH01") == 4000000000
+    assert record.get("ND5FDCIR") == 3
+    assert record.get("ND5FDNAB") == len(record.data)
+
+    reps, segments, text = record.items
+    assert (reps.type_id, segments.type_id, text.type_id) == (71, 74, 80)
+    assert [sub.text for sub in reps.reps[:2]] == ["", "AB12"]
+    assert reps.reps[15].text == "4242"
+    assert [[sub.text for sub in segment][:3] for segment in segments.segments] == [["DL", "1234", ""],
+                                                                                     ["AA", "", ""]]
+    assert segments.segments[1][5].text == "DFW"
+    assert text.text == "FREE TEXT"
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"ND5FDFCC": "USDX"}, "ND5FDFCC: 'USDX' is longer than 3 bytes"),
+    ({"ND5FDTTF": "1.234"}, "ND5FDTTF: 1.234 does not fit in 2 decimal places"),
+    ({"ND5FDTDI": "0", "ND5FDTTF": "-0.5"}, "ND5FDTTF: -0.5 does not fit in 0 decimal places"),
+    ({"ND5FDTTF": "1234567"}, "ND5FDTTF: 1234567 does not fit in 8 digits"),
+    ({"ND5FDH01": 1 << 32}, "ND5FDH01: 4294967296 does not fit in 4 bytes"),
+    ({"ND5FDXXX": "1"}, "Unknown field for TAR: ND5FDXXX"),
+])
+def test_values_that_do_not_fit_are_errors(fields, message):
+    with pytest.raises(ValueError) as error:
+        RecordEncoder().encode("TAR", fields)
+    assert str(error.value) == message
@@ -0,0 +1,67 @@
+"""Tests of the CSV, JSON lines and Parquet table export"""
+
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_benchmark import build_record  # noqa: E402
+from d5fd_encoder import RecordEncoder  # noqa: E402
+from d5fd_export import export_records  # noqa: E402
+from d5fd_file_parser import RECORD_LAYOUTS, D5FDFileParser  # noqa: E402
+
+
+def encode_records():
+    encoder = RecordEncoder()
+    return [
+        encoder.encode("TAR", {"ND5FDFCC": "USD", "ND5FDTDI": "3", "ND5FDTTF": "-1.234"}),
+        build_record("TAR", 1),
+        encoder.encode("MAR", {"ND5FDVFC": "ATL1", "ND5FDVID": "AGENT7"}),
+    ]
+
+
+def table_names(paths, stem):
+    return sorted(os.path.basename(path)[len(stem) + 1:].rsplit(".", 1)[0] for path in paths)
+
+
+def test_csv_export_writes_a_table_per_layout(tmp_path):
+    count, paths = export_records(D5FDFileParser(), encode_records(), str(tmp_path / "out.csv"), "csv",
+                                  row_group_size=1)
+    tar, mar = RECORD_LAYOUTS["TAR"].name, RECORD_LAYOUTS["MAR"].name
+    assert count == 3
+    assert table_names(paths, "out") == sorted([tar, mar, "items", "reps", "segments"])
+
+    with open(tmp_path / f"out.{tar}.csv", newline="") as table:
+        rows = list(csv.DictReader(table))
+    assert [row["record_number"] for row in rows] == ["1", "2"]
+    assert rows[0]["ND5FDFCC"] == "USD" and rows[0]["ND5FDTTF"] == "-1.234"
+
+    with open(tmp_path / "out.segments.csv", newline="") as table:
+        segments = list(csv.DictReader(table))
+    assert [(row["record_number"], row["segment_number"]) for row in segments] == [("2", "1"), ("2", "2"), ("2", "3")]
+
+
+def test_jsonl_export_matches_parsed_values(tmp_path):
+    records = encode_records()
+    count, paths = export_records(D5FDFileParser(), records, str(tmp_path / "out.jsonl"), "jsonl")
+    with open(tmp_path / f"out.{RECORD_LAYOUTS['MAR'].name}.jsonl") as table:
+        rows = [json.loads(line) for line in table]
+    assert len(rows) == 1
+    assert (rows[0]["record_number"], rows[0]["ND5FDVFC"], rows[0]["ND5FDVID"]) == (3, "ATL1", "AGENT7")
+
+
+def test_parquet_export(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    count, paths = export_records(D5FDFileParser(), encode_records(), str(tmp_path / "out.parquet"), "parquet")
+    table = pq.read_table(str(tmp_path / f"out.{RECORD_LAYOUTS['TAR'].name}.parquet"))
+    assert table.column("record_number").to_pylist() == [1, 2]
+    assert table.column("ND5FDTTF").to_pylist()[0] == "-1.234"
+
+
+def test_unknown_format_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match="Unknown export format: xml"):
+        export_records(D5FDFileParser(), [], str(tmp_path / "out.xml"), "xml")
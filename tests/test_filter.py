@@ -0,0 +1,64 @@
+"""Tests of the raw-bytes record filter"""
+
+import os
+import pickle
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_encoder import RecordEncoder  # noqa: E402
+from d5fd_filter import RecordFilter  # noqa: E402
+from d5fd_file_parser import D5FDFileParser, format_pic  # noqa: E402
+
+
+def encode_records():
+    encoder = RecordEncoder()
+    return [
+        encoder.encode("TAR", {"ND5FDFCC": "USD", "ND5FDTDI": "3", "ND5FDTTF": "-1.234"}),
+        encoder.encode("TAR", {"ND5FDFCC": "EUR", "ND5FDTTF": "12.5"}),
+        encoder.encode("MAR", {"ND5FDVFC": "ATL1", "ND5FDVID": "AGENT7"}),
+    ]
+
+
+def test_filter_by_type():
+    records = encode_records()
+    assert list(RecordFilter(types=["mar"]).filter(records)) == [records[2]]
+    assert list(RecordFilter(types=["TAR", " "]).filter(records)) == records[:2]
+    assert list(RecordFilter().filter(records)) == records
+
+
+def test_filter_by_char_field():
+    records = encode_records()
+    assert list(RecordFilter(where=["nd5fdfcc = EUR"]).filter(records)) == [records[1]]
+    # Records whose layout lacks the field never match
+    assert list(RecordFilter(where=["ND5FDVID=AGENT7"]).filter(records)) == [records[2]]
+
+
+def test_filter_by_scaled_amount_matches_the_report_value():
+    records = encode_records()
+    parser = D5FDFileParser()
+    for data in records[:2]:
+        value = format_pic(parser.parse_record(data).get("ND5FDTTF"), b"")
+        assert list(RecordFilter(where=[f"ND5FDTTF={value}"]).filter(records)) == [data]
+    assert list(RecordFilter(where=["ND5FDTTF=-1.23"]).filter(records)) == []
+
+
+def test_filter_numbered_keeps_record_numbers():
+    records = encode_records()
+    numbered = list(enumerate(records, 1))
+    assert list(RecordFilter(types=["MAR"]).filter_numbered(numbered)) == [(3, records[2])]
+
+
+def test_invalid_conditions():
+    with pytest.raises(ValueError, match="Unknown field: ND5FDXXX"):
+        RecordFilter(where=["ND5FDXXX=1"])
+    with pytest.raises(ValueError, match="expected NAME=VALUE"):
+        RecordFilter(where=["ND5FDFCC"])
+
+
+def test_filter_pickles_by_its_arguments():
+    records = encode_records()
+    record_filter = pickle.loads(pickle.dumps(RecordFilter(types=["TAR"], where=["ND5FDFCC=USD"])))
+    assert list(record_filter.filter(records)) == [records[0]]
@@ -0,0 +1,70 @@
+"""Tests of the document number sidecar index"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from d5fd_benchmark import build_dump, build_record  # noqa: E402
+from d5fd_file_parser import D5FDFileParser  # noqa: E402
+from d5fd_index import DocumentIndex, record_keys  # noqa: E402
+
+
+def write_dump(path, records):
+    path.write_text("".join(build_dump(data) for data in records))
+    return str(path)
+
+
+def index_names(index):
+    return {name for (name,) in index.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_lookup_finds_every_key(tmp_path):
+    records = [build_record("TAR", seed) for seed in range(3)]
+    path = write_dump(tmp_path / "a.txt", records)
+    index = DocumentIndex(str(tmp_path / "a.idx"))
+
+    assert index.add_file(path) == (3, sum(len(record_keys(index.parser, data)) for data in records))
+    key, field, record_type = record_keys(index.parser, records[1])[0]
+    entries = index.lookup(key)
+    assert [(entry.field, entry.record_type, entry.path) for entry in entries] == [(field, record_type, path)]
+    assert not index.is_stale(entries[0])
+
+
+def test_key_index_rebuilt_only_for_an_empty_database(tmp_path):
+    first = write_dump(tmp_path / "a.txt", [build_record("TAR", 1)])
+    second = write_dump(tmp_path / "b.txt", [build_record("TAR", 2)])
+    index = DocumentIndex(str(tmp_path / "a.idx"))
+    statements = []
+    index.connection.set_trace_callback(statements.append)
+
+    index.add_files([first])
+    assert any(statement.startswith("DROP INDEX") for statement in statements)
+    assert {"entries_key", "entries_file"} <= index_names(index)
+
+    statements.clear()
+    index.add_files([second, first])
+    assert not any(statement.startswith("DROP INDEX") for statement in statements)
+    assert {"entries_key", "entries_file"} <= index_names(index)
+    # Indexing a file again replaces its entries
+    assert index.connection.execute("SELECT COUNT(*) FROM files").fetchone() == (2,)
+
+
+def test_failed_build_rolls_back(tmp_path):
+    path = write_dump(tmp_path / "a.txt", [build_record("TAR", 1)])
+    index = DocumentIndex(str(tmp_path / "a.idx"))
+    index.add_file(path)
+    before = index.connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+
+    with pytest.raises(OSError):
+        index.add_files([path, str(tmp_path / "missing.txt")])
+    assert index.connection.execute("SELECT COUNT(*) FROM entries").fetchone() == before
+    assert "entries_key" in index_names(index)
+
+
+def test_record_keys_skip_blank_fields():
+    parser = D5FDFileParser()
+    keys = record_keys(parser, build_record("TAR", 3))
+    assert keys and all(key and key == key.strip() for key, field, record_type in keys)
@@ -0,0 +1,240 @@
+"""Tests of the Streamlit app's parse jobs, job cache and row/text builders (streamlit is stubbed out)"""
+
+import collections
+import functools
+import io
+import os
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app module calls streamlit at import time; only the non-UI parts are tested here
+streamlit_stub = types.ModuleType("streamlit")
+streamlit_stub.set_page_config = streamlit_stub.markdown = lambda *args, **kwargs: None
+streamlit_stub.cache_resource = functools.cache
+sys.modules["streamlit"] = streamlit_stub
+
+import d5fd_streamlit_app as app  # noqa: E402
+from d5fd_benchmark import build_dump, build_record  # noqa: E402
+from d5fd_file_parser import D5FDFileParser  # noqa: E402
+from d5fd_index import record_keys  # noqa: E402
+
+RECORD_TYPES = ("TAR", "REF", "PAR", "VOI")
+
+
+def make_input(record_types=RECORD_TYPES, seed=0):
+    records = [build_record(record_type, seed + number) for number, record_type in enumerate(record_types)]
+    return records, "".join(build_dump(data) for data in records).encode("utf-8")
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class GatedParser(D5FDFileParser):
+    """Parser whose record iterator holds back every record after the first free ones until released"""
+
+    def __init__(self, free):
+        super().__init__()
+        self.free = free
+        self.released = threading.Event()
+
+    def iter_records(self, hex_input):
+        for number, data in enumerate(super().iter_records(hex_input)):
+            if number >= self.free:
+                self.released.wait(10)
+            yield data
+
+
+def test_parse_job_matches_report():
+    parser = D5FDFileParser()
+    records, data = make_input()
+    job = app.ParseJob(parser, data)
+    job.thread.join(10)
+
+    assert job.done and job.error is None and job.progress == 1.0
+    expected = io.StringIO()
+    parser.write_reports(parser.iter_records(data.decode("utf-8")), expected)
+    assert job.get_report() == expected.getvalue()
+
+    assert len(job.record_starts) == len(records)
+    assert all(len(values) == job.row_count for values in job.table.values())
+    assert job.table["Record"][job.record_starts[-1]] == len(records)
+    for record_number, record in enumerate(records, 1):
+        for key, field, record_type in record_keys(parser, record):
+            assert record_number in job.keys[key]
+
+
+def test_record_rows():
+    parser = D5FDFileParser()
+    data = build_record("TAR", 1)
+    record = parser.parse_record(data)
+    rows = app.record_rows(7, record)
+
+    assert all(len(row) == len(app.TABLE_COLUMNS) and row[0] == 7 for row in rows)
+    sections = [row[1] for row in rows]
+    assert sections[:len(record.header)] == ["HEADER"] * len(record.header)
+    bti_names = [row[2] for row in rows if row[1] == "BTI TAR"]
+    assert bti_names == [field.name for field in record.fields if not field.is_blank]
+    assert "ITEMS" in sections and "ITEM #3 REPS" in sections and "ITEM #4 SEGMENT 3" in sections
+
+
+def test_format_record_text():
+    parser = D5FDFileParser()
+    rows = app.record_rows(1, parser.parse_record(build_record("TAR", 2)))
+    table = {column: list(values) for column, values in zip(app.TABLE_COLUMNS, zip(*rows))}
+    text = app.format_record_text(table, 0, len(rows))
+    lines = text.splitlines()
+
+    assert lines[0] == "HEADER"
+    assert [line for line in lines if line.startswith("ITEM #3 REPS")] == ["ITEM #3 REPS"]
+    heading = lines[2]
+    assert heading.startswith("Field") and heading.endswith("Description")
+    first = lines[4]
+    assert first.startswith(table["Field"][0]) and first.endswith(table["Description"][0])
+    # Values line up under their heading within a section
+    assert first.index(" " + table["Hex"][0]) + 1 == heading.index("Hex")
+
+
+def test_cancel_stops_parse():
+    parser = GatedParser(free=2)
+    records, data = make_input()
+    job = app.ParseJob(parser, data)
+    wait_for(lambda: len(job.record_starts) == 2)
+    job.cancel()
+    parser.released.set()
+    job.thread.join(10)
+
+    assert not job.thread.is_alive() and job.done
+    assert len(job.record_starts) == 2 and job.error == "Parse cancelled"
+
+
+def test_job_size_counts_results():
+    parser = D5FDFileParser()
+    job = app.ParseJob(parser, make_input()[1])
+    job.thread.join(10)
+
+    assert job.size == job.total_bytes + job.result_bytes
+    assert job.result_bytes >= len(job.get_report()) + job.row_count * app.TABLE_ROW_BYTES
+
+
+def test_evict_parse_jobs_by_size():
+    running = app.ParseJob(GatedParser(free=1), make_input()[1])
+    wait_for(lambda: len(running.record_starts) == 1)
+    jobs = collections.OrderedDict(old=running)
+    for name in ("middle", "new"):
+        jobs[name] = app.ParseJob(D5FDFileParser(), make_input()[1])
+        jobs[name].thread.join(10)
+
+    app.evict_parse_jobs(jobs, jobs["middle"].size + jobs["new"].size)
+    assert list(jobs) == ["middle", "new"]
+    assert running.cancelled
+    running.parser.released.set()
+    running.thread.join(10)
+    assert not running.thread.is_alive()
+
+    # The newest job stays even when it alone is over the limit
+    app.evict_parse_jobs(jobs, 1)
+    assert list(jobs) == ["new"]
+
+
+def test_get_parse_job_reuses_and_evicts(monkeypatch):
+    lock, jobs = app.get_parse_jobs()
+    jobs.clear()
+    inputs = [make_input(seed=seed)[1] for seed in (0, 10)] + [make_input(("TAR",), seed=20)[1]]
+    monkeypatch.setattr(app, "PARSE_CACHE_BYTES", 1 << 40)
+
+    first, second = (app.get_parse_job(app.get_content_hash(data), "cp037", data) for data in inputs[:2])
+    first.thread.join(10)
+    second.thread.join(10)
+    assert app.get_parse_job(app.get_content_hash(inputs[0]), "cp037", inputs[0]) is first
+    # The third input is smaller than the second, so dropping second alone makes room
+    monkeypatch.setattr(app, "PARSE_CACHE_BYTES", first.size + second.size - 1)
+    app.get_parse_job(app.get_content_hash(inputs[2]), "cp037", inputs[2])
+
+    # first was used more recently than second, so second is the one evicted
+    assert [key[0] for key in jobs] == [app.get_content_hash(data) for data in (inputs[0], inputs[2])]
+    assert second.cancelled and not first.cancelled
+    for job in list(jobs.values()) + [second]:
+        job.thread.join(10)
+    jobs.clear()
+
+
+def test_record_row_range_while_parsing():
+    parser = GatedParser(free=2)
+    records, data = make_input()
+    job = app.ParseJob(parser, data)
+    wait_for(lambda: len(job.record_starts) == 2)
+
+    # The newest record has no known end yet; the one before it ends where it starts
+    assert app.record_row_range(job, 2) is None
+    start, end = app.record_row_range(job, 1)
+    assert (start, end) == (0, job.record_starts[1])
+    assert set(job.table["Record"][start:end]) == {1}
+
+    parser.released.set()
+    job.thread.join(10)
+    assert app.record_row_range(job, 1) == (start, end)
+    for record_number in range(1, len(records) + 1):
+        start, end = app.record_row_range(job, record_number)
+        assert end > start and set(job.table["Record"][start:end]) == {record_number}
+    assert end == job.row_count
+
+
+class FakeWidgets:
+    """st.columns, st.dataframe and st.code stand-ins: number inputs return the values set by key"""
+
+    def __init__(self, values):
+        self.values = values
+        self.inputs = []
+        self.shown = []
+
+    def columns(self, count):
+        return [self] * count
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, step=None, key=None):
+        self.inputs.append((label, key, max_value))
+        return self.values.get(key, value)
+
+    def selectbox(self, label, options, index=0):
+        return options[index]
+
+    def text_input(self, label):
+        return ""
+
+    def caption(self, text):
+        pass
+
+    def show(self, value, **kwargs):
+        self.shown.append(value)
+
+
+def test_page_and_record_inputs_clamp_to_count(monkeypatch):
+    widgets = FakeWidgets({"table_page": 99, "text_record": 99})
+    monkeypatch.setattr(app.st, "columns", widgets.columns, raising=False)
+    monkeypatch.setattr(app.st, "dataframe", widgets.show, raising=False)
+    monkeypatch.setattr(app.st, "code", widgets.show, raising=False)
+    parser = D5FDFileParser()
+    records, data = make_input()
+    job = app.ParseJob(parser, data)
+    job.thread.join(10)
+
+    # A page or record past the end shows the last one
+    app.show_field_table(job.table, job.record_starts[2])
+    app.show_field_table(job.table, job.row_count)
+    page_size = app.PAGE_SIZES[1]
+    last_page = (job.row_count - 1) // page_size * page_size
+    assert widgets.shown[-1]["Record"] == job.table["Record"][last_page:job.row_count]
+    app.show_record_text(job, 3)
+    assert widgets.shown[-1] == app.format_record_text(job.table, *app.record_row_range(job, 3))
+
+    # Same label and key on every rerun, and no max_value that would reset the input as counts grow
+    page_inputs = [entry for entry in widgets.inputs if entry[1] == "table_page"]
+    assert len(page_inputs) == 2 and len(set(page_inputs)) == 1 and page_inputs[0][2] is None
+    assert [entry for entry in widgets.inputs if entry[1] == "text_record"] == [("Record:", "text_record", None)]